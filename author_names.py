@@ -0,0 +1,89 @@
+# author_names.py
+# 작성자 표시 이름(profiles.name) 조회 모듈
+# - 게시글/댓글 목록이 행마다 profiles를 LEFT JOIN하지 않도록, 목록 쿼리는 작성자 user_id만 읽고
+#   이 모듈이 페이지 단위로 이름을 채움 (목록 쿼리는 posts/comments 한 테이블만 읽음)
+# - 캐시에 없는 user_id만 모아 SELECT ... WHERE user_id IN (...) 한 번으로 가져오고 (bulk prefetch),
+#   프로필이 없는 사용자도 '익명'으로 캐시해 다음 요청에서 다시 조회하지 않음
+# - 이름은 TTL(AUTHOR_NAME_TTL, 300초) 동안만 캐시하므로 프로필 이름을 바꾸면 최대 TTL 뒤 반영됨
+#   현재 서버(루트/gui 모두)에는 프로필을 수정하는 API가 없어 invalidate()를 호출하는 곳이 없음
+#   → 관리 도구나 DB에서 직접 이름을 바꾼 경우 오래된 이름이 보이는 시간은 TTL로만 제한됨
+#   (프로필 수정 API를 추가하면 커밋 직후 author_names.invalidate(user_id) 호출)
+
+import threading
+
+from cache_utils import LRUCache
+
+# -------------------------- 설정 --------------------------
+AUTHOR_NAME_TTL = 300               # 이름 캐시 유효 시간(초)
+AUTHOR_NAME_MAX_ENTRIES = 100000    # 기억하는 최대 사용자 수 (초과 시 가장 오래 안 쓴 항목부터 제거)
+DEFAULT_AUTHOR_NAME = '익명'         # 프로필이 없거나 이름이 비어 있을 때 표시 이름
+
+
+class AuthorNameCache:
+    # user_id → 표시 이름 캐시 (프로세스 내 LRU + TTL)
+
+    def __init__(self, ttl=AUTHOR_NAME_TTL, max_entries=AUTHOR_NAME_MAX_ENTRIES, table="profiles"):
+        self.ttl = ttl
+        self.table = table  # 이름을 읽을 테이블 (user_id, name 컬럼, 벤치마크는 별도 테이블 사용)
+        self._cache = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "queries": 0}
+
+    def resolve(self, cursor, user_ids):
+        # user_ids의 표시 이름을 {user_id: name}으로 반환
+        # cursor: 호출한 쪽이 이미 연 DB 커서 (캐시 미스가 있을 때만 쿼리 1회 실행)
+        names = {}
+        missing = []
+        for user_id in set(user_ids):
+            if user_id is None:
+                continue
+            name = self._cache.get(user_id)
+            if name is None:
+                missing.append(user_id)
+            else:
+                names[user_id] = name
+        with self._lock:
+            self._stats["hits"] += len(names)
+            self._stats["misses"] += len(missing)
+
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            cursor.execute(f"SELECT user_id, name FROM {self.table} WHERE user_id IN ({placeholders})", missing)
+            found = {}
+            for row in cursor.fetchall():
+                # 일반 커서(튜플)와 dictionary=True 커서 모두 지원
+                user_id, name = (row["user_id"], row["name"]) if isinstance(row, dict) else row
+                found[user_id] = name
+            with self._lock:
+                self._stats["queries"] += 1
+            for user_id in missing:
+                name = found.get(user_id) or DEFAULT_AUTHOR_NAME
+                self._cache.set(user_id, name, self.ttl)
+                names[user_id] = name
+        return names
+
+    def fill(self, cursor, rows, id_field="user_id", name_field="user_name"):
+        # 딕셔너리 목록(게시글/댓글)의 id_field를 보고 name_field에 표시 이름을 채움
+        names = self.resolve(cursor, [row[id_field] for row in rows])
+        for row in rows:
+            row[name_field] = names.get(row[id_field], DEFAULT_AUTHOR_NAME)
+        return rows
+
+    def invalidate(self, *user_ids):
+        # 프로필 이름이 바뀐 사용자의 캐시 삭제
+        self._cache.delete(*user_ids)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = self._cache.size()
+        stats["evictions"] = self._cache.evictions
+        return stats
+
+
+author_names = AuthorNameCache()
@@ -0,0 +1,151 @@
+# bench_author_names.py
+# 게시글 목록 쿼리의 작성자 이름 조회 방식 비교 벤치마크
+# - JOIN: posts LEFT JOIN profiles + COALESCE (기존 방식, 행마다 profiles 조회)
+# - 캐시: posts 한 테이블만 조회 + author_names로 페이지 단위 이름 채우기 (캐시 미스 / 적중)
+# 실제 데이터와 섞이지 않도록 bench_posts / bench_profiles 테이블을 만들어 1만/10만/100만 행으로 측정하고 삭제함.
+# 실제 MySQL 서버(8.0 이상)가 실행 중이어야 함. 실행: python bench_author_names.py [최대 행 수]
+
+import sys
+import time
+
+import db_utils
+from db_utils import get_connection, close_connection
+from author_names import AuthorNameCache
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000]
+USERS_PER_POST = 0.1    # 작성자 수 = 게시글 수 * 0.1
+PAGE_SIZE = 20
+REPEAT = 20
+INSERT_CHUNK = 50_000
+
+LIST_COLUMNS = """
+    p.post_id, p.title, p.body, p.created_at, p.like_count, p.comment_count,
+    p.view_count, p.pinned, p.private, p.user_id"""
+
+
+def create_tables(cursor):
+    cursor.execute("DROP TABLE IF EXISTS bench_posts")
+    cursor.execute("DROP TABLE IF EXISTS bench_profiles")
+    cursor.execute("""
+        CREATE TABLE bench_profiles (
+            user_id INT PRIMARY KEY,
+            name VARCHAR(50)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE bench_posts (
+            post_id INT PRIMARY KEY AUTO_INCREMENT,
+            user_id INT NOT NULL,
+            title VARCHAR(100),
+            body TEXT,
+            pinned BOOLEAN DEFAULT FALSE,
+            private BOOLEAN DEFAULT FALSE,
+            view_count INT DEFAULT 0,
+            comment_count INT DEFAULT 0,
+            like_count INT DEFAULT 0,
+            created_at DATETIME,
+            INDEX idx_posts_list (private, pinned, created_at, post_id)
+        )
+    """)
+
+
+def fill_rows(cursor, conn, start, end, users):
+    # post_id start+1 ~ end 행 추가 (작성자 users명 중 일부는 프로필 없음)
+    cursor.execute("SET SESSION cte_max_recursion_depth = %s", (INSERT_CHUNK + 1,))
+    for chunk_start in range(start, end, INSERT_CHUNK):
+        chunk_end = min(end, chunk_start + INSERT_CHUNK)
+        cursor.execute("""
+            INSERT INTO bench_posts (user_id, title, body, created_at)
+            WITH RECURSIVE seq (n) AS (SELECT %s UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+            SELECT n %% %s + 1, CONCAT('제목 ', n), REPEAT('본문 ', 20),
+                   TIMESTAMP('2024-01-01') + INTERVAL n SECOND
+            FROM seq
+        """, (chunk_start + 1, chunk_end, users))
+        conn.commit()
+    cursor.execute("""
+        INSERT IGNORE INTO bench_profiles (user_id, name)
+        WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+        SELECT n, CONCAT('사용자', n) FROM seq WHERE n %% 10 <> 0
+    """, (users,))
+    conn.commit()
+
+
+def bench(func, repeat=REPEAT):
+    # repeat회 실행한 평균 시간(ms)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROW_COUNTS[-1]
+    row_counts = [count for count in ROW_COUNTS if count <= max_rows]
+
+    conn = get_connection()
+    if not conn:
+        print("DB 연결 실패")
+        return
+    cursor = conn.cursor()
+
+    print("=" * 78)
+    print(f"게시글 목록 작성자 이름 조회 벤치마크 (페이지 {PAGE_SIZE}개, 평균 {REPEAT}회)")
+    print("=" * 78)
+    print(f"{'행 수':>10} | {'페이지':>6} | {'JOIN':>10} | {'캐시 미스':>10} | {'캐시 적중':>10}")
+
+    try:
+        create_tables(cursor)
+        filled = 0
+        for count in row_counts:
+            users = max(1, int(count * USERS_PER_POST))
+            fill_rows(cursor, conn, filled, count, users)
+            filled = count
+            cursor.execute("ANALYZE TABLE bench_posts, bench_profiles")
+            cursor.fetchall()
+
+            # 첫 페이지와 목록 중간 페이지 (키셋 커서 위치)
+            cursor.execute("SELECT created_at, post_id FROM bench_posts WHERE post_id = %s", (count // 2,))
+            middle = cursor.fetchone()
+            pages = [("첫", "", ()), ("중간", "AND (p.created_at < %s OR (p.created_at = %s AND p.post_id < %s))",
+                                      (middle[0], middle[0], middle[1]))]
+
+            for label, keyset, params in pages:
+                def with_join():
+                    cursor.execute(f"""
+                        SELECT {LIST_COLUMNS}, COALESCE(pr.name, '익명') AS user_name
+                        FROM bench_posts p
+                        LEFT JOIN bench_profiles pr ON p.user_id = pr.user_id
+                        WHERE p.private = FALSE {keyset}
+                        ORDER BY p.pinned DESC, p.created_at DESC, p.post_id DESC
+                        LIMIT %s
+                    """, (*params, PAGE_SIZE + 1))
+                    cursor.fetchall()
+
+                def with_cache(names):
+                    cursor.execute(f"""
+                        SELECT {LIST_COLUMNS}
+                        FROM bench_posts p
+                        WHERE p.private = FALSE {keyset}
+                        ORDER BY p.pinned DESC, p.created_at DESC, p.post_id DESC
+                        LIMIT %s
+                    """, (*params, PAGE_SIZE + 1))
+                    rows = [{"post_id": row[0], "user_id": row[9]} for row in cursor.fetchall()]
+                    names.fill(cursor, rows)
+
+                join_ms = bench(with_join)
+                # 캐시 미스: 매번 빈 캐시 (IN 쿼리 1회 포함)
+                miss_ms = bench(lambda: with_cache(AuthorNameCache(table="bench_profiles")))
+                warm = AuthorNameCache(table="bench_profiles")
+                with_cache(warm)
+                hit_ms = bench(lambda: with_cache(warm))
+                print(f"{count:>10} | {label:>6} | {join_ms:>7.2f} ms | {miss_ms:>7.2f} ms | {hit_ms:>7.2f} ms")
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS bench_posts")
+        cursor.execute("DROP TABLE IF EXISTS bench_profiles")
+        cursor.close()
+        close_connection(conn)
+        db_utils.close_all_pools()
+
+
+if __name__ == '__main__':
+    main()
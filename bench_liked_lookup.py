@@ -0,0 +1,55 @@
+# bench_liked_lookup.py
+# 게시글 목록의 "내가 좋아요한 글" 확인 방식 비교 벤치마크
+# - 게시글마다 check_user_liked 호출 (N+1, 게시글 수만큼 연결 대여 + 쿼리)
+# - get_liked_post_ids 한 번 호출 (WHERE user_id = %s AND post_id IN (...))
+# 실제 MySQL 서버가 실행 중이어야 함. 실행: python bench_liked_lookup.py [user_id]
+
+import sys
+import time
+
+import db_utils
+from server_like import check_user_liked, get_liked_post_ids
+
+PAGE_SIZES = [50, 200, 1000]
+REPEAT = 5
+
+
+def bench(func, repeat=REPEAT):
+    # repeat회 실행한 평균 시간(ms)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    user_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+    print("=" * 70)
+    print(f"좋아요 여부 조회 벤치마크 (user_id={user_id}, 평균 {REPEAT}회)")
+    print("=" * 70)
+    print(f"{'페이지 크기':>10} | {'N+1 (풀 미사용)':>16} | {'N+1 (풀 사용)':>14} | {'일괄 조회':>10}")
+
+    for size in PAGE_SIZES:
+        post_ids = list(range(1, size + 1))
+
+        def per_post():
+            for post_id in post_ids:
+                check_user_liked(post_id, user_id)
+
+        def bulk():
+            get_liked_post_ids(user_id, post_ids)
+
+        db_utils.POOL_ENABLED = False
+        no_pool_ms = bench(per_post, repeat=1)
+        db_utils.POOL_ENABLED = True
+        per_post_ms = bench(per_post)
+        bulk_ms = bench(bulk)
+
+        print(f"{size:>10} | {no_pool_ms:>13.1f} ms | {per_post_ms:>11.1f} ms | {bulk_ms:>7.2f} ms")
+
+    db_utils.close_all_pools()
+
+
+if __name__ == '__main__':
+    main()
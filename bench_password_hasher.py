@@ -0,0 +1,68 @@
+# bench_password_hasher.py
+# 로그인(bcrypt 검증) 처리량 비교 벤치마크 - DB 없이 해싱 부분만 측정
+# - 요청 스레드에서 직접 검증 (기존 방식, Flask 워커 스레드 수만큼 동시 실행)
+# - password_hasher 스레드 풀 / 프로세스 풀
+# 코어당 처리량(logins/sec/core)과, 대기 한도를 넘는 폭주 시 거절(503) 수를 출력함.
+# 실행: python bench_password_hasher.py [로그인 수] [rounds]
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from password_hasher import HasherBusy, PasswordHasher, _check_password, _hash_password
+
+REQUEST_THREADS = 32    # 동시에 로그인을 처리하는 Flask 워커 스레드 수
+
+
+def run_logins(verify, count):
+    # REQUEST_THREADS개 스레드로 count번 검증, (초당 처리 수, 거절 수) 반환
+    rejected = 0
+
+    def login(_):
+        nonlocal rejected
+        try:
+            verify()
+        except HasherBusy:
+            rejected += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=REQUEST_THREADS) as pool:
+        list(pool.map(login, range(count)))
+    elapsed = time.perf_counter() - started
+    return (count - rejected) / elapsed, rejected
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    cores = os.cpu_count() or 1
+    password = "abc123@"
+    hashed = _hash_password(password, rounds)
+
+    print("=" * 70)
+    print(f"로그인 처리량 벤치마크 (검증 {count}회, rounds={rounds}, 코어 {cores}개, 요청 스레드 {REQUEST_THREADS}개)")
+    print("=" * 70)
+    print(f"{'방식':<26} | {'logins/sec':>10} | {'per core':>9} | {'거절':>5}")
+
+    def report(name, verify, total=count):
+        rate, rejected = run_logins(verify, total)
+        print(f"{name:<26} | {rate:>10.1f} | {rate / cores:>9.1f} | {rejected:>5}")
+
+    report("요청 스레드에서 직접", lambda: _check_password(password, hashed))
+    for use_processes in (False, True):
+        hasher = PasswordHasher(rounds=rounds, workers=cores, max_pending=count, use_processes=use_processes)
+        hasher.verify(password, hashed)  # 워커 기동 시간 제외
+        report(f"password_hasher ({'process' if use_processes else 'thread'})",
+               lambda: hasher.verify(password, hashed))
+        hasher.shutdown()
+
+    # 대기 한도를 넘는 폭주: 한도를 넘는 요청은 기다리지 않고 바로 거절됨
+    hasher = PasswordHasher(rounds=rounds, workers=cores, max_pending=cores * 2)
+    hasher.verify(password, hashed)
+    report(f"폭주 (max_pending={cores * 2})", lambda: hasher.verify(password, hashed))
+    hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# bench_posts_pool.py
+# 커넥션 풀 적용 전/후 GET /api/posts 처리량(requests/sec)을 비교하는 벤치마크
+# 실제 MySQL 서버가 실행 중이어야 하며, Flask test client로 API를 직접 호출함.
+# 실행: python bench_posts_pool.py [요청 수] [동시 스레드 수]
+
+import sys
+import time
+import threading
+
+import db_utils
+from server_API import community_API
+
+TOTAL_REQUESTS = 500
+THREADS = 8
+
+
+def run_round(total_requests, threads):
+    # threads 개의 스레드가 total_requests 번 GET /api/posts 를 나눠서 호출
+    per_thread = total_requests // threads
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        client = community_API.test_client()
+        for _ in range(per_thread):
+            response = client.get('/api/posts')
+            if response.status_code != 200:
+                with lock:
+                    errors[0] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    done = per_thread * threads
+    return done / elapsed, elapsed, errors[0]
+
+
+def main():
+    total_requests = int(sys.argv[1]) if len(sys.argv) > 1 else TOTAL_REQUESTS
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else THREADS
+
+    print("=" * 60)
+    print(f"GET /api/posts 벤치마크 (요청 {total_requests}회, 스레드 {threads}개)")
+    print("=" * 60)
+
+    # 1. 풀 미사용 (요청마다 새 연결)
+    db_utils.POOL_ENABLED = False
+    rps_before, elapsed, errors = run_round(total_requests, threads)
+    print(f"[풀 미사용] {rps_before:8.1f} req/s  ({elapsed:.2f}s, 오류 {errors}건)")
+
+    # 2. 풀 사용 (워밍업 후 측정)
+    db_utils.POOL_ENABLED = True
+    run_round(threads * 2, threads)
+    rps_after, elapsed, errors = run_round(total_requests, threads)
+    print(f"[풀 사용  ] {rps_after:8.1f} req/s  ({elapsed:.2f}s, 오류 {errors}건)")
+
+    if rps_before:
+        print(f"\n처리량 변화: x{rps_after / rps_before:.2f}")
+    print(f"풀 통계: {db_utils.get_pool_stats()}")
+    db_utils.close_all_pools()
+
+
+if __name__ == '__main__':
+    main()
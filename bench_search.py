@@ -0,0 +1,167 @@
+# bench_search.py
+# 검색 쿼리 지연 시간 벤치마크 (p50 / p95, ms)
+# - 기본: 프로세스 내 역색인(search_index) vs 모든 글을 훑는 부분 문자열 검색(LIKE '%검색어%'와 같은 방식)
+#   DB 없이 합성 한국어 게시글 1만/10만 개로 측정
+# - --mysql: bench_posts 테이블에 같은 데이터를 넣고 FULLTEXT(ngram) MATCH ... AGAINST vs LIKE 측정 후 삭제
+#   (실제 MySQL 서버(8.0 이상)가 실행 중이어야 함)
+# 실행: python bench_search.py [최대 문서 수] [--mysql]
+
+import random
+import statistics
+import sys
+import time
+
+from search_index import InvertedIndex
+
+DOC_COUNTS = [10_000, 100_000]
+QUERIES = ["인공지능", "추천 알고리즘", "데이터베이스 성능", "여행 후기", "파이썬"]
+REPEAT = 20
+PAGE_SIZE = 20
+INSERT_CHUNK = 1_000
+
+WORDS = [
+    "인공지능", "머신러닝", "딥러닝", "데이터베이스", "성능", "추천", "알고리즘", "파이썬", "서버",
+    "커뮤니티", "게시글", "댓글", "여행", "후기", "맛집", "점심", "공부", "방법", "질문", "답변",
+    "개발자", "프로젝트", "취업", "면접", "코딩", "테스트", "배포", "클라우드", "보안", "네트워크",
+]
+PARTICLES = ["", "", "은", "는", "이", "가", "을", "를", "에", "의", "도"]
+VOCABULARY_SIZE = 5_000
+
+
+def make_vocabulary(rng):
+    # 임의 음절 단어 VOCABULARY_SIZE개 + WORDS를 중간 빈도 위치에 섞은 어휘, 빈도는 순위에 반비례 (Zipf 분포)
+    words = ["".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(2, 4)))
+             for _ in range(VOCABULARY_SIZE)]
+    for i, word in enumerate(WORDS):
+        words.insert(50 + i * 100, word)
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+
+def make_docs(count, seed=0):
+    # (post_id, title, body) 합성 데이터 (단어마다 조사를 붙여 실제 한국어 글처럼)
+    rng = random.Random(seed)
+    vocabulary, weights = make_vocabulary(rng)
+    def sentence(length):
+        return " ".join(word + rng.choice(PARTICLES) for word in rng.choices(vocabulary, weights, k=length))
+    return [(post_id, sentence(4), sentence(rng.randint(20, 60))) for post_id in range(1, count + 1)]
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def measure(func):
+    # 검색어마다 REPEAT회 실행한 지연 시간(ms) 목록
+    timings = []
+    for query in QUERIES:
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - started) * 1000)
+    return percentiles(timings)
+
+
+def bench_memory(row_counts):
+    print("=" * 78)
+    print(f"프로세스 내 검색 엔진 벤치마크 (페이지 {PAGE_SIZE}개, 검색어 {len(QUERIES)}개 x {REPEAT}회)")
+    print("=" * 78)
+    print(f"{'문서 수':>10} | {'색인 시간':>10} | {'역색인 p50/p95':>20} | {'전체 훑기 p50/p95':>22}")
+
+    for count in row_counts:
+        docs = make_docs(count)
+        index = InvertedIndex()
+        started = time.perf_counter()
+        for post_id, title, body in docs:
+            index.add_post(post_id, title, body)
+        build_s = time.perf_counter() - started
+
+        def scan(query):
+            # LIKE '%검색어%' OR ...: 모든 글을 훑어 단어 하나라도 포함한 글을 최신순으로
+            words = query.split()
+            matches = [post_id for post_id, title, body in docs
+                       if any(word in title or word in body for word in words)]
+            return sorted(matches, reverse=True)[:PAGE_SIZE]
+
+        index_p50, index_p95 = measure(lambda query: index.search(query, ("post",), PAGE_SIZE))
+        scan_p50, scan_p95 = measure(scan)
+        print(f"{count:>10} | {build_s:>8.1f} s | {index_p50:>8.2f} / {index_p95:>6.2f} ms | "
+              f"{scan_p50:>9.2f} / {scan_p95:>7.2f} ms")
+
+
+def bench_mysql(row_counts):
+    import db_utils
+    from db_utils import get_connection, close_connection
+
+    conn = get_connection()
+    if not conn:
+        print("DB 연결 실패")
+        return
+    cursor = conn.cursor()
+
+    print("=" * 78)
+    print(f"MySQL 검색 벤치마크 (페이지 {PAGE_SIZE}개, 검색어 {len(QUERIES)}개 x {REPEAT}회)")
+    print("=" * 78)
+    print(f"{'문서 수':>10} | {'FULLTEXT p50/p95':>22} | {'LIKE p50/p95':>22}")
+
+    try:
+        cursor.execute("DROP TABLE IF EXISTS bench_posts")
+        cursor.execute("""
+            CREATE TABLE bench_posts (
+                post_id INT PRIMARY KEY,
+                title VARCHAR(100),
+                body TEXT,
+                FULLTEXT INDEX ft_bench_posts (title, body) WITH PARSER ngram
+            )
+        """)
+        docs = make_docs(row_counts[-1])
+        filled = 0
+        for count in row_counts:
+            for start in range(filled, count, INSERT_CHUNK):
+                cursor.executemany("INSERT INTO bench_posts (post_id, title, body) VALUES (%s, %s, %s)",
+                                   docs[start:min(count, start + INSERT_CHUNK)])
+                conn.commit()
+            filled = count
+            cursor.execute("OPTIMIZE TABLE bench_posts")
+            cursor.fetchall()
+
+            def fulltext(query):
+                cursor.execute("""
+                    SELECT post_id, MATCH(title, body) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score
+                    FROM bench_posts
+                    WHERE MATCH(title, body) AGAINST (%s IN NATURAL LANGUAGE MODE)
+                    ORDER BY score DESC, post_id DESC
+                    LIMIT %s
+                """, (query, query, PAGE_SIZE))
+                cursor.fetchall()
+
+            def like(query):
+                words = query.split()
+                where = " OR ".join(["title LIKE %s OR body LIKE %s"] * len(words))
+                params = [f"%{word}%" for word in words for _ in range(2)]
+                cursor.execute(f"SELECT post_id FROM bench_posts WHERE {where} ORDER BY post_id DESC LIMIT %s",
+                               (*params, PAGE_SIZE))
+                cursor.fetchall()
+
+            ft_p50, ft_p95 = measure(fulltext)
+            like_p50, like_p95 = measure(like)
+            print(f"{count:>10} | {ft_p50:>9.2f} / {ft_p95:>7.2f} ms | {like_p50:>9.2f} / {like_p95:>7.2f} ms")
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS bench_posts")
+        cursor.close()
+        close_connection(conn)
+        db_utils.close_all_pools()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--mysql"]
+    max_docs = int(args[0]) if args else DOC_COUNTS[-1]
+    row_counts = [count for count in DOC_COUNTS if count <= max_docs] or [max_docs]
+    if "--mysql" in sys.argv:
+        bench_mysql(row_counts)
+    else:
+        bench_memory(row_counts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+# cache_utils.py
+# 게시글 상세/목록 조회 결과를 캐시하는 모듈 (read-through)
+# 같은 게시글/같은 목록 페이지 요청이 반복될 때 profiles JOIN 쿼리를 다시 실행하지 않도록 함.
+# 쓰기(게시글/댓글/좋아요 변경)가 일어나면 해당 게시글 키와 목록 페이지를 무효화함.
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# -------------------------- 캐시 설정 --------------------------
+CACHE_ENABLED = True
+CACHE_BACKEND = "memory"    # "memory": 프로세스 내 LRU / "redis": Redis 호환 서버 (redis 패키지 필요)
+CACHE_TTL = 30              # 항목 유효 시간(초)
+CACHE_MAX_ENTRIES = 1024    # memory 백엔드 최대 항목 수 (초과 시 가장 오래 안 쓴 항목부터 제거)
+REDIS_URL = "redis://127.0.0.1:6379/0"
+
+
+class LRUCache:
+    # TTL을 지원하는 프로세스 내 LRU 캐시 (값은 JSON 문자열로 저장해 호출자가 수정해도 캐시가 오염되지 않음)
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # {key: (expires_at, value)}
+        self._counters = {}         # incr()로 관리하는 값 (LRU 제거/TTL 대상 아님, 목록 세대/버전 순번처럼 개수가 고정된 키만)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key])
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+    def size(self):
+        with self._lock:
+            return len(self._data)
+
+
+class RedisCache:
+    # Redis 호환 서버를 사용하는 백엔드 (여러 서버 프로세스가 캐시를 공유할 때)
+
+    def __init__(self, url=REDIS_URL):
+        self._client = redis.Redis.from_url(url)
+        self.evictions = 0
+
+    def get(self, key):
+        value = self._client.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def clear(self):
+        self._client.flushdb()
+
+    def size(self):
+        return self._client.dbsize()
+
+
+class PostCache:
+    # 게시글 상세(post:<id>:<버전>)와 목록 페이지(posts:list:<세대>:<limit>:<cursor>) 캐시
+    # 목록 페이지는 어떤 게시글이든 바뀌면 모두 무효화해야 하므로, 키에 세대 번호를 넣고
+    # 쓰기 시 세대 번호만 올려서 이전 세대 페이지를 한 번에 버림 (남은 항목은 TTL/LRU로 정리)
+    # 상세도 같은 방식으로 게시글마다 버전 번호를 키에 넣음 (조회 중 수정/삭제되면 이전 버전 키에 저장되어 버려짐)
+    # 버전 번호는 전체 순번(POST_VERSION_SEQ_KEY) 하나에서 받아 일반 항목처럼 TTL/LRU로 저장하므로 게시글 수만큼 쌓이지 않고,
+    # 버전 항목이 만료/제거되어도 새 번호를 받으므로 이전 버전 키(만료 전의 오래된 상세)를 다시 읽지 않음
+
+    LIST_GENERATION_KEY = "posts:list:gen"
+    POST_VERSION_SEQ_KEY = "post:ver:seq"
+    POST_VERSION_KEY = "post:ver:{}"
+
+    def __init__(self, backend, ttl=CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.version_ttl = ttl * 2  # 버전 항목은 그 버전으로 저장한 상세 항목보다 오래 유지
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "errors": 0}
+
+    # -------------------------- 내부 도우미 --------------------------
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key):
+        if not CACHE_ENABLED:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            # 캐시 장애는 DB 조회로 대체 (요청 실패로 이어지지 않도록)
+            print(f"[CACHE] 조회 오류: {e}")
+            self._count("errors")
+            return None
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(value)
+
+    def set(self, key, value):
+        if not CACHE_ENABLED:
+            return
+        try:
+            self.backend.set(key, json.dumps(value, ensure_ascii=False), self.ttl)
+            self._count("sets")
+        except Exception as e:
+            print(f"[CACHE] 저장 오류: {e}")
+            self._count("errors")
+
+    def list_key(self, limit, cursor, feed="list"):
+        # 목록 페이지 키 (DB 조회 전에 미리 만들어 둬야 조회 중 무효화된 결과가 새 세대 키로 저장되지 않음)
+        # feed: "list"(최신순 목록) / "hot"(인기 목록), 같은 세대 번호로 함께 무효화됨
+        try:
+            generation = self.backend.get(self.LIST_GENERATION_KEY) or "0"
+        except Exception:
+            generation = "0"
+        return f"posts:{feed}:{generation}:{limit}:{cursor or ''}"
+
+    # -------------------------- 게시글 상세 --------------------------
+    def _new_post_version(self, post_id):
+        # 전체 순번에서 새 버전 번호를 받아 게시글 버전으로 저장 (번호는 다시 쓰이지 않음)
+        version = self.backend.incr(self.POST_VERSION_SEQ_KEY)
+        self.backend.set(self.POST_VERSION_KEY.format(post_id), str(version), self.version_ttl)
+        return version
+
+    def post_key(self, post_id):
+        # 상세 키 (list_key와 같이 DB 조회 전에 미리 만들어 둬야 조회 중 무효화된 게시글이 새 버전 키로 저장되지 않음)
+        try:
+            version = self.backend.get(self.POST_VERSION_KEY.format(post_id))
+            if version is None:
+                version = self._new_post_version(post_id)
+        except Exception:
+            version = "0"
+        return f"post:{post_id}:{version}"
+
+    # -------------------------- 무효화 --------------------------
+    def invalidate_post(self, post_id, lists=True):
+        # 게시글 하나가 바뀌었을 때: 해당 상세 캐시 삭제 + (lists=True면) 목록 페이지 전체 무효화
+        self.invalidate_posts([post_id], lists=lists)
+
+    def invalidate_posts(self, post_ids, lists=False):
+        try:
+            for post_id in post_ids:
+                # 새 버전을 받아 조회 중인 요청이 이전 내용을 다시 저장해도 읽히지 않게 하고, 이전 버전 항목은 바로 삭제
+                previous = self.backend.get(self.POST_VERSION_KEY.format(post_id))
+                self._new_post_version(post_id)
+                if previous is not None:
+                    self.backend.delete(f"post:{post_id}:{previous}")
+            if lists:
+                self.backend.incr(self.LIST_GENERATION_KEY)
+            self._count("invalidations")
+        except Exception as e:
+            print(f"[CACHE] 무효화 오류: {e}")
+            self._count("errors")
+
+    def invalidate_lists(self):
+        # 새 게시글 작성처럼 목록만 바뀌는 경우
+        self.invalidate_posts([], lists=True)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["backend"] = type(self.backend).__name__
+        stats["evictions"] = self.backend.evictions
+        try:
+            stats["entries"] = self.backend.size()
+        except Exception:
+            stats["entries"] = None
+        return stats
+
+
+def _create_backend():
+    if CACHE_BACKEND == "redis":
+        if redis is None:
+            print("[CACHE] redis 패키지가 없어 memory 백엔드를 사용합니다.")
+        else:
+            return RedisCache(REDIS_URL)
+    return LRUCache(CACHE_MAX_ENTRIES)
+
+
+post_cache = PostCache(_create_backend())
+
+def get_cache_stats():
+    # 캐시 적중/미스 횟수, 적중률, 항목 수 등 반환
+    return post_cache.stats()
@@ -0,0 +1,312 @@
+# chat_history_store.py
+# 채팅 히스토리 저장소 (소켓 채팅 서버와 gui/server_API가 함께 사용)
+# - 채널별 링 버퍼(deque maxlen)로 최근 메시지만 메모리에 유지 → 서버를 오래 띄워도 메모리가 늘지 않음
+# - 추가만 하는(append-only) 세그먼트 로그 파일에 JSON 한 줄씩 기록 → 재시작 시 mmap으로 읽어 링 버퍼 복원
+# - message_id/시각 기준 범위 조회 → 재접속한 클라이언트가 "X 이후 메시지"만 받아 갈 수 있음
+#   디스크에 남은 기록은 채널별 (seq, 시각, 세그먼트, 파일 위치) 색인으로 찾아서 돌려줄 줄만 읽음
+#   (세그먼트 전체를 읽고 파싱하지 않음, 한 번에 돌려주는 개수도 SINCE_MAX_MESSAGES로 제한)
+
+import bisect
+import json
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+# -------------------------- 설정 --------------------------
+HISTORY_PER_CHANNEL = 200           # 채널별 메모리에 유지할 최근 메시지 수
+HISTORY_MAX_CHANNELS = 1000         # 메모리에 버퍼를 유지할 최대 채널 수 (초과 시 가장 오래 안 쓴 채널부터 내림, 디스크에는 남음)
+SEGMENT_MAX_BYTES = 16 * 1024 * 1024  # 세그먼트 파일 하나의 최대 크기 (넘으면 새 파일로 교체)
+SEGMENT_RETENTION = 8               # 보관할 세그먼트 파일 수 (오래된 것부터 삭제)
+FSYNC_ON_APPEND = False             # True면 메시지마다 fsync (정전에도 유실 없음, 대신 느림)
+SINCE_MAX_MESSAGES = 500            # since()가 한 번에 돌려주는 최대 메시지 수 (limit을 더 크게 줘도 이 값으로 제한)
+
+SEGMENT_PREFIX = "chat-"
+SEGMENT_SUFFIX = ".log"
+
+
+def _to_epoch(value):
+    # 시각 파라미터(epoch 숫자 또는 ISO-8601 문자열)를 epoch 초로 변환, 해석할 수 없으면 None
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class ChatHistoryStore:
+    # 채널별 최근 메시지 링 버퍼 + 선택적 디스크 세그먼트 로그
+    # 항목은 (seq, stored_at, packet) - seq는 저장소가 붙이는 전체 증가 번호, stored_at은 서버 수신 시각
+    # (패킷의 header.timestamp는 클라이언트가 보낸 값이라 순서 보장이 안 되므로 범위 조회에 쓰지 않음)
+
+    def __init__(self, directory=None, max_per_channel=HISTORY_PER_CHANNEL, max_channels=HISTORY_MAX_CHANNELS,
+                 segment_max_bytes=SEGMENT_MAX_BYTES, segment_retention=SEGMENT_RETENTION):
+        self.directory = directory  # None이면 메모리에만 보관
+        self.max_per_channel = max_per_channel
+        self.max_channels = max_channels
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_retention = segment_retention
+
+        self._lock = threading.Lock()
+        self._channels = OrderedDict()  # {channel: deque([(seq, stored_at, packet), ...])}
+        self._seq = 0
+        self._segment = None            # 현재 기록 중인 세그먼트 파일 객체
+        self._segment_path = None
+        self._segment_size = 0
+        # 디스크 기록 색인 (세그먼트가 삭제되면 해당 항목도 제거)
+        self._log_index = {}            # {channel: [(seq, stored_at, path, offset), ...]} seq 순
+        self._id_index = {}             # {message_id: (channel, seq)}
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._replay()
+
+    # ---- 1. 기록 ----
+    def append(self, packet):
+        # 패킷 하나를 채널 링 버퍼와 세그먼트 로그에 추가하고 seq 반환
+        channel = packet["header"]["channel"]
+        with self._lock:
+            self._seq += 1
+            entry = (self._seq, time.time(), packet)
+            self._buffer(channel).append(entry)
+            if self.directory:
+                self._write(channel, entry)
+            return self._seq
+
+    def _buffer(self, channel):
+        # 채널 링 버퍼 (없으면 생성, 채널 수가 한도를 넘으면 가장 오래 안 쓴 채널 버퍼 제거)
+        buffer = self._channels.get(channel)
+        if buffer is None:
+            buffer = self._channels[channel] = deque(maxlen=self.max_per_channel)
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel)
+        return buffer
+
+    # ---- 2. 조회 ----
+    def recent(self, channel, limit=None):
+        # 채널의 최근 메시지 (오래된 것부터), limit이 있으면 마지막 limit개
+        with self._lock:
+            buffer = self._channels.get(channel)
+            if not buffer:
+                return []
+            entries = list(buffer)
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        return [packet for _, _, packet in entries]
+
+    def since(self, channel, message_id=None, timestamp=None, limit=SINCE_MAX_MESSAGES):
+        # message_id 다음 메시지부터, 또는 timestamp(epoch/ISO-8601) 이후에 저장된 메시지를 최대 limit개 반환
+        # 메모리 버퍼에 기준점이 없으면(오래된 메시지) 디스크 기록 색인에서 위치를 찾아 필요한 줄만 읽음
+        # - 모르는(보관 기간이 지났거나 위조된) message_id → 최근 메시지 (recent)
+        # - 보관 기간보다 오래된 시각 → 남아 있는 가장 오래된 기록부터
+        limit = SINCE_MAX_MESSAGES if limit is None else max(0, min(limit, SINCE_MAX_MESSAGES))
+        after_time = _to_epoch(timestamp)
+        if message_id is None and after_time is None:
+            return self.recent(channel, limit)
+
+        with self._lock:
+            entries = list(self._channels.get(channel, ()))
+            result = self._slice_after(entries, message_id, after_time)
+            locations = None
+            if result is None and self.directory:
+                locations = self._locate_after(channel, message_id, after_time, limit)
+                if locations and self._segment is not None:
+                    self._segment.flush()
+
+        if result is not None:
+            return [packet for _, _, packet in result[:limit]]
+        if locations is not None:
+            return self._read_locations(locations)
+        if message_id is not None:
+            return self.recent(channel, limit)
+        # 디스크 기록 없이 메모리 버퍼보다 오래된 시각 → 버퍼의 가장 오래된 메시지부터
+        return [packet for _, _, packet in entries[:limit]]
+
+    @staticmethod
+    def _slice_after(entries, message_id, after_time):
+        # entries 중 기준점 이후 항목, 기준점이 entries 범위 밖이면 None
+        if not entries:
+            return None
+        if message_id is not None:
+            # 최근 메시지를 찾는 경우가 대부분이므로 뒤에서부터 탐색
+            for index in range(len(entries) - 1, -1, -1):
+                if entries[index][2]["header"]["message_id"] == message_id:
+                    return entries[index + 1:]
+            return None
+        if entries[0][1] > after_time:
+            # 버퍼의 가장 오래된 메시지보다 이전 시각 → 더 오래된 기록이 필요함
+            return None
+        return [entry for entry in entries if entry[1] > after_time]
+
+    def _locate_after(self, channel, message_id, after_time, limit):
+        # 디스크 색인에서 기준점 이후 최대 limit개 기록의 (path, offset) 목록, 기준점을 찾지 못하면 None
+        logged = self._log_index.get(channel)
+        if not logged:
+            return None
+        if message_id is not None:
+            found = self._id_index.get(message_id)
+            if found is None or found[0] != channel:
+                return None
+            start = bisect.bisect_right(logged, (found[1], float("inf")))
+        else:
+            # seq 순서 = 저장 순서이므로 시각도 (거의) 오름차순 → after_time보다 늦은 첫 항목을 이분 탐색
+            start, end = 0, len(logged)
+            while start < end:
+                middle = (start + end) // 2
+                if logged[middle][1] <= after_time:
+                    start = middle + 1
+                else:
+                    end = middle
+        return [(path, offset) for _, _, path, offset in logged[start:start + limit]]
+
+    def channels(self):
+        with self._lock:
+            return list(self._channels)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "messages": sum(len(buffer) for buffer in self._channels.values()),
+                "last_seq": self._seq,
+                "segment_bytes": self._segment_size,
+                "indexed_messages": len(self._id_index),
+            }
+
+    # ---- 3. 세그먼트 로그 ----
+    def _segment_paths(self):
+        # 세그먼트 파일 경로 목록 (파일명에 첫 seq가 들어 있어 이름순 = 기록순)
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _write(self, channel, entry):
+        seq, stored_at, packet = entry
+        if self._segment is None or self._segment_size >= self.segment_max_bytes:
+            self._rotate(seq)
+        # 키 순서를 고정해 두면 디스크 조회 시 JSON 파싱 없이 채널 문자열로 먼저 거를 수 있음
+        line = json.dumps({"seq": seq, "ts": stored_at, "channel": channel, "packet": packet},
+                          ensure_ascii=False).encode("utf-8") + b"\n"
+        self._index(channel, seq, stored_at, packet, self._segment_path, self._segment_size)
+        self._segment.write(line)
+        self._segment.flush()
+        if FSYNC_ON_APPEND:
+            os.fsync(self._segment.fileno())
+        self._segment_size += len(line)
+
+    def _rotate(self, first_seq):
+        # 새 세그먼트 파일을 열고, 보관 개수를 넘는 오래된 세그먼트 삭제
+        if self._segment is not None:
+            self._segment.close()
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{first_seq:012d}{SEGMENT_SUFFIX}")
+        self._segment = open(path, "ab")
+        self._segment_path = path
+        self._segment_size = self._segment.tell()
+
+        paths = self._segment_paths()
+        removed = set(paths[:max(0, len(paths) - self.segment_retention)])
+        for old_path in removed:
+            os.remove(old_path)
+        if removed:
+            self._drop_index(removed)
+
+    def _index(self, channel, seq, stored_at, packet, path, offset):
+        self._log_index.setdefault(channel, []).append((seq, stored_at, path, offset))
+        self._id_index[packet["header"]["message_id"]] = (channel, seq)
+
+    def _drop_index(self, removed_paths):
+        # 삭제된 세그먼트의 색인 항목 제거 (오래된 세그먼트부터 지우므로 채널마다 앞부분만 잘라 냄)
+        cutoff = {}
+        for channel, logged in list(self._log_index.items()):
+            keep = 0
+            while keep < len(logged) and logged[keep][2] in removed_paths:
+                keep += 1
+            if keep:
+                cutoff[channel] = logged[keep - 1][0]
+                if keep == len(logged):
+                    del self._log_index[channel]
+                else:
+                    self._log_index[channel] = logged[keep:]
+        if cutoff:
+            self._id_index = {
+                message_id: (channel, seq) for message_id, (channel, seq) in self._id_index.items()
+                if seq > cutoff.get(channel, 0)
+            }
+
+    @staticmethod
+    def _iter_segment(path):
+        # 세그먼트 파일의 (줄 시작 위치, 기록)을 차례로 반환 (mmap으로 읽어 줄 단위 복사 최소화)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            # 읽는 사이에 보관 기간이 지나 삭제된 세그먼트
+            return
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while True:
+                    offset = data.tell()
+                    line = data.readline()
+                    if not line:
+                        break
+                    try:
+                        yield offset, json.loads(line)
+                    except ValueError:
+                        # 비정상 종료로 마지막 줄이 잘린 경우
+                        continue
+
+    @staticmethod
+    def _read_locations(locations):
+        # 색인에서 찾은 (path, offset) 위치의 기록만 읽어 패킷 목록으로 반환
+        packets = []
+        handle, handle_path = None, None
+        try:
+            for path, offset in locations:
+                if path != handle_path:
+                    if handle is not None:
+                        handle.close()
+                    handle_path = path
+                    try:
+                        handle = open(path, "rb")
+                    except FileNotFoundError:
+                        # 읽는 사이에 보관 기간이 지나 삭제된 세그먼트
+                        handle = None
+                if handle is None:
+                    continue
+                handle.seek(offset)
+                try:
+                    packets.append(json.loads(handle.readline())["packet"])
+                except ValueError:
+                    continue
+        finally:
+            if handle is not None:
+                handle.close()
+        return packets
+
+    def _replay(self):
+        # 재시작 시 세그먼트 로그를 읽어 채널별 링 버퍼와 디스크 색인을 복원 (링 버퍼는 채널마다 마지막 N개만 남음)
+        for path in self._segment_paths():
+            for offset, record in self._iter_segment(path):
+                self._buffer(record["channel"]).append((record["seq"], record["ts"], record["packet"]))
+                self._index(record["channel"], record["seq"], record["ts"], record["packet"], path, offset)
+                self._seq = max(self._seq, record["seq"])
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
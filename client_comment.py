@@ -7,14 +7,16 @@ import json
 # 서버 기본 주소 설정
 SERVER_BASE_URL = "http://127.0.0.1:5000"
 
-def create_comment_client(post_id, access_token, body):
-    # 댓글 생성 API 호출
+def create_comment_client(post_id, access_token, body, parent_comment_id=None):
+    # 댓글 생성 API 호출 (parent_comment_id를 주면 해당 댓글의 답글로 작성)
     url = f"{SERVER_BASE_URL}/api/posts/{post_id}/comments"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json"
     }
     payload = {"body": body}
+    if parent_comment_id is not None:
+        payload["parent_comment_id"] = parent_comment_id
     
     try:
         response = requests.post(url, headers=headers, json=payload)
@@ -23,16 +25,35 @@ def create_comment_client(post_id, access_token, body):
         print(f"[오류] 댓글 생성 요청 중 예외 발생: {e}")
         return None
 
-def get_comments_client(post_id):
+def get_comments_client(post_id, limit=None, cursor=None, replies=False):
     # 댓글 목록 조회 API 호출 (인증 불필요)
+    # cursor: 이전 응답의 next_cursor, replies=True면 답글 트리 포함
     url = f"{SERVER_BASE_URL}/api/posts/{post_id}/comments"
+    params = {}
+    if limit is not None:
+        params["limit"] = limit
+    if cursor:
+        params["cursor"] = cursor
+    if replies:
+        params["replies"] = 1
     
     try:
-        response = requests.get(url)
+        response = requests.get(url, params=params)
         return response.json()
     except Exception as e:
         print(f"[오류] 댓글 조회 요청 중 예외 발생: {e}")
         return None
+
+def get_comment_thread_client(comment_id):
+    # 댓글 하나와 모든 답글(트리) 조회 API 호출 (인증 불필요)
+    url = f"{SERVER_BASE_URL}/api/comments/{comment_id}/thread"
+    
+    try:
+        response = requests.get(url)
+        return response.json()
+    except Exception as e:
+        print(f"[오류] 댓글 스레드 조회 요청 중 예외 발생: {e}")
+        return None
         
 def update_comment_client(comment_id, access_token, new_body):
     # 댓글 수정 API 호출
@@ -45,20 +45,28 @@ def create_post_client(post_data, access_token):
     return None
 
 # -------------------------- 2. 게시글 목록 조회 (Read - List) --------------------------
-# 공개 게시글 전체 목록을 조회
-def get_all_posts_client():
+# 공개 게시글 목록을 한 페이지씩 조회
+# limit: 페이지 크기 (None이면 서버 기본값)
+# cursor: 이전 페이지 응답의 next_cursor (첫 페이지는 None)
+def get_all_posts_client(limit=None, cursor=None):
     # API 엔드포인트 URL
     url = f"{SERVER_BASE_URL}/api/posts"
+
+    params = {}
+    if limit is not None:
+        params["limit"] = limit
+    if cursor:
+        params["cursor"] = cursor
     
-    print("\n[CLIENT] 게시글 전체 목록 조회 요청 시도")
+    print("\n[CLIENT] 게시글 목록 조회 요청 시도" + (" (다음 페이지)" if cursor else ""))
     try:
         # 서버에 GET 요청 전송 (인증 불필요)
-        response = requests.get(url)
+        response = requests.get(url, params=params)
         response_data = response.json()
         
         print(f"[서버 응답] 상태 코드: {response.status_code}")
         # 목록 데이터가 크므로 응답 내용은 생략하고 요약 정보만 출력
-        print(f"[서버 응답] 내용: 게시글 {response_data.get('total_posts', 0)}개 조회")
+        print(f"[서버 응답] 내용: 게시글 {response_data.get('total_posts', 0)}개 조회 (다음 페이지: {response_data.get('has_more', False)})")
         
         # 성공 시 응답 데이터 반환
         if response.status_code == 200:
@@ -71,6 +79,20 @@ def get_all_posts_client():
         
     return None
 
+# 모든 공개 게시글을 페이지 단위로 순회하는 제너레이터
+# 서버의 next_cursor를 따라가며 페이지가 끝나거나 요청이 실패하면 종료
+def iter_all_posts_client(limit=None):
+    cursor = None
+    while True:
+        page = get_all_posts_client(limit=limit, cursor=cursor)
+        if not page:
+            return
+        for post in page.get("posts", []):
+            yield post
+        cursor = page.get("next_cursor")
+        if not cursor:
+            return
+
 # -------------------------- 3. 게시글 상세 조회 (Read - Detail) --------------------------
 # post_id: 조회할 게시글 ID
 def get_post_detail_client(post_id, access_token=None):
@@ -0,0 +1,192 @@
+# counter_buffer.py
+# posts 테이블의 카운터 컬럼(view_count, like_count, comment_count) 증가분을 메모리에 모아 두었다가
+# 일정 주기 또는 일정 개수가 쌓이면 한 번의 다중 행 UPDATE로 반영하는 모듈 (write-behind)
+# 조회 요청마다 UPDATE + COMMIT을 실행하면 가장 많이 호출되는 읽기 경로가 행 잠금 쓰기가 되고,
+# 좋아요/댓글이 몰리는 게시글은 같은 posts 행의 잠금을 두고 요청끼리 경합하기 때문
+# 버퍼에 있다가 유실된 증가분(비정상 종료 등)은 reconcile_counters.py가 실제 행 수로 다시 맞춤
+# 카운터와 함께 인기 점수(posts.hot_score)도 hot_feed.HOT_WEIGHTS만큼 같은 UPDATE에서 증감
+
+import atexit
+import threading
+import mysql.connector
+from db_utils import get_connection, close_connection
+from hot_feed import HOT_WEIGHTS
+
+# -------------------------- 설정 --------------------------
+# 일관성 모드
+# - "sync": 예전처럼 요청마다 즉시 UPDATE 후 COMMIT (DB 값이 항상 최신)
+# - "buffered": 메모리에 모았다가 주기적으로 일괄 반영 (서버가 비정상 종료되면 마지막 주기분 유실 가능)
+CONSISTENCY_MODE = "buffered"
+FLUSH_INTERVAL = 5.0     # 주기적 반영 간격(초)
+FLUSH_THRESHOLD = 500    # 쌓인 증가분 합계가 이 값 이상이면 주기를 기다리지 않고 반영
+FLUSH_BATCH_SIZE = 500   # UPDATE 한 번에 묶을 최대 게시글 수
+
+
+class CounterBuffer:
+    # post_id별 증가분을 누적했다가 flush() 시
+    # UPDATE posts SET <column> = <column> + CASE post_id WHEN .. THEN .. END WHERE post_id IN (..)
+    # 형태로 반영함 (hot_weight가 있으면 hot_score도 증가분 * hot_weight만큼 함께 갱신, 0 미만으로는 내려가지 않음)
+
+    def __init__(self, column, mode=None, flush_interval=FLUSH_INTERVAL, flush_threshold=FLUSH_THRESHOLD,
+                 hot_weight=0):
+        self.column = column
+        self.hot_weight = hot_weight
+        self.mode = mode or CONSISTENCY_MODE
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # flush는 한 번에 하나만 실행
+        self._pending = {}      # {post_id: 아직 반영하지 않은 증가분}
+        self._in_flight = {}    # {post_id: 현재 flush 중인 증가분} - 반영 중에도 pending()이 정확하도록 유지
+        self._pending_total = 0
+        self._listeners = []
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stats = {"increments": 0, "flushes": 0, "rows_flushed": 0, "flush_errors": 0}
+
+    @property
+    def buffered(self):
+        return self.mode == "buffered"
+
+    # -------------------------- 증가분 기록 --------------------------
+    def add(self, post_id, delta=1):
+        # 증가분을 메모리에 누적 (DB 접근 없음)
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + delta
+            self._pending_total += abs(delta)
+            self._stats["increments"] += 1
+            over_threshold = self._pending_total >= self.flush_threshold
+        self._ensure_started()
+        if over_threshold:
+            self._wakeup.set()
+
+    def pending(self, post_id):
+        # 아직 DB에 반영되지 않은 증가분 (응답 값 보정용)
+        with self._lock:
+            return self._pending.get(post_id, 0) + self._in_flight.get(post_id, 0)
+
+    def add_flush_listener(self, callback):
+        # flush 성공 후 반영된 post_id 목록을 받아 호출될 콜백 등록 (캐시 무효화 등)
+        self._listeners.append(callback)
+
+    def increment_now(self, cursor, post_id, delta=1):
+        # sync 모드용: 호출한 쪽의 트랜잭션 안에서 바로 UPDATE (커밋/롤백은 호출한 쪽에서)
+        cursor.execute(
+            f"UPDATE posts SET {self.column} = {self.column} + %s{self._hot_assignment('%s')} WHERE post_id = %s",
+            (delta, *self._hot_params([delta]), post_id),
+        )
+
+    def _hot_assignment(self, delta_sql):
+        # SET 절에 붙일 hot_score 갱신식 (가중치가 없으면 빈 문자열)
+        if not self.hot_weight:
+            return ""
+        return f", hot_score = GREATEST(hot_score + %s * ({delta_sql}), 0)"
+
+    def _hot_params(self, delta_params):
+        return [self.hot_weight, *delta_params] if self.hot_weight else []
+
+    # -------------------------- 일괄 반영 --------------------------
+    def flush(self):
+        # 쌓인 증가분을 DB에 반영하고 반영한 게시글 수를 반환
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                self._in_flight = batch
+                self._pending = {}
+                self._pending_total = 0
+
+            flushed = self._write(batch)
+
+            with self._lock:
+                self._in_flight = {}
+                if not flushed:
+                    # 반영 실패 시 다음 주기에 다시 시도하도록 되돌려 놓음
+                    for post_id, delta in batch.items():
+                        self._pending[post_id] = self._pending.get(post_id, 0) + delta
+                        self._pending_total += abs(delta)
+                    self._stats["flush_errors"] += 1
+                    return 0
+                self._stats["flushes"] += 1
+                self._stats["rows_flushed"] += len(batch)
+
+        post_ids = list(batch)
+        for callback in self._listeners:
+            try:
+                callback(post_ids)
+            except Exception as e:
+                print(f"[{self.column}] flush 콜백 오류: {e}")
+        return len(batch)
+
+    def _write(self, batch):
+        conn = get_connection()
+        if not conn:
+            return False
+        try:
+            cursor = conn.cursor()
+            items = [(post_id, delta) for post_id, delta in batch.items() if delta]
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                chunk = items[start:start + FLUSH_BATCH_SIZE]
+                cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+                placeholders = ", ".join(["%s"] * len(chunk))
+                case_sql = f"CASE post_id {cases} ELSE 0 END"
+                update_query = (
+                    f"UPDATE posts SET {self.column} = {self.column} + {case_sql}{self._hot_assignment(case_sql)} "
+                    f"WHERE post_id IN ({placeholders})"
+                )
+                case_params = [value for pair in chunk for value in pair]
+                params = case_params + self._hot_params(case_params) + [post_id for post_id, _ in chunk]
+                cursor.execute(update_query, params)
+            conn.commit()
+            return True
+        except mysql.connector.Error as e:
+            conn.rollback()
+            print(f"[{self.column}] 일괄 반영 중 DB 오류: {e}")
+            return False
+        finally:
+            close_connection(conn)
+
+    # -------------------------- 백그라운드 반영 스레드 --------------------------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"flush-{self.column}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stop(self):
+        # 백그라운드 스레드를 멈추고 남은 증가분을 반영 (서버 종료 시)
+        self._stopped.set()
+        self._wakeup.set()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"column": self.column, "mode": self.mode, "pending_posts": len(self._pending)})
+        return stats
+
+
+# 조회수 버퍼 (server_posts.get_post_detail에서 사용)
+view_counts = CounterBuffer("view_count", hot_weight=HOT_WEIGHTS["view_count"])
+# 좋아요 수 버퍼 (server_like.toggle_post_like에서 사용, post_likes 행 변경은 즉시 커밋)
+like_counts = CounterBuffer("like_count", hot_weight=HOT_WEIGHTS["like_count"])
+# 댓글 수 버퍼 (server_comment 댓글 작성/삭제에서 사용)
+comment_counts = CounterBuffer("comment_count", hot_weight=HOT_WEIGHTS["comment_count"])
+
+COUNTER_BUFFERS = (view_counts, like_counts, comment_counts)
+
+# 프로세스 종료 시 남은 증가분 반영
+for _buffer in COUNTER_BUFFERS:
+    atexit.register(_buffer.stop)
@@ -1,11 +1,226 @@
 # db_utils.py
 # DB 연결 및 종료를 위한 유틸리티 함수들
+# 매 요청마다 새 연결을 맺으면 TCP + 인증 핸드셰이크 비용이 들기 때문에
+# 커넥션 풀(ConnectionPool)에서 연결을 빌려주고 돌려받는 방식으로 재사용함.
+# CRUD 모듈들은 기존처럼 get_connection() / close_connection()만 호출하면 됨.
 
+import threading
+import time
 import mysql.connector
 from db_config import DB_CONFIG # DB 접속 정보 불러오기
 
+# -------------------------- 커넥션 풀 설정 --------------------------
+POOL_ENABLED = True       # False로 두면 예전처럼 매번 새 연결을 생성 (벤치마크 비교용)
+POOL_SIZE = 10            # 풀이 동시에 유지하는 최대 연결 수
+POOL_WAIT_TIMEOUT = 5.0   # 풀이 가득 찼을 때 빈 연결을 기다리는 최대 시간(초)
+POOL_MAX_LIFETIME = 1800  # 연결 최대 수명(초), 넘으면 반납 시 폐기 후 새로 생성
+POOL_PING_INTERVAL = 30   # 이 시간(초) 이상 쉬었던 연결은 대여 전에 ping으로 상태 확인
+
+
+class ConnectionPool:
+    # 크기가 제한된 MySQL 커넥션 풀
+    # - 대여(acquire) 시 오래 쉰 연결은 ping으로 상태 확인, 죽은 연결은 폐기
+    # - 반납(release) 시 열린 트랜잭션은 롤백, 수명이 지난 연결은 폐기
+    # - 풀이 가득 차면 wait_timeout 동안 대기 후 실패
+
+    def __init__(self, name, config, size=POOL_SIZE, wait_timeout=POOL_WAIT_TIMEOUT,
+                 max_lifetime=POOL_MAX_LIFETIME, ping_interval=POOL_PING_INTERVAL):
+        self.name = name
+        self.config = dict(config)
+        self.size = size
+        self.wait_timeout = wait_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = []        # [(conn, created_at, last_used)] - 마지막 반납 연결부터 재사용 (LIFO)
+        self._in_use = {}      # {id(conn): created_at}
+        self._open_count = 0   # 현재 열려 있는 연결 수 (idle + in_use + 생성 중)
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "recycled": 0,
+            "connect_errors": 0,
+        }
+
+    # -------------------------- 연결 대여 --------------------------
+    def acquire(self, timeout=None):
+        # 풀에서 연결을 하나 빌려옴, 실패(시간 초과/연결 오류) 시 None 반환
+        timeout = self.wait_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        wait_started = None
+
+        while True:
+            with self._cond:
+                while not self._idle and self._open_count >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        return None
+                    if not waited:
+                        waited = True
+                        wait_started = time.monotonic()
+                        self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+
+                if waited:
+                    self._stats["wait_time_total"] += time.monotonic() - wait_started
+                    waited = False
+
+                if self._idle:
+                    conn, created_at, last_used = self._idle.pop()
+                else:
+                    # 빈 자리를 먼저 예약한 뒤 락 밖에서 연결 생성
+                    self._open_count += 1
+                    conn = None
+
+            if conn is None:
+                conn = self._connect()
+                if conn is None:
+                    return None
+                created_at = time.monotonic()
+            elif not self._is_healthy(conn, created_at, last_used):
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._in_use[id(conn)] = created_at
+                self._stats["checkouts"] += 1
+            return conn
+
+    def _connect(self):
+        try:
+            conn = mysql.connector.connect(**self.config)
+        except mysql.connector.Error as e:
+            print(f"DB 연결 오류: {e}")
+            with self._cond:
+                self._open_count -= 1
+                self._stats["connect_errors"] += 1
+                self._cond.notify()
+            return None
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _is_healthy(self, conn, created_at, last_used):
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            with self._cond:
+                self._stats["recycled"] += 1
+            return False
+        if now - last_used >= self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except mysql.connector.Error:
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                return False
+        return True
+
+    # -------------------------- 연결 반납 --------------------------
+    def release(self, conn):
+        # 빌려준 연결을 풀에 돌려놓음 (풀 소속이 아니면 그냥 닫음)
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+        if created_at is None:
+            _close_quietly(conn)
+            return
+
+        try:
+            # 읽지 않은 결과나 열린 트랜잭션이 남아 있으면 정리 (다음 사용자가 오래된 스냅샷을 보지 않도록)
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error:
+            self._discard(conn)
+            return
+
+        if self.max_lifetime and time.monotonic() - created_at > self.max_lifetime:
+            with self._cond:
+                self._stats["recycled"] += 1
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        _close_quietly(conn)
+        with self._cond:
+            self._open_count -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def close_all(self):
+        # 쉬고 있는 연결을 모두 닫음 (서버 종료 시 호출)
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "name": self.name,
+                "size": self.size,
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+            })
+        return stats
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except mysql.connector.Error:
+        pass
+
+
+# -------------------------- 풀 관리 --------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(name="default", config=None):
+    # 이름별 커넥션 풀을 반환 (없으면 생성)
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ConnectionPool(name, config or DB_CONFIG)
+            _pools[name] = pool
+        return pool
+
+def get_pool_stats():
+    # 풀별 통계 (생성/폐기/대여/대기/시간 초과 횟수 등) 반환
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+# -------------------------- 기존 인터페이스 --------------------------
 def get_connection():
     #DB 연결 객체를 반환
+    if POOL_ENABLED:
+        conn = get_pool().acquire()
+        if conn is None:
+            print("DB 연결 오류: 커넥션 풀에서 연결을 가져오지 못했습니다.")
+        return conn
+
     try:
         # DB_CONFIG 정보를 풀어 연결 함수에 전달
         conn = mysql.connector.connect(**DB_CONFIG)
@@ -16,6 +231,10 @@ def get_connection():
         return None
 
 def close_connection(conn):
-    #DB 연결을 안전하게 종료
-    if conn and conn.is_connected():
-        conn.close()
\ No newline at end of file
+    #DB 연결을 안전하게 종료 (풀에서 빌린 연결이면 풀에 반납)
+    if not conn:
+        return
+    if POOL_ENABLED:
+        get_pool().release(conn)
+    elif conn.is_connected():
+        conn.close()
@@ -0,0 +1,140 @@
+"""Token-budgeted chat context for AI prompts.
+
+The chat servers ``add()`` every stored chat packet here. Each message's token
+estimate and prompt line are computed once, and a per-channel window keeps
+the newest messages that fit ``budget_tokens``, sliding forward as messages
+arrive. ``build(channel)`` returns that window as a ``ChatContext`` whose
+rendered history block is reused until the channel changes, so asking the AI
+no longer copies and re-joins the channel history on every request.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, Optional, Tuple
+
+
+CONTEXT_TOKEN_BUDGET = 1024     # estimated tokens of history per prompt
+CONTEXT_MAX_MESSAGES = 50       # messages per channel window, whatever the budget
+CONTEXT_MAX_CHANNELS = 1000     # channel windows kept (least recently used dropped)
+MAX_MESSAGE_TOKENS = 256        # longer messages are cut before entering the window
+
+HISTORY_HEADER = "이전 대화:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count without a tokenizer.
+
+    About one token per 4 ASCII characters and one per Hangul/other
+    character is close enough for Gemini's tokenizer on mixed Korean chat.
+    """
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) < max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + "…"
+
+
+class ChatContext(tuple):
+    """Selected history texts (oldest first) plus their rendered prompt block."""
+
+    block: str
+    tokens: int
+
+    def __new__(cls, texts: Iterable[str] = (), block: str = "", tokens: int = 0) -> "ChatContext":
+        context = super().__new__(cls, texts)
+        context.block = block
+        context.tokens = tokens
+        return context
+
+
+EMPTY_CONTEXT = ChatContext()
+
+
+class _ChannelWindow:
+    def __init__(self) -> None:
+        self.entries: Deque[Tuple[str, str, int]] = deque()   # (text, prompt line, tokens)
+        self.tokens = 0
+        self.context: Optional[ChatContext] = None             # cached until the next add()
+
+
+class ContextBuilder:
+    """Per-channel sliding history windows under a token budget."""
+
+    def __init__(
+        self,
+        budget_tokens: int = CONTEXT_TOKEN_BUDGET,
+        max_messages: int = CONTEXT_MAX_MESSAGES,
+        max_channels: int = CONTEXT_MAX_CHANNELS,
+        max_message_tokens: int = MAX_MESSAGE_TOKENS,
+    ) -> None:
+        self.budget_tokens = budget_tokens
+        self.max_messages = max_messages
+        self.max_channels = max_channels
+        self.max_message_tokens = max_message_tokens
+        self._lock = threading.Lock()
+        self._channels: "OrderedDict[str, _ChannelWindow]" = OrderedDict()
+
+    def add(self, packet: dict) -> None:
+        """Add a stored packet; only user chat messages become context."""
+        if packet["header"].get("message_type") != "CHAT":
+            return
+        text = _truncate(packet["payload"]["body"], self.max_message_tokens)
+        entry = (text, f"- {text}\n", estimate_tokens(text))
+        with self._lock:
+            window = self._window(packet["header"]["channel"])
+            window.entries.append(entry)
+            window.tokens += entry[2]
+            while len(window.entries) > 1 and (
+                window.tokens > self.budget_tokens or len(window.entries) > self.max_messages
+            ):
+                window.tokens -= window.entries.popleft()[2]
+            window.context = None
+
+    def seed(self, packets: Iterable[dict]) -> None:
+        for packet in packets:
+            self.add(packet)
+
+    def build(self, channel: str) -> ChatContext:
+        with self._lock:
+            window = self._channels.get(channel)
+            if window is None:
+                return EMPTY_CONTEXT
+            self._channels.move_to_end(channel)
+            if window.context is None:
+                lines = [line for _, line, _ in window.entries]
+                window.context = ChatContext(
+                    (text for text, _, _ in window.entries),
+                    HISTORY_HEADER + "".join(lines) + "\n",
+                    window.tokens,
+                )
+            return window.context
+
+    def _window(self, channel: str) -> _ChannelWindow:
+        window = self._channels.get(channel)
+        if window is None:
+            window = self._channels[channel] = _ChannelWindow()
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel)
+        return window
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "messages": sum(len(window.entries) for window in self._channels.values()),
+                "tokens": sum(window.tokens for window in self._channels.values()),
+            }
@@ -0,0 +1,289 @@
+"""Background AI reply jobs for the chat servers.
+
+Model calls take seconds, so instead of calling ``ai_service.reply()`` on the
+chat receive path, callers submit a job and get the AI packet delivered back
+(tagged with ``metadata.in_reply_to``) when it is ready.
+
+- A fixed worker pool bounds concurrent upstream calls (global limit).
+- ``MAX_PENDING_JOBS`` bounds queued + running jobs; ``MAX_JOBS_PER_USER``
+  stops one user from filling the queue.
+- Duplicate submissions are merged: the same ``in_reply_to`` is ignored, and
+  the same question in the same channel while one is still pending shares
+  that job's answer.
+- Each job has a deadline; on timeout a fallback packet is delivered and the
+  late model result is discarded.
+- With ``stream=True`` the answer is also delivered while it is generated:
+  partial packets (``metadata.partial=True``, body = new text since
+  ``metadata.offset``) share the final packet's ``message_id``, so clients
+  can grow one chat entry. Only the final packet should be stored.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ai_service import AIService, ai_service, normalize_message
+from chat_protocol import build_packet
+
+
+WORKER_COUNT = 4            # concurrent model calls (global concurrency limit)
+MAX_PENDING_JOBS = 64       # queued + running jobs before new asks are rejected
+MAX_JOBS_PER_USER = 2       # queued + running jobs per user
+JOB_TIMEOUT = 30.0          # seconds from submit until a fallback answer is sent
+STREAM_REPLIES = True       # deliver partial packets while the model is generating
+STREAM_MIN_INTERVAL = 0.1   # seconds between partial packets (chunks in between are merged)
+
+TIMEOUT_MESSAGE = "AI 응답이 지연되고 있습니다. 잠시 후 다시 질문해 주세요."
+
+Deliver = Callable[[dict], None]
+
+
+class AIJobRejected(Exception):
+    """Raised by ``submit`` when a concurrency limit is reached."""
+
+
+@dataclass
+class AIJob:
+    user: str
+    channel: str
+    message: str
+    history: Sequence[str]
+    dedup_key: tuple
+    # (in_reply_to, deliver) for every ask that shares this job's answer
+    waiters: List[tuple] = field(default_factory=list)
+    created_at: float = field(default_factory=time.monotonic)
+    done: bool = False
+    timer: Optional[threading.Timer] = None
+    # streaming state: in_reply_to -> reply message_id, and text generated so far
+    reply_ids: Dict[str, str] = field(default_factory=dict)
+    parts: List[str] = field(default_factory=list)
+    streamed: int = 0           # characters already delivered as partial packets
+
+
+class AIJobQueue:
+    """Runs ``service.reply`` on a worker pool and delivers AI packets."""
+
+    def __init__(
+        self,
+        service: AIService = ai_service,
+        sender: str = "AI-Assistant",
+        workers: int = WORKER_COUNT,
+        max_pending: int = MAX_PENDING_JOBS,
+        max_per_user: int = MAX_JOBS_PER_USER,
+        timeout: float = JOB_TIMEOUT,
+        stream: bool = STREAM_REPLIES,
+        stream_interval: float = STREAM_MIN_INTERVAL,
+    ) -> None:
+        self.service = service
+        self.sender = sender
+        self.max_pending = max_pending
+        self.max_per_user = max_per_user
+        self.timeout = timeout
+        self.stream = stream and hasattr(service, "stream_reply")
+        self.stream_interval = stream_interval
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[tuple, AIJob] = {}        # dedup_key -> pending job
+        self._reply_ids: Dict[str, AIJob] = {}     # in_reply_to -> pending job
+        self._per_user: Dict[str, int] = {}
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "completed": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "partials": 0,
+            "latency_total": 0.0,
+            "first_chunk_total": 0.0,
+        }
+
+    # ---- submit ----
+    def submit(
+        self,
+        *,
+        user: str,
+        channel: str,
+        in_reply_to: str,
+        message: str,
+        history: Sequence[str],
+        deliver: Deliver,
+    ) -> bool:
+        """Queue an AI reply. Returns False if merged into an existing job.
+
+        ``deliver(packet)`` is called from a worker thread; callers on an
+        event loop should hop back with ``loop.call_soon_threadsafe``. When
+        streaming, it receives partial packets before the final one.
+        """
+        dedup_key = (channel, normalize_message(message))
+        with self._lock:
+            if in_reply_to in self._reply_ids:
+                self._stats["deduplicated"] += 1
+                return False
+
+            job = self._jobs.get(dedup_key)
+            if job is not None:
+                job.waiters.append((in_reply_to, deliver))
+                self._reply_ids[in_reply_to] = job
+                self._stats["deduplicated"] += 1
+                return False
+
+            if len(self._jobs) >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise AIJobRejected("AI 요청이 많아 잠시 후 다시 시도해 주세요.")
+            if self._per_user.get(user, 0) >= self.max_per_user:
+                self._stats["rejected"] += 1
+                raise AIJobRejected("이전 AI 질문에 대한 답변을 기다리는 중입니다.")
+
+            # tuples (e.g. ai_context.ChatContext) are immutable snapshots already
+            snapshot = history if isinstance(history, tuple) else list(history)
+            job = AIJob(user=user, channel=channel, message=message, history=snapshot, dedup_key=dedup_key)
+            job.waiters.append((in_reply_to, deliver))
+            self._jobs[dedup_key] = job
+            self._reply_ids[in_reply_to] = job
+            self._per_user[user] = self._per_user.get(user, 0) + 1
+            self._stats["submitted"] += 1
+
+        job.timer = threading.Timer(self.timeout, self._expire, args=(job,))
+        job.timer.daemon = True
+        job.timer.start()
+        self._executor.submit(self._run, job)
+        return True
+
+    # ---- worker ----
+    def _run(self, job: AIJob) -> None:
+        if job.done:
+            # timed out while still queued
+            return
+        with self._lock:
+            self._running += 1
+        try:
+            info: dict = {}
+            if self.stream:
+                text = self._run_streaming(job, info)
+            else:
+                text = self.service.reply(job.history, job.message, info)
+            # the service reports which path answered (model, local fallback, broken stream)
+            self._finish(job, text, info.get("source", "fallback"))
+        except Exception as exc:
+            with self._lock:
+                self._stats["failures"] += 1
+            self._finish(job, f"AI 응답 생성 중 문제가 발생했습니다. ({exc})", "error")
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _run_streaming(self, job: AIJob, info: dict) -> str:
+        """Collect ``service.stream_reply`` chunks, delivering partial packets."""
+        last_sent = 0.0
+        for chunk in self.service.stream_reply(job.history, job.message, info):
+            if job.done:
+                break
+            if not job.parts:
+                with self._lock:
+                    self._stats["first_chunk_total"] += time.monotonic() - job.created_at
+            job.parts.append(chunk)
+            now = time.monotonic()
+            if now - last_sent >= self.stream_interval:
+                self._deliver_partial(job)
+                last_sent = now
+        # the final packet carries the full text, so undelivered chunks need no flush
+        return "".join(job.parts)
+
+    def _deliver_partial(self, job: AIJob) -> None:
+        with self._lock:
+            if job.done:
+                return
+            text = "".join(job.parts)
+            offset, job.streamed = job.streamed, len(text)
+            waiters = list(job.waiters)
+            self._stats["partials"] += 1
+        delta = text[offset:]
+        if not delta:
+            return
+        for in_reply_to, deliver in waiters:
+            packet = self._packet(job, in_reply_to, delta, {
+                "source": "stream", "in_reply_to": in_reply_to, "partial": True, "offset": offset,
+            })
+            try:
+                deliver(packet)
+            except Exception as exc:
+                print(f"[AI JOB] 부분 응답 전달 실패: {exc}")
+
+    def _packet(self, job: AIJob, in_reply_to: str, body: str, metadata: dict) -> dict:
+        packet = build_packet(
+            sender=self.sender,
+            body=body,
+            message_type="AI",
+            channel=job.channel,
+            metadata=metadata,
+        )
+        if self.stream:
+            # every packet for the same ask shares one message_id
+            with self._lock:
+                message_id = job.reply_ids.setdefault(in_reply_to, str(uuid.uuid4()))
+            packet["header"]["message_id"] = message_id
+        return packet
+
+    def _expire(self, job: AIJob) -> None:
+        text = TIMEOUT_MESSAGE
+        if job.parts:
+            # keep what was already streamed instead of replacing it
+            text = "".join(job.parts) + "\n(" + TIMEOUT_MESSAGE + ")"
+        if self._finish(job, text, "timeout"):
+            with self._lock:
+                self._stats["timeouts"] += 1
+
+    def _finish(self, job: AIJob, text: str, source: str) -> bool:
+        """Deliver the answer once (first of result/timeout wins)."""
+        with self._lock:
+            if job.done:
+                return False
+            job.done = True
+            self._jobs.pop(job.dedup_key, None)
+            for in_reply_to, _ in job.waiters:
+                self._reply_ids.pop(in_reply_to, None)
+            remaining = self._per_user.get(job.user, 1) - 1
+            if remaining:
+                self._per_user[job.user] = remaining
+            else:
+                self._per_user.pop(job.user, None)
+            if source != "timeout":
+                self._stats["completed"] += 1
+                self._stats["latency_total"] += time.monotonic() - job.created_at
+            waiters = list(job.waiters)
+
+        if job.timer is not None:
+            job.timer.cancel()
+
+        for in_reply_to, deliver in waiters:
+            metadata = {"source": source, "in_reply_to": in_reply_to}
+            if self.stream:
+                metadata["partial"] = False
+            packet = self._packet(job, in_reply_to, text, metadata)
+            try:
+                deliver(packet)
+            except Exception as exc:
+                print(f"[AI JOB] 응답 전달 실패: {exc}")
+        return True
+
+    # ---- introspection ----
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                **{k: v for k, v in self._stats.items() if not k.endswith("_total")},
+                "pending": len(self._jobs),
+                "running": self._running,
+                "avg_latency": round(self._stats["latency_total"] / completed, 3) if completed else 0.0,
+                "avg_first_chunk": round(self._stats["first_chunk_total"] / completed, 3) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
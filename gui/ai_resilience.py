@@ -0,0 +1,150 @@
+"""Failure handling for upstream model calls.
+
+- ``CircuitBreaker``: after ``failure_threshold`` consecutive failures the
+  circuit opens and calls fail fast for ``reset_timeout`` seconds; then a
+  limited number of half-open probes decide whether it closes again.
+- ``RetryPolicy``: bounded attempts with full-jitter exponential backoff and
+  a retry budget, so retries cannot multiply load on a struggling upstream.
+- ``rule_based_reply``: the default local fallback responder.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, List
+
+
+FAILURE_THRESHOLD = 5       # consecutive failures that open the circuit
+RESET_TIMEOUT = 30.0        # seconds the circuit stays open before probing
+HALF_OPEN_PROBES = 1        # concurrent probe calls allowed while half-open
+
+MAX_ATTEMPTS = 3            # attempts per ask, including the first
+BACKOFF_BASE = 0.2          # seconds; attempt n waits up to base * 2**n
+BACKOFF_MAX = 2.0
+RETRY_BUDGET_RATIO = 0.2    # retries earned per first attempt
+RETRY_BUDGET_MAX = 10.0     # cap on saved-up retries
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+Responder = Callable[[List[str], str], str]
+
+
+def rule_based_reply(chat_history: List[str], user_message: str) -> str:
+    """Local answer used when the model cannot be reached."""
+    return (
+        "임시로 규칙 기반 답변을 제공합니다: "
+        f"'{user_message}' 에 대한 아이디어는 같은 주제를 정리해 보고 "
+        "팀원들과 프로토콜을 맞추는 것입니다."
+    )
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probes -> closed."""
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+        half_open_probes: int = HALF_OPEN_PROBES,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._stats = {"opened": 0, "short_circuited": 0, "probes": 0, "successes": 0, "failures": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go upstream now (counts a probe when half-open)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                self._stats["probes"] += 1
+                return True
+            self._stats["short_circuited"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            self._state = CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            state = self._current_state()
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._stats["opened"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._current_state(), "consecutive_failures": self._failures, **self._stats}
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter backoff and a shared retry budget."""
+
+    def __init__(
+        self,
+        max_attempts: int = MAX_ATTEMPTS,
+        base_delay: float = BACKOFF_BASE,
+        max_delay: float = BACKOFF_MAX,
+        budget_ratio: float = RETRY_BUDGET_RATIO,
+        budget_max: float = RETRY_BUDGET_MAX,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_max = budget_max
+        self._lock = threading.Lock()
+        self._budget = budget_max
+        self._stats = {"retries": 0, "budget_exhausted": 0}
+
+    def on_first_attempt(self) -> None:
+        with self._lock:
+            self._budget = min(self.budget_max, self._budget + self.budget_ratio)
+
+    def should_retry(self, attempt: int) -> bool:
+        """``attempt`` is the number of attempts already made."""
+        if attempt >= self.max_attempts:
+            return False
+        with self._lock:
+            if self._budget < 1:
+                self._stats["budget_exhausted"] += 1
+                return False
+            self._budget -= 1
+            self._stats["retries"] += 1
+            return True
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"budget": round(self._budget, 2), **self._stats}
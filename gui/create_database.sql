@@ -31,10 +31,34 @@ CREATE TABLE IF NOT EXISTS posts (
     view_count INT DEFAULT 0,
     comment_count INT DEFAULT 0,
     like_count INT DEFAULT 0,
+    -- 인기 점수: 조회/좋아요/댓글마다 가중치만큼 증가, hot_feed.py가 주기적으로 감쇠
+    hot_score DOUBLE NOT NULL DEFAULT 0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id)
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    -- 게시글 목록 키셋 페이지네이션용 복합 인덱스 (WHERE private / ORDER BY pinned, created_at, post_id)
+    INDEX idx_posts_list (private, pinned, created_at, post_id),
+    -- 인기 목록용 인덱스 (WHERE private / ORDER BY hot_score DESC, post_id DESC)
+    INDEX idx_posts_hot (private, hot_score, post_id),
+    -- 검색용 전문 검색 인덱스 (ngram 파서: 글자 2개 단위 색인, 한국어 부분 일치, MySQL 5.7.6 이상)
+    FULLTEXT INDEX ft_posts_title_body (title, body) WITH PARSER ngram
+);
+
+-- 이미 posts 테이블이 있는 DB라면 아래 문장으로 인덱스만 추가 (setup_database.py는 자동으로 처리)
+-- ALTER TABLE posts ADD INDEX idx_posts_list (private, pinned, created_at, post_id);
+-- ALTER TABLE posts ADD FULLTEXT INDEX ft_posts_title_body (title, body) WITH PARSER ngram;
+-- ALTER TABLE posts ADD COLUMN hot_score DOUBLE NOT NULL DEFAULT 0 AFTER like_count,
+--     ADD INDEX idx_posts_hot (private, hot_score, post_id);
+-- (기존 게시글 점수 계산: python hot_feed.py --rebuild)
+
+-- 인기 점수 감쇠 작업(hot_feed.py)이 마지막으로 끝난 시각과 진행 중인 감쇠의 범위/진행 위치 (한 행)
+CREATE TABLE IF NOT EXISTS hot_score_state (
+    id TINYINT PRIMARY KEY,
+    decayed_at DATETIME NOT NULL,
+    pending_until DATETIME NULL,            -- 진행 중인 감쇠가 적용하는 구간의 끝 (끝나면 decayed_at으로 옮기고 NULL)
+    pending_post_id INT NOT NULL DEFAULT 0  -- 진행 중인 감쇠가 끝낸 마지막 post_id (중단 후 다시 실행하면 이어서 처리)
 );
+INSERT IGNORE INTO hot_score_state (id, decayed_at) VALUES (1, NOW());
 
 -- 4. 댓글 테이블 생성 (comments) - posts 및 users 테이블을 참조 (1:N 관계)
 CREATE TABLE IF NOT EXISTS comments (
@@ -42,12 +66,24 @@ CREATE TABLE IF NOT EXISTS comments (
     post_id INT NOT NULL,
     user_id INT NOT NULL,
     comment_body TEXT,
+    parent_comment_id INT NULL,     -- 답글이면 부모 댓글 ID, 최상위 댓글이면 NULL
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (post_id) REFERENCES posts(post_id),
-    FOREIGN KEY (user_id) REFERENCES users(id)
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (parent_comment_id) REFERENCES comments(comment_id),
+    -- 댓글 목록 키셋 페이지네이션용 커버링 인덱스 (WHERE post_id, parent_comment_id IS NULL / ORDER BY created_at, comment_id)
+    INDEX idx_comments_post (post_id, parent_comment_id, created_at, comment_id),
+    -- 댓글 검색용 전문 검색 인덱스 (ngram 파서)
+    FULLTEXT INDEX ft_comments_body (comment_body) WITH PARSER ngram
 );
 
+-- 이미 comments 테이블이 있는 DB라면 아래 문장으로 컬럼과 인덱스만 추가 (setup_database.py는 자동으로 처리)
+-- ALTER TABLE comments ADD COLUMN parent_comment_id INT NULL AFTER comment_body,
+--     ADD FOREIGN KEY (parent_comment_id) REFERENCES comments(comment_id);
+-- ALTER TABLE comments ADD INDEX idx_comments_post (post_id, parent_comment_id, created_at, comment_id);
+-- ALTER TABLE comments ADD FULLTEXT INDEX ft_comments_body (comment_body) WITH PARSER ngram;
+
 -- 5. 좋아요 테이블 생성 (post_likes) - users 및 posts 테이블을 참조
 CREATE TABLE IF NOT EXISTS post_likes (
     user_id INT NOT NULL,
@@ -57,6 +93,40 @@ CREATE TABLE IF NOT EXISTS post_likes (
     FOREIGN KEY (post_id) REFERENCES posts(post_id)
 );
 
+-- 6. 좋아요 토글 프로시저 (sp_toggle_post_like_v2)
+-- 한 번의 CALL로 좋아요/취소를 결정 (SELECT COUNT(*) 왕복 없음)
+-- INSERT IGNORE가 (user_id, post_id) 기본키에 막히면(ROW_COUNT() = 0) 이미 좋아요 상태이므로 삭제
+-- like_count는 posts 행 잠금 경합을 줄이기 위해 서버(counter_buffer)가 모아서 일괄 반영
+-- (like_count를 직접 갱신하던 이전 sp_toggle_post_like와 구분하려고 _v2 이름 사용 - 이전 프로시저가 남은 DB에서
+--  좋아요가 두 번 세어지지 않음)
+-- 게시글 행을 먼저 FOR UPDATE로 잠가서, post_likes 삽입의 외래키 S 잠금 뒤에 posts UPDATE의 X 잠금을 요청하며
+-- 같은 게시글을 동시에 좋아요하는 요청끼리 교착 상태가 되는 일을 막음 (게시글 존재 확인도 함께 처리)
+-- 결과: (action, 저장된 like_count) - 게시글이 없으면 ('NONE', NULL)
+DROP PROCEDURE IF EXISTS sp_toggle_post_like_v2;
+DELIMITER $$
+CREATE PROCEDURE sp_toggle_post_like_v2(IN p_user_id INT, IN p_post_id INT)
+BEGIN
+    DECLARE v_action VARCHAR(10) DEFAULT 'NONE';
+    DECLARE v_found INT DEFAULT 0;
+    DECLARE v_like_count INT DEFAULT NULL;
+
+    SELECT 1, like_count INTO v_found, v_like_count FROM posts WHERE post_id = p_post_id FOR UPDATE;
+    IF v_found = 1 THEN
+        INSERT IGNORE INTO post_likes (user_id, post_id) VALUES (p_user_id, p_post_id);
+        IF ROW_COUNT() = 1 THEN
+            SET v_action = 'LIKE';
+        ELSE
+            DELETE FROM post_likes WHERE user_id = p_user_id AND post_id = p_post_id;
+            IF ROW_COUNT() = 1 THEN
+                SET v_action = 'UNLIKE';
+            END IF;
+        END IF;
+    END IF;
+
+    SELECT v_action, v_like_count;
+END$$
+DELIMITER ;
+
 
 
 
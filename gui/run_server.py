@@ -2,7 +2,7 @@
 # 웹 서버를 실행하고 DB 연결 상태를 확인하는 스크립트
 
 import sys
-from db_utils import get_connection
+from db_utils import get_connection, close_connection
 
 def check_db_connection():
     """DB 연결 상태를 확인합니다."""
@@ -13,7 +13,7 @@ def check_db_connection():
     conn = get_connection()
     if conn:
         print("✅ DB 연결 성공!")
-        conn.close()
+        close_connection(conn)
         return True
     else:
         print("❌ DB 연결 실패")
@@ -1,25 +1,34 @@
 # server_API.py
 # 서버 API 모듈
 
+import json
 import os
-from collections import deque
+import queue
+import threading
 
 from flask import (
     Flask,
+    Response,
     jsonify,
     redirect,
     render_template,
     request,
     session,
+    stream_with_context,
     url_for,
 )
 
 from ai_service import ai_service
-from chat_protocol import ProtocolError, build_packet, validate_packet
+from ai_jobs import AIJobQueue, AIJobRejected
+from ai_context import ContextBuilder
+from chat_protocol import DEFAULT_CHANNEL, ProtocolError, validate_packet
+from chat_history_store import ChatHistoryStore
 from server_login_register import login_user, register_user
-from server_comment import create_comment, get_comments_by_post, update_comment, delete_comment
-from server_posts import create_post, get_posts, get_post, update_post, delete_post
-from server_like import toggle_like, get_like_count, check_user_liked
+from rate_limiter import login_limiter, register_limiter, too_many_requests
+from server_comment import create_comment, get_comments_by_post, update_comment, delete_comment, DEFAULT_COMMENT_PAGE_SIZE
+from server_posts import create_post, get_posts, get_post, get_hot_posts, update_post, delete_post, DEFAULT_PAGE_SIZE
+from server_like import toggle_like, get_like_count, check_user_liked, get_liked_post_ids
+from server_search import search, DEFAULT_SEARCH_PAGE_SIZE
 
 # Flask 애플리케이션 초기화
 community_API = Flask(__name__)
@@ -29,7 +38,86 @@ community_API.config.update(
     SESSION_COOKIE_SAMESITE="Lax",
 )
 
-chat_history = deque(maxlen=200)
+# 채널별 최근 200개 메시지 + 디스크 세그먼트 로그 (서버 재시작 후에도 히스토리 유지)
+chat_history = ChatHistoryStore(
+    os.getenv("CHAT_HISTORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_history")),
+    max_per_channel=200,
+)
+
+# AI 프롬프트용 채널별 대화 맥락 (토큰 예산 안의 최근 메시지만, 요청마다 전체 히스토리를 복사하지 않음)
+ai_context = ContextBuilder()
+for _channel in chat_history.channels():
+    ai_context.seed(chat_history.recent(_channel))
+
+# -------------------------- 채팅 실시간 전송 (Server-Sent Events) --------------------------
+# 브라우저가 주기적으로 전체 히스토리를 다시 받아 가는 대신, 연결을 열어 두고 새 패킷만 받음
+CHAT_REPLAY_MAX = 200       # since/Last-Event-ID로 다시 보내 주는 최대 메시지 수
+SSE_QUEUE_SIZE = 256        # 구독자별 대기 패킷 수 (넘치면 연결을 끊고, 브라우저가 Last-Event-ID로 재접속해 이어 받음)
+SSE_KEEPALIVE = 15          # 보낼 패킷이 없을 때 연결 유지용 주석을 보내는 간격(초)
+SSE_MAX_SUBSCRIBERS = 500   # 동시 구독 최대 수 (구독마다 요청 스레드 하나를 점유하므로 제한)
+SSE_RETRY_MS = 3000         # 연결이 끊기면 브라우저가 재접속하기까지 기다리는 시간
+
+_chat_subscribers = {}      # {channel: set(queue.Queue)}
+_chat_subscribers_lock = threading.Lock()
+_chat_subscriber_count = 0
+
+
+def _subscribe_chat(channel):
+    # 채널 구독 큐 생성 (구독 수 한도 초과 시 None)
+    global _chat_subscriber_count
+    with _chat_subscribers_lock:
+        if _chat_subscriber_count >= SSE_MAX_SUBSCRIBERS:
+            return None
+        subscriber = queue.Queue()  # 크기 제한은 _publish_chat에서 확인 (종료 표시 None은 항상 넣을 수 있어야 함)
+        _chat_subscribers.setdefault(channel, set()).add(subscriber)
+        _chat_subscriber_count += 1
+        return subscriber
+
+
+def _unsubscribe_chat(channel, subscriber):
+    global _chat_subscriber_count
+    with _chat_subscribers_lock:
+        subscribers = _chat_subscribers.get(channel)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del _chat_subscribers[channel]
+        _chat_subscriber_count -= 1
+
+
+def _publish_chat(packet):
+    # 채널 구독자 큐에 패킷을 넣음 (요청 스레드를 막지 않도록 넣을 수 없는 구독자는 끊음)
+    with _chat_subscribers_lock:
+        subscribers = list(_chat_subscribers.get(packet["header"]["channel"], ()))
+    for subscriber in subscribers:
+        if subscriber.qsize() >= SSE_QUEUE_SIZE:
+            # 따라오지 못하는 구독자: 구독 해제 후 종료 표시 (재접속 시 Last-Event-ID로 놓친 패킷 복구)
+            _unsubscribe_chat(packet["header"]["channel"], subscriber)
+            subscriber.put(None)
+            continue
+        subscriber.put(packet)
+
+
+def _record_chat(packet):
+    # 히스토리에 저장하고 실시간 구독자에게 전송
+    # AI 스트리밍 중간 패킷(metadata.partial)은 저장하지 않고 전송만 함 (완성된 응답이 같은 message_id로 저장됨)
+    if not packet["payload"]["metadata"].get("partial"):
+        chat_history.append(packet)
+        ai_context.add(packet)
+    _publish_chat(packet)
+
+
+# AI 응답 작업 큐 - 요청 스레드는 모델 응답을 기다리지 않고, 완성된 응답은 실시간 연결(SSE)로 전달됨
+ai_jobs = AIJobQueue(ai_service, sender="AI-Community")
+
+
+def _sse_event(packet):
+    data = f"data: {json.dumps(packet, ensure_ascii=False)}\n\n"
+    if packet["payload"]["metadata"].get("partial"):
+        # 중간 패킷은 히스토리에 없으므로 Last-Event-ID로 쓰이지 않게 id를 붙이지 않음
+        return data
+    return f"id: {packet['header']['message_id']}\n" + data
 
 
 def _require_login():
@@ -91,10 +179,18 @@ def register():
             "message": "이메일 또는 비밀번호가 누락되었습니다."
         }), 400 # 400 Bad Request HTTP 상태 코드 반환
 
+    # 요청 제한 확인 (IP별/전체) - 한도를 넘으면 해싱 전에 429 Too Many Requests
+    retry_after = register_limiter.check(ip=request.remote_addr)
+    if retry_after:
+        return jsonify(too_many_requests(retry_after)), 429, {"Retry-After": str(retry_after)}
+
     # 2. login_register.py의 함수를 호출하여 DB 처리 및 로직 실행
     result = register_user(email, password)
 
     # 3. 결과를 JSON 응답으로 반환
+    if result.get("busy"):
+        # 해싱 대기열이 가득 참 → 503 + Retry-After (잠시 후 재시도)
+        return jsonify(result), 503, {"Retry-After": str(result["retry_after"])}
     if result["status"] == "SUCCESS":
         # 회원가입 성공 시 201 Created 상태 코드 반환 (REST API 표준)
         return jsonify(result), 201 
@@ -117,15 +213,26 @@ def login():
             "message": "이메일 또는 비밀번호가 누락되었습니다." 
         }), 400
     
+    # 요청 제한 확인 (IP별/계정별 실패/전체) - 한도를 넘으면 해싱 전에 429 Too Many Requests
+    retry_after = login_limiter.check(ip=request.remote_addr, email=email)
+    if retry_after:
+        return jsonify(too_many_requests(retry_after)), 429, {"Retry-After": str(retry_after)}
+
     # 2. login_register.py의 함수를 호출하여 DB 처리 및 로직 실행
     result = login_user(email, password)
 
     # 3. 결과를 JSON 응답으로 반환
+    if result.get("busy"):
+        # 해싱 대기열이 가득 참 → 503 + Retry-After (잠시 후 재시도)
+        return jsonify(result), 503, {"Retry-After": str(result["retry_after"])}
     if result["status"] == "SUCCESS":
         session["user"] = {"id": result["user_id"], "email": email}
         return jsonify(result), 200
     else:
         # 로그인 실패 시 401 Unauthorized 상태 코드 반환 (인증 실패)
+        # 계정별 실패 한도에는 비밀번호 불일치/사용자 없음만 반영 (DB 오류 등은 제외)
+        if result.get("bad_credentials"):
+            login_limiter.record_failure(email=email)
         return jsonify(result), 401 
 
 
@@ -134,7 +241,63 @@ def get_chat_history():
     user = _require_login()
     if not user:
         return jsonify({"status": "FAILURE", "message": "로그인이 필요합니다."}), 401
-    return jsonify({"status": "SUCCESS", "history": list(chat_history)})
+    channel = request.args.get("channel", DEFAULT_CHANNEL)
+    since = request.args.get("since")
+    since_time = request.args.get("since_time")
+    if since or since_time:
+        # 증분 조회: 클라이언트가 마지막으로 받은 message_id(또는 시각) 이후 패킷만 반환
+        history = chat_history.since(channel, message_id=since, timestamp=since_time, limit=CHAT_REPLAY_MAX)
+        return jsonify({"status": "SUCCESS", "history": history, "incremental": True})
+    return jsonify({"status": "SUCCESS", "history": chat_history.recent(channel), "incremental": False})
+
+
+@community_API.route("/api/chat/stream", methods=["GET"])
+def stream_chat():
+    # 새 채팅 패킷을 Server-Sent Events로 전송
+    # ?since=<message_id> 또는 Last-Event-ID 헤더(브라우저 자동 재접속)가 있으면 그 이후 패킷부터 보냄
+    user = _require_login()
+    if not user:
+        return jsonify({"status": "FAILURE", "message": "로그인이 필요합니다."}), 401
+
+    channel = request.args.get("channel", DEFAULT_CHANNEL)
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+
+    # 놓친 패킷을 읽기 전에 먼저 구독해야 그 사이에 들어온 패킷이 빠지지 않음
+    subscriber = _subscribe_chat(channel)
+    if subscriber is None:
+        return jsonify({"status": "FAILURE", "message": "실시간 연결이 너무 많습니다. 잠시 후 다시 시도하세요."}), 503
+
+    def generate():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            sent_ids = set()
+            if since:
+                for packet in chat_history.since(channel, message_id=since, limit=CHAT_REPLAY_MAX):
+                    sent_ids.add(packet["header"]["message_id"])
+                    yield _sse_event(packet)
+
+            while True:
+                try:
+                    packet = subscriber.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if packet is None:
+                    # 큐가 넘쳐 구독이 해제됨 → 연결 종료 (브라우저가 Last-Event-ID로 재접속)
+                    return
+                if packet["header"]["message_id"] in sent_ids:
+                    # 놓친 패킷 재전송과 구독 큐에 모두 들어온 패킷
+                    sent_ids.discard(packet["header"]["message_id"])
+                    continue
+                yield _sse_event(packet)
+        finally:
+            _unsubscribe_chat(channel, subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @community_API.route("/api/chat/send", methods=["POST"])
@@ -156,28 +319,32 @@ def send_chat():
     # 보안을 위해 서버 측 정보를 강제로 덮어씀
     normalized["header"]["sender"] = user["email"]
     normalized["payload"]["metadata"]["user_id"] = user["id"]
-    chat_history.append(normalized)
+    _record_chat(normalized)
 
-    ai_packet = None
+    ai_pending = False
+    ai_error = None
     if data.get("ask_ai", True):
-        ai_text = ai_service.reply(
-            [item["payload"]["body"] for item in chat_history if item["header"]["message_type"] == "CHAT"],
-            normalized["payload"]["body"],
-        )
-        ai_packet = build_packet(
-            sender="AI-Community",
-            body=ai_text,
-            message_type="AI",
-            channel=normalized["header"]["channel"],
-            metadata={"source": "openai" if ai_service.available else "fallback"},
-        )
-        chat_history.append(ai_packet)
-
+        try:
+            ai_jobs.submit(
+                user=user["email"],
+                channel=normalized["header"]["channel"],
+                in_reply_to=normalized["header"]["message_id"],
+                message=normalized["payload"]["body"],
+                history=ai_context.build(normalized["header"]["channel"]),
+                deliver=_record_chat,
+            )
+            ai_pending = True
+        except AIJobRejected as exc:
+            ai_error = str(exc)
+
+    # AI 응답은 준비되는 대로 /api/chat/stream(또는 since 조회)으로 전달됨 (metadata.in_reply_to로 질문과 연결)
     return jsonify(
         {
             "status": "SUCCESS",
             "packet": normalized,
-            "ai_packet": ai_packet,
+            "ai_packet": None,
+            "ai_pending": ai_pending,
+            "ai_error": ai_error,
         }
     )
 
@@ -203,7 +370,12 @@ def api_create_comment():
 
 @community_API.route("/api/comments/<int:post_id>", methods=["GET"])
 def api_get_comments(post_id):
-    result = get_comments_by_post(post_id)
+    # 쿼리 파라미터: limit (페이지 크기), cursor (이전 응답의 next_cursor)
+    limit = request.args.get("limit", DEFAULT_COMMENT_PAGE_SIZE, type=int)
+    cursor = request.args.get("cursor")
+    result = get_comments_by_post(post_id, limit, cursor)
+    if result["status"] == "FAILURE" and result["message"] == "잘못된 커서입니다.":
+        return jsonify(result), 400
     # 댓글이 없어도 200 반환 (SUCCESS with empty array)
     return jsonify(result), 200
 
@@ -242,12 +414,32 @@ def api_get_posts():
     result = get_posts()
     if result["status"] == "SUCCESS" and "posts" in result:
         # 각 게시글에 사용자가 좋아요했는지 정보 추가
+        # 게시글마다 조회하지 않고 페이지 전체를 한 번의 쿼리로 확인 (N+1 방지)
         user = _require_login()
         if user:
+            like_result = get_liked_post_ids(user["id"], [post["post_id"] for post in result["posts"]])
+            liked_post_ids = like_result.get("liked_post_ids", set())
             for post in result["posts"]:
                 post["is_author"] = (post["user_id"] == user["id"])
-                like_result = check_user_liked(post["post_id"], user["id"])
-                post["user_liked"] = like_result.get("liked", False)
+                post["user_liked"] = post["post_id"] in liked_post_ids
+    return jsonify(result), 200
+
+
+@community_API.route("/api/posts/hot", methods=["GET"])
+def api_get_hot_posts():
+    # 인기 게시글 목록 (hot_score 순), 쿼리 파라미터: limit (페이지 크기), cursor (이전 응답의 next_cursor)
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    cursor = request.args.get("cursor")
+    result = get_hot_posts(limit, cursor)
+    if result["status"] == "FAILURE":
+        return jsonify(result), 400 if result["message"] == "잘못된 커서입니다." else 500
+    user = _require_login()
+    if user:
+        like_result = get_liked_post_ids(user["id"], [post["post_id"] for post in result["posts"]])
+        liked_post_ids = like_result.get("liked_post_ids", set())
+        for post in result["posts"]:
+            post["is_author"] = (post["user_id"] == user["id"])
+            post["user_liked"] = post["post_id"] in liked_post_ids
     return jsonify(result), 200
 
 
@@ -308,6 +500,22 @@ def api_delete_post(post_id):
     return jsonify(result), 200 if result["status"] == "SUCCESS" else 403
 
 
+# ==================== 검색 API 엔드포인트 ====================
+
+@community_API.route("/api/search", methods=["GET"])
+def api_search():
+    # 쿼리 파라미터: q (검색어), type (all / posts / comments), limit (페이지 크기), cursor (이전 응답의 next_cursor)
+    query = request.args.get("q", "")
+    search_type = request.args.get("type", "all")
+    limit = request.args.get("limit", DEFAULT_SEARCH_PAGE_SIZE, type=int)
+    cursor = request.args.get("cursor")
+    result = search(query, search_type, limit, cursor)
+    if result["status"] == "SUCCESS":
+        return jsonify(result), 200
+    # 짧은 검색어, 잘못된 검색 종류/커서는 400, DB 오류는 500
+    return jsonify(result), 500 if result["message"].startswith("DB") else 400
+
+
 # ==================== 좋아요 API 엔드포인트 ====================
 
 @community_API.route("/api/likes/toggle", methods=["POST"])
@@ -1,10 +1,32 @@
 # server_comment.py
 # 댓글 데이터베이스 CRUD 로직을 담당하는 모듈
 
+import base64
+import json
 import mysql.connector
 from db_utils import get_connection, close_connection
+from cache_utils import post_cache
+from counter_buffer import comment_counts
+from author_names import author_names
+import server_search
 from datetime import datetime
 
+DEFAULT_COMMENT_PAGE_SIZE = 50
+MAX_COMMENT_PAGE_SIZE = 200
+
+def _stage_comment_count(cursor, post_id, delta):
+    # sync 모드: 댓글 삽입/삭제와 같은 트랜잭션에서 posts.comment_count 갱신
+    if not comment_counts.buffered:
+        comment_counts.increment_now(cursor, post_id, delta)
+
+def _commit_comment_count(post_id, delta):
+    # 커밋 후 호출: buffered 모드면 증감분을 버퍼에 모아 일괄 반영 (반영 후 캐시 무효화)
+    # sync 모드면 comment_count가 이미 바뀌었으므로 게시글 상세/목록 캐시 무효화
+    if comment_counts.buffered:
+        comment_counts.add(post_id, delta)
+    else:
+        post_cache.invalidate_post(post_id)
+
 # -------------------------- 1. 댓글 생성 (Create) --------------------------
 def create_comment(post_id, user_id, comment_body):
     conn = get_connection()
@@ -21,12 +43,14 @@ def create_comment(post_id, user_id, comment_body):
         """
         now = datetime.now()
         cursor.execute(insert_query, (post_id, user_id, comment_body, now, now))
+        new_comment_id = cursor.lastrowid
         
         # b. posts 테이블의 comment_count 증가
-        update_count_query = "UPDATE posts SET comment_count = comment_count + 1 WHERE post_id = %s"
-        cursor.execute(update_count_query, (post_id,))
+        _stage_comment_count(cursor, post_id, 1)
         
         conn.commit()
+        _commit_comment_count(post_id, 1)
+        server_search.index_comment(new_comment_id, post_id, comment_body)
         return {"status": "SUCCESS", "message": "댓글이 성공적으로 작성되었습니다."}
 
     except mysql.connector.Error as e:
@@ -36,8 +60,33 @@ def create_comment(post_id, user_id, comment_body):
     finally:
         close_connection(conn)
 
+# -------------------------- 댓글 커서 인코딩/디코딩 --------------------------
+# 마지막으로 받은 댓글의 (created_at, comment_id)를 URL-safe base64로 인코딩 (루트 server_comment와 같은 형식)
+def encode_comment_cursor(created_at, comment_id):
+    raw = json.dumps([created_at, comment_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_comment_cursor(cursor):
+    # 잘못된 커서면 None 반환
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, comment_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")
+        return created_at, int(comment_id)
+    except (ValueError, TypeError):
+        return None
+
 # -------------------------- 2. 댓글 조회 (Read) --------------------------
-def get_comments_by_post(post_id):
+# limit: 한 페이지 댓글 수, cursor: 이전 응답의 next_cursor (첫 페이지는 None)
+def get_comments_by_post(post_id, limit=DEFAULT_COMMENT_PAGE_SIZE, cursor=None):
+    limit = max(1, min(int(limit), MAX_COMMENT_PAGE_SIZE))
+
+    after = None
+    if cursor:
+        after = decode_comment_cursor(cursor)
+        if after is None:
+            return {"status": "FAILURE", "message": "잘못된 커서입니다."}
+
     conn = get_connection()
     if not conn:
         return {"status": "FAILURE", "message": "DB 연결 실패"}
@@ -45,28 +94,43 @@ def get_comments_by_post(post_id):
     try:
         cursor = conn.cursor(dictionary=True) # 딕셔너리 형태로 결과 받기
         
-        # users 테이블과 조인하여 작성자의 이름(profiles.name)을 함께 조회하는 것이 일반적
-        # 현재 profiles 테이블에 'name'을 닉네임으로 가정하고 조회
-        select_query = """
-        SELECT c.comment_id, c.comment_body, c.created_at, u.id AS user_id, p.name AS nickname
+        # 작성자 닉네임(profiles.name)은 JOIN 대신 이름 캐시(author_names)에서 페이지 단위로 채움
+        # 키셋 페이지네이션: idx_comments_post (post_id, parent_comment_id, created_at, comment_id)
+        # 인덱스 범위 스캔으로 limit + 1개만 읽음 (GUI는 답글 트리를 표시하지 않으므로 최상위 댓글만 조회)
+        where_clause = "c.post_id = %s AND c.parent_comment_id IS NULL"
+        params = [post_id]
+        if after:
+            created_at, comment_id = after
+            where_clause += " AND (c.created_at > %s OR (c.created_at = %s AND c.comment_id > %s))"
+            params += [created_at, created_at, comment_id]
+
+        select_query = f"""
+        SELECT c.comment_id, c.comment_body, c.created_at, c.user_id
         FROM comments c
-        JOIN users u ON c.user_id = u.id
-        LEFT JOIN profiles p ON u.id = p.user_id
-        WHERE c.post_id = %s
-        ORDER BY c.created_at ASC
+        WHERE {where_clause}
+        ORDER BY c.created_at ASC, c.comment_id ASC
+        LIMIT %s
         """
-        cursor.execute(select_query, (post_id,))
+        cursor.execute(select_query, (*params, limit + 1))
         comments = cursor.fetchall()
+
+        has_more = len(comments) > limit
+        comments = comments[:limit]
         
         # 댓글이 없어도 SUCCESS로 반환 (빈 배열)
         if not comments:
-            return {"status": "SUCCESS", "comments": []}
+            return {"status": "SUCCESS", "comments": [], "next_cursor": None, "has_more": False}
 
         # 날짜/시간 포맷팅
         for comment in comments:
             comment['created_at'] = comment['created_at'].strftime("%Y-%m-%d %H:%M:%S")
+        author_names.fill(cursor, comments, name_field="nickname")
+
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_comment_cursor(comments[-1]["created_at"], comments[-1]["comment_id"])
 
-        return {"status": "SUCCESS", "comments": comments}
+        return {"status": "SUCCESS", "comments": comments, "next_cursor": next_cursor, "has_more": has_more}
 
     except mysql.connector.Error as e:
         return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
@@ -84,7 +148,7 @@ def update_comment(comment_id, user_id, new_body):
         cursor = conn.cursor()
         
         # a. 권한 확인: 해당 댓글의 user_id가 요청한 user_id와 일치하는지 확인
-        check_owner_query = "SELECT user_id FROM comments WHERE comment_id = %s"
+        check_owner_query = "SELECT user_id, post_id FROM comments WHERE comment_id = %s"
         cursor.execute(check_owner_query, (comment_id,))
         result = cursor.fetchone()
 
@@ -103,6 +167,7 @@ def update_comment(comment_id, user_id, new_body):
         cursor.execute(update_query, (new_body, now, comment_id))
         
         conn.commit()
+        server_search.index_comment(comment_id, result[1], new_body)
         return {"status": "SUCCESS", "message": "댓글이 성공적으로 수정되었습니다."}
 
     except mysql.connector.Error as e:
@@ -139,10 +204,11 @@ def delete_comment(comment_id, user_id):
         cursor.execute(delete_query, (comment_id,))
         
         # c. posts 테이블의 comment_count 감소
-        update_count_query = "UPDATE posts SET comment_count = comment_count - 1 WHERE post_id = %s"
-        cursor.execute(update_count_query, (post_id,))
+        _stage_comment_count(cursor, post_id, -1)
         
         conn.commit()
+        _commit_comment_count(post_id, -1)
+        server_search.remove_comments([comment_id])
         return {"status": "SUCCESS", "message": "댓글이 성공적으로 삭제되었습니다."}
 
     except mysql.connector.Error as e:
@@ -4,6 +4,62 @@
 import mysql.connector
 from db_config import DB_CONFIG
 
+# 좋아요 토글 프로시저: INSERT IGNORE가 기본키에 막히면 이미 좋아요 상태이므로 삭제
+# like_count는 서버(counter_buffer.like_counts)가 모아서 일괄 반영하므로 여기서는 갱신하지 않음
+# (like_count를 직접 갱신하던 이전 sp_toggle_post_like와 동작이 달라 이름을 _v2로 구분 → 이전 프로시저가 남은 DB에서
+#  새 서버가 좋아요를 두 번 세지 않고, 프로시저가 없다는 오류로 바로 드러남)
+# 게시글 행을 먼저 FOR UPDATE로 잠가 외래키 S 잠금 → posts UPDATE X 잠금 순서의 교착 상태를 막음 (존재 확인 겸용)
+# 결과: (action, 저장된 like_count) - 게시글이 없으면 ('NONE', NULL)
+TOGGLE_LIKE_PROCEDURE = """
+CREATE PROCEDURE sp_toggle_post_like_v2(IN p_user_id INT, IN p_post_id INT)
+BEGIN
+    DECLARE v_action VARCHAR(10) DEFAULT 'NONE';
+    DECLARE v_found INT DEFAULT 0;
+    DECLARE v_like_count INT DEFAULT NULL;
+
+    SELECT 1, like_count INTO v_found, v_like_count FROM posts WHERE post_id = p_post_id FOR UPDATE;
+    IF v_found = 1 THEN
+        INSERT IGNORE INTO post_likes (user_id, post_id) VALUES (p_user_id, p_post_id);
+        IF ROW_COUNT() = 1 THEN
+            SET v_action = 'LIKE';
+        ELSE
+            DELETE FROM post_likes WHERE user_id = p_user_id AND post_id = p_post_id;
+            IF ROW_COUNT() = 1 THEN
+                SET v_action = 'UNLIKE';
+            END IF;
+        END IF;
+    END IF;
+
+    SELECT v_action, v_like_count;
+END
+"""
+
+def create_index_if_missing(cursor, table, index_name, columns, kind="INDEX", options=""):
+    """테이블에 인덱스가 없을 때만 생성합니다. (MySQL은 CREATE INDEX IF NOT EXISTS 미지원)
+    kind="FULLTEXT INDEX", options="WITH PARSER ngram"처럼 전문 검색 인덱스도 만들 수 있습니다."""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index_name))
+    if cursor.fetchone()[0]:
+        print(f"   - {table}.{index_name} 인덱스 이미 존재")
+        return
+    cursor.execute(f"ALTER TABLE {table} ADD {kind} {index_name} ({columns}) {options}")
+    print(f"   ✓ {table}.{index_name} 인덱스 생성 완료")
+
+def add_column_if_missing(cursor, table, column, definition):
+    """테이블에 컬럼이 없을 때만 추가합니다. 추가했으면 True를 반환합니다."""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    if cursor.fetchone()[0]:
+        print(f"   - {table}.{column} 컬럼 이미 존재")
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    print(f"   ✓ {table}.{column} 컬럼 추가 완료")
+    return True
+
 def create_database():
     """DB 스키마와 테이블을 생성합니다."""
     # 먼저 DB 없이 연결 (스키마 생성용)
@@ -66,12 +122,31 @@ def create_database():
                 view_count INT DEFAULT 0,
                 comment_count INT DEFAULT 0,
                 like_count INT DEFAULT 0,
+                hot_score DOUBLE NOT NULL DEFAULT 0,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
         """)
         print("   ✓ posts 테이블 생성 완료")
+
+        # 기존 posts 테이블에는 인기 점수 컬럼 추가 (기존 게시글 점수는 hot_feed.py --rebuild로 계산)
+        if add_column_if_missing(cursor, "posts", "hot_score", "DOUBLE NOT NULL DEFAULT 0 AFTER like_count"):
+            print("   → 기존 게시글 인기 점수 계산: python hot_feed.py --rebuild")
+
+        # 인기 점수 감쇠 작업(hot_feed.py)이 마지막으로 끝난 시각과 진행 중인 감쇠의 범위/진행 위치 (한 행)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS hot_score_state (
+                id TINYINT PRIMARY KEY,
+                decayed_at DATETIME NOT NULL,
+                pending_until DATETIME NULL,
+                pending_post_id INT NOT NULL DEFAULT 0
+            )
+        """)
+        add_column_if_missing(cursor, "hot_score_state", "pending_until", "DATETIME NULL")
+        add_column_if_missing(cursor, "hot_score_state", "pending_post_id", "INT NOT NULL DEFAULT 0")
+        cursor.execute("INSERT IGNORE INTO hot_score_state (id, decayed_at) VALUES (1, NOW())")
+        print("   ✓ hot_score_state 테이블 생성 완료")
         
         # comments 테이블
         cursor.execute("""
@@ -80,13 +155,22 @@ def create_database():
                 post_id INT NOT NULL,
                 user_id INT NOT NULL,
                 comment_body TEXT,
+                parent_comment_id INT NULL,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 FOREIGN KEY (post_id) REFERENCES posts(post_id),
-                FOREIGN KEY (user_id) REFERENCES users(id)
+                FOREIGN KEY (user_id) REFERENCES users(id),
+                FOREIGN KEY (parent_comment_id) REFERENCES comments(comment_id)
             )
         """)
         print("   ✓ comments 테이블 생성 완료")
+
+        # 기존 comments 테이블에는 답글(스레드)용 부모 댓글 컬럼과 외래 키 추가
+        if add_column_if_missing(cursor, "comments", "parent_comment_id", "INT NULL AFTER comment_body"):
+            cursor.execute("""
+                ALTER TABLE comments
+                ADD FOREIGN KEY (parent_comment_id) REFERENCES comments(comment_id)
+            """)
         
         # post_likes 테이블
         cursor.execute("""
@@ -99,6 +183,35 @@ def create_database():
             )
         """)
         print("   ✓ post_likes 테이블 생성 완료")
+
+        # 좋아요 토글 프로시저 (server_like.toggle_post_like에서 CALL 한 번으로 사용)
+        # 파이썬에서는 DELIMITER 없이 문장 단위로 실행하면 됨
+        cursor.execute("DROP PROCEDURE IF EXISTS sp_toggle_post_like_v2")
+        cursor.execute(TOGGLE_LIKE_PROCEDURE)
+        print("   ✓ sp_toggle_post_like_v2 프로시저 생성 완료")
+
+        # 인덱스 생성 (기존 DB에도 적용되도록 테이블 생성과 분리)
+        print("\n3. 인덱스 생성 중...")
+
+        # 게시글 목록 키셋 페이지네이션용: WHERE private = FALSE ORDER BY pinned, created_at, post_id
+        create_index_if_missing(cursor, "posts", "idx_posts_list", "private, pinned, created_at, post_id")
+
+        # 인기 목록용: WHERE private = FALSE ORDER BY hot_score DESC, post_id DESC LIMIT N
+        create_index_if_missing(cursor, "posts", "idx_posts_hot", "private, hot_score, post_id")
+
+        # 댓글 목록 키셋 페이지네이션용: WHERE post_id = ? AND parent_comment_id IS NULL ORDER BY created_at, comment_id
+        create_index_if_missing(cursor, "comments", "idx_comments_post", "post_id, parent_comment_id, created_at, comment_id")
+
+        # 검색용 전문 검색 인덱스: MATCH(title, body) / MATCH(comment_body) AGAINST (...)
+        # ngram 파서(MySQL 5.7.6 이상)는 띄어쓰기 대신 글자 2개 단위로 색인하므로 한국어 부분 일치 검색 가능
+        # 만들 수 없는 환경이면 경고만 출력 (server_search가 프로세스 내 검색 엔진으로 대신 검색)
+        try:
+            create_index_if_missing(cursor, "posts", "ft_posts_title_body", "title, body",
+                                    kind="FULLTEXT INDEX", options="WITH PARSER ngram")
+            create_index_if_missing(cursor, "comments", "ft_comments_body", "comment_body",
+                                    kind="FULLTEXT INDEX", options="WITH PARSER ngram")
+        except mysql.connector.Error as e:
+            print(f"   ⚠ 전문 검색 인덱스 생성 실패 (검색은 프로세스 내 엔진 사용): {e}")
         
         conn.commit()
         print("\n✅ 모든 테이블 생성 완료!")
@@ -0,0 +1,200 @@
+# hot_feed.py
+# 인기 게시글(hot feed) 점수 설정과 점수 감쇠 작업
+# - posts.hot_score = 조회/좋아요/댓글 이벤트마다 HOT_WEIGHTS만큼 더한 값을 시간이 지날수록 줄인 점수
+#   이벤트 반영은 counter_buffer가 카운터와 같은 UPDATE에서 함께 처리 (요청마다 점수를 다시 계산하지 않음)
+# - 인기 목록은 idx_posts_hot (private, hot_score, post_id) 인덱스 범위 스캔으로 상위 N개만 읽음
+#   (server_posts.get_hot_posts, 목록을 읽을 때 전체 게시글의 점수를 계산하지 않음)
+# - 감쇠: 주기적으로 점수가 있는 게시글만 0.5 ^ (지난 시간 / HOT_HALF_LIFE_HOURS)를 곱함
+#   지난 시간은 hot_score_state.decayed_at 기준이라 실행 간격이 불규칙해도 지난 시간만큼만 감쇠됨
+#   감쇠할 구간(pending_until)과 진행 위치(pending_post_id)를 기록해 두고 모든 범위가 끝난 뒤에만 decayed_at을 옮김
+#   (중간에 실패하면 다음 실행이 같은 구간을 남은 범위부터 이어서 처리, 동시 실행은 GET_LOCK으로 막음)
+# - 감쇠 후 목록 캐시 무효화는 캐시 백엔드를 공유할 때(cache_utils.CACHE_BACKEND = "redis")만 API 서버에 반영됨
+#   기본값(memory)이면 이 작업의 프로세스 안 캐시만 비우므로, API 서버의 인기 목록은 최대 CACHE_TTL초 동안 감쇠 전 점수로 보임
+#   (순서는 거의 그대로이고 감쇠 간격이 CACHE_TTL보다 훨씬 길어 허용)
+# 실행: python hot_feed.py            (cron 등으로 DECAY_INTERVAL_MINUTES마다 실행)
+#       python hot_feed.py --rebuild  (hot_score 컬럼 추가 직후 등, 현재 카운터와 작성 시각으로 점수 다시 계산)
+
+import sys
+import time
+
+import mysql.connector
+from db_utils import get_connection, close_connection
+from cache_utils import post_cache
+
+# -------------------------- 설정 --------------------------
+# 이벤트 1건당 더하는 점수 (카운터 컬럼 → 가중치)
+HOT_WEIGHTS = {
+    "view_count": 0.1,
+    "like_count": 1.0,
+    "comment_count": 2.0,
+}
+HOT_HALF_LIFE_HOURS = 12        # 점수가 절반으로 줄어드는 시간
+HOT_SCORE_FLOOR = 0.01          # 감쇠 후 이보다 작은 점수는 0으로 (이후 감쇠 대상에서 빠짐)
+DECAY_INTERVAL_MINUTES = 30     # 권장 실행 간격 (간격과 관계없이 지난 시간만큼 감쇠함)
+DECAY_CHUNK = 1000              # 한 번에 감쇠할 post_id 범위
+DECAY_LOCK_NAME = "hot_feed_decay"  # 감쇠/재계산 작업이 동시에 실행되지 않도록 잡는 MySQL 이름 잠금
+
+
+def decay_factor(elapsed_seconds):
+    # elapsed_seconds 동안의 감쇠 비율
+    return 0.5 ** (max(elapsed_seconds, 0) / (HOT_HALF_LIFE_HOURS * 3600))
+
+
+def _acquire_lock(cursor):
+    # 다른 감쇠/재계산 작업이 실행 중이면 기다리지 않고 False (잠금은 연결(세션)에 묶여 있어 같은 연결로 해제)
+    cursor.execute("SELECT GET_LOCK(%s, 0)", (DECAY_LOCK_NAME,))
+    return cursor.fetchone()[0] == 1
+
+
+def _release_lock(cursor):
+    try:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (DECAY_LOCK_NAME,))
+        cursor.fetchone()
+    except mysql.connector.Error:
+        pass  # 연결이 끊겼으면 세션 종료와 함께 잠금도 풀림
+
+
+def _claim_interval(conn):
+    # 이번에 감쇠할 구간의 길이(초)와 그 구간에서 이미 끝낸 마지막 post_id를 반환
+    # 이전 실행이 중간에 실패했으면 그 구간(pending_until)을 남은 범위부터 이어서 처리하고,
+    # 아니면 decayed_at ~ 지금을 새 구간으로 기록 (decayed_at은 모든 범위가 끝난 뒤 _finish_interval에서 옮김)
+    cursor = conn.cursor()
+    cursor.execute("SELECT TIMESTAMPDIFF(SECOND, decayed_at, pending_until), pending_post_id FROM hot_score_state WHERE id = 1")
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute("INSERT INTO hot_score_state (id, decayed_at) VALUES (1, NOW())")
+        conn.commit()
+        return 0, 0
+    elapsed, done_id = row
+    if elapsed is not None:
+        return elapsed, done_id
+    cursor.execute("UPDATE hot_score_state SET pending_until = NOW(), pending_post_id = 0 WHERE id = 1")
+    cursor.execute("SELECT TIMESTAMPDIFF(SECOND, decayed_at, pending_until) FROM hot_score_state WHERE id = 1")
+    elapsed = cursor.fetchone()[0]
+    conn.commit()
+    return elapsed, 0
+
+
+def _finish_interval(conn):
+    # 구간의 모든 범위를 감쇠한 뒤에만 마지막 감쇠 시각을 구간 끝으로 옮김
+    cursor = conn.cursor()
+    cursor.execute("""
+    UPDATE hot_score_state SET decayed_at = pending_until, pending_until = NULL, pending_post_id = 0
+    WHERE id = 1 AND pending_until IS NOT NULL
+    """)
+    conn.commit()
+
+
+def _max_post_id(cursor):
+    cursor.execute("SELECT COALESCE(MAX(post_id), 0) FROM posts")
+    return cursor.fetchone()[0]
+
+
+def decay_hot_scores(chunk_size=DECAY_CHUNK):
+    # 점수가 있는 게시글의 hot_score를 지난 시간만큼 감쇠 (post_id 범위마다 짧은 트랜잭션)
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    locked = False
+    try:
+        locked = _acquire_lock(cursor)
+        if not locked:
+            return {"status": "SUCCESS", "skipped": True, "message": "다른 감쇠 작업이 실행 중입니다."}
+
+        elapsed, done_id = _claim_interval(conn)
+        factor = decay_factor(elapsed)
+        updated = 0
+        if factor < 1:
+            last_id = _max_post_id(cursor)
+            for start in range(done_id, last_id, chunk_size):
+                # 범위 감쇠와 진행 위치 기록을 한 트랜잭션으로 (실패 후 이어서 처리해도 같은 범위를 두 번 감쇠하지 않음)
+                cursor.execute("""
+                UPDATE posts
+                SET hot_score = IF(hot_score * %s < %s, 0, hot_score * %s)
+                WHERE post_id > %s AND post_id <= %s AND hot_score > 0
+                """, (factor, HOT_SCORE_FLOOR, factor, start, start + chunk_size))
+                updated += cursor.rowcount
+                cursor.execute("UPDATE hot_score_state SET pending_post_id = %s WHERE id = 1", (start + chunk_size,))
+                conn.commit()
+            # 캐시된 인기 목록의 점수 값이 바뀌므로 목록 캐시 무효화
+            # (공유 캐시(redis)일 때만 API 서버에 반영, memory 캐시면 API 서버 목록은 CACHE_TTL 뒤 갱신)
+            post_cache.invalidate_lists()
+        _finish_interval(conn)
+
+        return {
+            "status": "SUCCESS",
+            "elapsed_seconds": elapsed,
+            "resumed_from": done_id,
+            "factor": round(factor, 6),
+            "updated_posts": updated,
+            "duration_seconds": round(time.perf_counter() - started, 2),
+        }
+
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        if locked:
+            _release_lock(cursor)
+        close_connection(conn)
+
+
+def rebuild_hot_scores(chunk_size=DECAY_CHUNK):
+    # 현재 카운터 값을 작성 시각 기준으로 감쇠한 값으로 hot_score를 다시 계산 (이벤트 시각 기록이 없으므로 근사값)
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    locked = False
+    try:
+        locked = _acquire_lock(cursor)
+        if not locked:
+            return {"status": "FAILURE", "message": "다른 감쇠 작업이 실행 중입니다. 잠시 후 다시 실행하세요."}
+        weighted = " + ".join(f"{weight} * {column}" for column, weight in HOT_WEIGHTS.items())
+        last_id = _max_post_id(cursor)
+        updated = 0
+        for start in range(0, last_id, chunk_size):
+            cursor.execute(f"""
+            UPDATE posts
+            SET hot_score = ({weighted}) * POW(0.5, TIMESTAMPDIFF(SECOND, created_at, NOW()) / %s)
+            WHERE post_id > %s AND post_id <= %s
+            """, (HOT_HALF_LIFE_HOURS * 3600, start, start + chunk_size))
+            updated += cursor.rowcount
+            conn.commit()
+        # 지금 기준으로 다시 계산했으므로 진행 중이던 감쇠 구간도 버림
+        cursor.execute("""
+        INSERT INTO hot_score_state (id, decayed_at) VALUES (1, NOW())
+        ON DUPLICATE KEY UPDATE decayed_at = NOW(), pending_until = NULL, pending_post_id = 0
+        """)
+        conn.commit()
+        # 공유 캐시(redis)일 때만 API 서버 목록도 바로 갱신됨 (memory 캐시면 CACHE_TTL 뒤)
+        post_cache.invalidate_lists()
+        return {
+            "status": "SUCCESS",
+            "updated_posts": updated,
+            "duration_seconds": round(time.perf_counter() - started, 2),
+        }
+
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        if locked:
+            _release_lock(cursor)
+        close_connection(conn)
+
+
+if __name__ == '__main__':
+    if "--rebuild" in sys.argv:
+        result = rebuild_hot_scores()
+    else:
+        result = decay_hot_scores()
+    print(result)
+    sys.exit(0 if result["status"] == "SUCCESS" else 1)
@@ -0,0 +1,182 @@
+# password_hasher.py
+# 비밀번호 해싱/검증(bcrypt)을 요청 스레드 밖의 전용 실행기에서 처리하는 모듈
+# - bcrypt 한 번은 수십~수백 ms의 CPU 작업이라 로그인이 몰리면 Flask 워커가 모두 해싱에 묶여 다른 API까지 멈춤
+# - 프로세스 풀에서 실행해 GIL 영향 없이 코어 수만큼 병렬 처리하고, 대기 작업 수를 제한해
+#   한도를 넘는 요청은 기다리게 하지 않고 바로 거절(HasherBusy → 503 + Retry-After)
+# - 해시 비용(rounds)을 바꾸면 로그인 성공 시 새 비용으로 다시 해싱해 저장 (needs_rehash)
+
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import bcrypt
+
+# -------------------------- 설정 --------------------------
+HASH_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # 작업 비용 (1 증가마다 해싱 시간 2배, flask_bcrypt 기본값 12)
+HASH_WORKERS = os.cpu_count() or 2                    # 동시에 해싱할 작업 수 (보통 코어 수)
+HASH_MAX_PENDING = HASH_WORKERS * 8                   # 실행 중 + 대기 작업 최대 수 (넘으면 HasherBusy)
+HASH_TIMEOUT = 10.0                                   # 작업 하나를 기다리는 최대 시간(초)
+HASH_USE_PROCESSES = True                             # False면 스레드 풀 사용 (bcrypt는 해싱 중 GIL을 놓으므로 스레드도 병렬 처리됨)
+BUSY_RETRY_AFTER = 1                                  # 거절 응답의 Retry-After(초)
+
+
+class HasherBusy(Exception):
+    # 대기 작업이 한도를 넘어 해싱 요청을 받을 수 없을 때
+    retry_after = BUSY_RETRY_AFTER
+
+
+# 프로세스 풀에서 실행되는 함수 (피클로 전달되므로 모듈 최상위 함수여야 함)
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check_password(password, hashed):
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        # bcrypt 형식이 아닌 해시
+        return False
+
+
+def hash_rounds(hashed):
+    # "$2b$12$..." 형식 해시의 비용 값, 해석할 수 없으면 None
+    parts = hashed.split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    # 해싱 전용 실행기 + 대기 작업 수 제한 (back-pressure)
+
+    def __init__(self, rounds=HASH_ROUNDS, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING,
+                 timeout=HASH_TIMEOUT, use_processes=HASH_USE_PROCESSES):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self._executor = None   # 첫 사용 시 생성 (import만 한 프로세스에서 워커를 띄우지 않도록)
+        self._callbacks = None  # rehash_later 완료 콜백(재해싱 결과 DB 저장)을 실행하는 스레드, 첫 사용 시 생성
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"hashes": 0, "verifies": 0, "rehashes": 0, "rejected": 0, "timeouts": 0, "max_pending": 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hasher")
+            return self._executor
+
+    def _get_callbacks(self):
+        with self._lock:
+            if self._callbacks is None:
+                self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash-save")
+            return self._callbacks
+
+    def _submit(self, func, *args):
+        # 실행기에 작업을 넣고 future 반환 (대기 작업이 한도 이상이면 바로 HasherBusy)
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise HasherBusy("로그인 요청이 많아 잠시 후 다시 시도해 주세요.")
+            self._pending += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            self._done(None)
+            raise
+        # 대기 시간을 넘겨 포기한 작업도 끝날 때까지는 대기 수에 포함 (실제로 CPU를 쓰고 있으므로)
+        future.add_done_callback(self._done)
+        return future
+
+    def _run(self, func, *args):
+        # 실행기에 작업을 넣고 결과를 기다림
+        future = self._submit(func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise HasherBusy("로그인 처리가 지연되고 있습니다. 잠시 후 다시 시도해 주세요.")
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    # -------------------------- 공개 함수 --------------------------
+    def hash(self, password, rounds=None):
+        # 새 해시 생성 (회원가입, 비밀번호 변경, 재해싱)
+        result = self._run(_hash_password, password, rounds or self.rounds)
+        with self._lock:
+            self._stats["hashes"] += 1
+        return result
+
+    def verify(self, password, hashed):
+        # 비밀번호가 해시와 일치하는지 확인 (로그인)
+        result = self._run(_check_password, password, hashed)
+        with self._lock:
+            self._stats["verifies"] += 1
+        return result
+
+    def needs_rehash(self, hashed):
+        # 저장된 해시의 비용이 현재 설정과 다르면 True (로그인 성공 시 새 비용으로 다시 저장)
+        return hash_rounds(hashed) != self.rounds
+
+    def rehash(self, password):
+        result = self.hash(password)
+        with self._lock:
+            self._stats["rehashes"] += 1
+        return result
+
+    def rehash_later(self, password, on_done):
+        # 새 비용으로 다시 해싱하되 기다리지 않음 (로그인 응답이 해싱 한 번 더 늦어지지 않도록)
+        # 해싱이 끝나면 on_done(새 해시) 호출, 대기열이 가득 차면 건너뛰고 False 반환 (다음 로그인 때 다시 시도)
+        # on_done은 DB 저장처럼 오래 걸릴 수 있으므로 별도 스레드에서 실행
+        # (완료 콜백은 프로세스 풀의 결과 관리 스레드에서 불리므로 거기서 기다리면 다른 로그인의 검증 결과까지 늦어짐)
+        try:
+            future = self._submit(_hash_password, password, self.rounds)
+        except HasherBusy:
+            return False
+
+        def finish(done):
+            if done.cancelled() or done.exception() is not None:
+                return
+            with self._lock:
+                self._stats["hashes"] += 1
+                self._stats["rehashes"] += 1
+            try:
+                self._get_callbacks().submit(on_done, done.result())
+            except RuntimeError:
+                pass  # 종료 중이면 저장하지 않음 (다음 로그인 때 다시 재해싱)
+
+        future.add_done_callback(finish)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=self._pending, rounds=self.rounds, workers=self.workers,
+                        mode="process" if self.use_processes else "thread")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        # 해싱 실행기를 먼저 정리해야 마지막 재해싱 결과까지 저장한 뒤 종료됨
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, None
+        if callbacks is not None:
+            callbacks.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher()
+atexit.register(password_hasher.shutdown)
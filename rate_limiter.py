@@ -0,0 +1,214 @@
+# rate_limiter.py
+# 로그인/회원가입 요청 제한 모듈 (토큰 버킷)
+# - 제한 없이 /login, /register를 호출하면 요청마다 bcrypt 작업(수백 ms CPU)이 생기므로
+#   IP별/계정(이메일)별/전체 한도를 넘는 요청은 해싱 전에 429 + Retry-After로 거절
+# - 계정별 한도는 로그인 "실패"에만 차감 → 여러 IP에서 한 계정을 대입하는 공격(credential stuffing)을 막으면서
+#   정상 로그인은 막지 않음
+# - 키마다 (남은 토큰, 마지막 갱신 시각) 두 값만 저장하고 요청마다 O(1)로 계산,
+#   memory 백엔드는 키 수를 LRU로 제한해 IP가 아무리 많아도 메모리가 일정함
+# - cache_utils처럼 "memory"(프로세스 내) / "redis"(여러 서버 프로세스가 한도를 공유) 백엔드 선택
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# -------------------------- 설정 --------------------------
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_BACKEND = "memory"   # "memory": 프로세스 내 / "redis": Redis 호환 서버 (redis 패키지 필요)
+RATE_LIMIT_MAX_KEYS = 100000    # memory 백엔드가 기억하는 최대 버킷 수 (초과 시 가장 오래 안 쓴 버킷부터 제거 = 한도 초기화)
+REDIS_URL = "redis://127.0.0.1:6379/0"
+
+# 규칙: {범위: (버킷 크기 = 연속 허용 횟수, 버킷이 다시 가득 차는 데 걸리는 시간(초))}
+LOGIN_RULES = {
+    "ip": (20, 60),         # IP당 분당 20회
+    "email": (5, 300),      # 계정당 5분에 실패 5회 (실패할 때만 차감)
+    "global": (200, 10),    # 전체 초당 20회, 순간 200회까지 (해싱 실행기 용량에 맞춰 조정)
+}
+REGISTER_RULES = {
+    "ip": (5, 3600),        # IP당 시간당 5회
+    "global": (50, 10),     # 전체 초당 5회
+}
+FAILURE_ONLY_SCOPES = {"email"}
+
+GLOBAL_KEY = "*"
+
+
+class MemoryBuckets:
+    # 프로세스 내 토큰 버킷 저장소 {key: (tokens, updated_at)}
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def acquire(self, key, capacity, rate, cost=1):
+        # 토큰 cost개를 쓰고 0 반환, 부족하면 쓰지 않고 기다려야 할 시간(초) 반환
+        # cost=0이면 토큰이 1개 이상 남았는지만 확인 (차감 없음)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            need = max(cost, 1)
+            if tokens < need:
+                self._store(key, tokens, now)
+                return (need - tokens) / rate
+            self._store(key, tokens - cost, now)
+            return 0.0
+
+    def _store(self, key, tokens, now):
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def size(self):
+        with self._lock:
+            return len(self._buckets)
+
+
+class RedisBuckets:
+    # Redis 호환 서버의 토큰 버킷 (Lua 스크립트로 읽기-계산-쓰기를 원자적으로 처리, 가득 차는 시간이 지나면 키 만료)
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+    local need = math.max(cost, 1)
+    local wait = 0
+    if tokens < need then
+        wait = (need - tokens) / rate
+    else
+        tokens = tokens - cost
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+    return tostring(wait)
+    """
+
+    def __init__(self, url=REDIS_URL):
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+        self.evictions = 0
+
+    def acquire(self, key, capacity, rate, cost=1):
+        return float(self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, cost, time.time()]))
+
+    def clear(self):
+        for key in self._client.scan_iter("ratelimit:*"):
+            self._client.delete(key)
+
+    def size(self):
+        return sum(1 for _ in self._client.scan_iter("ratelimit:*"))
+
+
+class RateLimiter:
+    # 범위(ip/email/global)별 규칙을 한 번에 확인하는 제한기
+
+    def __init__(self, name, rules, backend, failure_only=FAILURE_ONLY_SCOPES):
+        self.name = name
+        self.rules = rules
+        self.backend = backend
+        self.failure_only = failure_only
+        self._lock = threading.Lock()
+        self._stats = {"allowed": 0, "limited": 0, "failures": 0, "errors": 0}
+        self._limited_by = {scope: 0 for scope in rules}
+
+    def _acquire(self, scope, key, cost):
+        capacity, period = self.rules[scope]
+        try:
+            return self.backend.acquire(f"{self.name}:{scope}:{key}", capacity, capacity / period, cost)
+        except Exception as e:
+            # 저장소 장애로 로그인이 막히지 않도록 허용 (fail-open)
+            print(f"[RATE LIMIT] 확인 오류: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            return 0.0
+
+    @staticmethod
+    def _key(scope, keys):
+        if scope == "global":
+            return GLOBAL_KEY
+        value = keys.get(scope)
+        # 대소문자/공백만 다른 이메일로 한도를 우회하지 못하도록 정규화
+        return str(value).strip().lower() if value else None
+
+    def check(self, **keys):
+        # 요청 하나를 허용하면 0, 거절하면 Retry-After(초, 올림) 반환
+        # keys: ip=..., email=... (global은 자동), 값이 없는 범위는 건너뜀
+        if not RATE_LIMIT_ENABLED:
+            return 0
+        for scope in self.rules:
+            key = self._key(scope, keys)
+            if not key:
+                continue
+            wait = self._acquire(scope, key, 0 if scope in self.failure_only else 1)
+            if wait > 0:
+                with self._lock:
+                    self._stats["limited"] += 1
+                    self._limited_by[scope] += 1
+                return max(1, math.ceil(wait))
+        with self._lock:
+            self._stats["allowed"] += 1
+        return 0
+
+    def record_failure(self, **keys):
+        # 로그인 실패 시 실패 전용 범위(계정별) 토큰 차감
+        if not RATE_LIMIT_ENABLED:
+            return
+        for scope in self.failure_only:
+            key = self._key(scope, keys)
+            if scope in self.rules and key:
+                self._acquire(scope, key, 1)
+        with self._lock:
+            self._stats["failures"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, limited_by=dict(self._limited_by))
+        stats["backend"] = type(self.backend).__name__
+        try:
+            stats["buckets"] = self.backend.size()
+        except Exception:
+            stats["buckets"] = None
+        stats["evictions"] = self.backend.evictions
+        return stats
+
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        if redis is None:
+            print("[RATE LIMIT] redis 패키지가 없어 memory 백엔드를 사용합니다.")
+        else:
+            return RedisBuckets(REDIS_URL)
+    return MemoryBuckets(RATE_LIMIT_MAX_KEYS)
+
+
+_backend = _create_backend()
+login_limiter = RateLimiter("login", LOGIN_RULES, _backend)
+register_limiter = RateLimiter("register", REGISTER_RULES, _backend)
+
+
+def too_many_requests(retry_after):
+    # 429 응답 본문 (헤더 Retry-After와 같은 값)
+    return {
+        "status": "FAILURE",
+        "message": f"요청이 너무 많습니다. {retry_after}초 후 다시 시도해 주세요.",
+        "retry_after": retry_after,
+    }
@@ -0,0 +1,184 @@
+# reconcile_counters.py
+# posts.like_count / posts.comment_count를 실제 행 수(post_likes, comments)와 비교해 어긋난 값을 바로잡는 작업
+# - 카운터는 counter_buffer가 증감분을 모아 반영하므로, 반영 전에 서버가 종료되거나 반영이 실패하면 어긋날 수 있음
+# - post_id 범위(chunk) 단위로 짧은 읽기 전용 트랜잭션에서 비교 → posts 테이블 전체를 잠그거나 긴 스냅샷을 잡지 않음
+# - 서버 메모리에 아직 반영되지 않은 증감분을 어긋남으로 오인하지 않도록, 어긋난 게시글은 SETTLE_SECONDS 뒤 다시 읽어
+#   저장 값과 실제 행 수가 그대로일 때만 "WHERE <column> = 읽은 값" 조건으로 해당 행만 수정
+# 실행: python reconcile_counters.py [--dry-run] [chunk 크기]  (cron 등으로 주기 실행)
+
+import sys
+import time
+
+import mysql.connector
+from db_utils import get_connection, close_connection
+from cache_utils import post_cache
+from counter_buffer import FLUSH_INTERVAL
+
+# -------------------------- 설정 --------------------------
+RECONCILE_CHUNK = 1000                  # 한 번에 비교할 게시글 수 (post_id 범위)
+SETTLE_SECONDS = FLUSH_INTERVAL * 3     # 어긋난 게시글을 다시 확인하기까지 기다리는 시간(초)
+REPORT_EXAMPLES = 10                    # 보고서에 보여줄 어긋남 예시 수
+
+# 카운터 컬럼: 실제 행 수를 세는 테이블 (post_id 인덱스로 범위 집계)
+COUNTER_SOURCES = {
+    "like_count": "post_likes",
+    "comment_count": "comments",
+}
+
+
+def _read_chunk(conn, post_ids=None, start_id=0, last_id=None, limit=RECONCILE_CHUNK):
+    # 한 스냅샷에서 (post_id → 저장된 카운터, post_id → 실제 행 수) 읽기
+    # post_ids가 있으면 그 게시글만, 없으면 start_id 초과 post_id 순서로 limit개
+    conn.start_transaction(consistent_snapshot=True, readonly=True)
+    try:
+        cursor = conn.cursor()
+        columns = ", ".join(COUNTER_SOURCES)
+        if post_ids:
+            placeholders = ", ".join(["%s"] * len(post_ids))
+            cursor.execute(f"SELECT post_id, {columns} FROM posts WHERE post_id IN ({placeholders})", list(post_ids))
+        else:
+            upper = "AND post_id <= %s" if last_id is not None else ""
+            params = [start_id] + ([last_id] if last_id is not None else []) + [limit]
+            cursor.execute(
+                f"SELECT post_id, {columns} FROM posts WHERE post_id > %s {upper} ORDER BY post_id LIMIT %s", params
+            )
+        stored = {row[0]: dict(zip(COUNTER_SOURCES, row[1:])) for row in cursor.fetchall()}
+
+        actual = {post_id: dict.fromkeys(COUNTER_SOURCES, 0) for post_id in stored}
+        if stored:
+            if post_ids:
+                # 흩어진 게시글만 다시 확인할 때는 IN 목록으로 집계
+                where = f"post_id IN ({', '.join(['%s'] * len(stored))})"
+                params = list(stored)
+            else:
+                # 연속 범위는 post_id 인덱스 범위 집계 (범위 안의 삭제된 게시글 행은 stored에 없으므로 무시)
+                where = "post_id BETWEEN %s AND %s"
+                params = [min(stored), max(stored)]
+            for column, table in COUNTER_SOURCES.items():
+                cursor.execute(f"SELECT post_id, COUNT(*) FROM {table} WHERE {where} GROUP BY post_id", params)
+                for post_id, count in cursor.fetchall():
+                    if post_id in actual:
+                        actual[post_id][column] = count
+        return stored, actual
+    finally:
+        conn.commit()
+
+
+def _find_drift(stored, actual):
+    # {(post_id, column): (저장 값, 실제 값)}
+    drift = {}
+    for post_id, counters in stored.items():
+        for column, value in counters.items():
+            if value != actual[post_id][column]:
+                drift[(post_id, column)] = (value, actual[post_id][column])
+    return drift
+
+
+def reconcile_counters(dry_run=False, chunk_size=RECONCILE_CHUNK, settle_seconds=SETTLE_SECONDS,
+                       first_post_id=None, last_post_id=None):
+    # 모든 게시글(또는 first_post_id ~ last_post_id 범위)의 카운터를 검사하고 어긋난 값을 수정
+    # dry_run=True면 수정하지 않고 보고만 함
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    report = {
+        column: {"drifted": 0, "corrected": 0, "skipped": 0, "net_drift": 0, "examples": []}
+        for column in COUNTER_SOURCES
+    }
+    scanned = 0
+    started = time.perf_counter()
+
+    try:
+        # 1. post_id 범위를 나눠 스캔하며 어긋난 카운터 후보 수집
+        candidates = {}
+        start_id = (first_post_id - 1) if first_post_id else 0
+        while True:
+            stored, actual = _read_chunk(conn, start_id=start_id, last_id=last_post_id, limit=chunk_size)
+            if not stored:
+                break
+            scanned += len(stored)
+            candidates.update(_find_drift(stored, actual))
+            start_id = max(stored)
+
+        # 2. 아직 반영되지 않은 증감분이 반영될 시간을 준 뒤 후보만 다시 읽어 그대로인 것만 확정
+        if candidates and settle_seconds > 0:
+            time.sleep(settle_seconds)
+        confirmed = {}
+        post_ids = sorted({post_id for post_id, _ in candidates})
+        for start in range(0, len(post_ids), chunk_size):
+            stored, actual = _read_chunk(conn, post_ids=post_ids[start:start + chunk_size])
+            recheck = _find_drift(stored, actual)
+            for key, first_seen in candidates.items():
+                if key[0] not in stored:
+                    continue
+                if recheck.get(key) == first_seen:
+                    confirmed[key] = first_seen
+                else:
+                    # 다시 읽는 사이에 값이 바뀌었거나 맞춰짐 (진행 중인 활동) → 다음 실행에서 다시 확인
+                    report[key[1]]["skipped"] += 1
+
+        # 3. 확정된 행만 수정 (읽은 값과 같을 때만 바꾸는 조건부 UPDATE, 행 단위 짧은 잠금)
+        cursor = conn.cursor()
+        corrected_posts = set()
+        for (post_id, column), (value, expected) in sorted(confirmed.items()):
+            entry = report[column]
+            entry["drifted"] += 1
+            entry["net_drift"] += value - expected
+            if len(entry["examples"]) < REPORT_EXAMPLES:
+                entry["examples"].append({"post_id": post_id, "stored": value, "actual": expected})
+            if dry_run:
+                continue
+            cursor.execute(
+                f"UPDATE posts SET {column} = %s WHERE post_id = %s AND {column} = %s",
+                (expected, post_id, value),
+            )
+            conn.commit()
+            if cursor.rowcount == 1:
+                entry["corrected"] += 1
+                corrected_posts.add(post_id)
+            else:
+                entry["skipped"] += 1
+
+        if corrected_posts:
+            post_cache.invalidate_posts(sorted(corrected_posts), lists=True)
+
+        return {
+            "status": "SUCCESS",
+            "dry_run": dry_run,
+            "scanned_posts": scanned,
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+            "counters": report,
+        }
+
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        close_connection(conn)
+
+
+def print_report(result):
+    if result["status"] != "SUCCESS":
+        print(f"[FAIL] {result['message']}")
+        return
+    mode = "검사만 (dry-run)" if result["dry_run"] else "수정"
+    print("=" * 60)
+    print(f"카운터 정합성 검사 - {mode}: 게시글 {result['scanned_posts']}개, {result['elapsed_seconds']}초")
+    print("=" * 60)
+    for column, entry in result["counters"].items():
+        print(f"[{column}] 어긋남 {entry['drifted']}건, 수정 {entry['corrected']}건, "
+              f"보류 {entry['skipped']}건, 순 차이(저장 - 실제) {entry['net_drift']:+d}")
+        for example in entry["examples"]:
+            print(f"   - post_id {example['post_id']}: 저장 {example['stored']} → 실제 {example['actual']}")
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != "--dry-run"]
+    result = reconcile_counters(
+        dry_run="--dry-run" in sys.argv,
+        chunk_size=int(args[0]) if args else RECONCILE_CHUNK,
+    )
+    print_report(result)
+    sys.exit(0 if result["status"] == "SUCCESS" else 1)
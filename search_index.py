@@ -0,0 +1,159 @@
+# search_index.py
+# MySQL FULLTEXT(ngram)를 쓸 수 없는 환경을 위한 프로세스 내 역색인(inverted index) 검색 엔진
+# - MySQL ngram 파서(ngram_token_size=2)와 같은 방식으로 글자 2개 단위(bigram)로 색인 → 띄어쓰기/조사와 무관하게 한국어 부분 일치
+# - 토큰 → {문서: 출현 횟수} 목록(postings)만 유지하고, 검색어 토큰의 postings만 읽어 BM25 점수로 순위 계산
+#   (LIKE '%검색어%'처럼 모든 글을 훑지 않음)
+# - 문서 키는 ("post", post_id) / ("comment", comment_id), 비공개 게시글과 그 댓글은 검색 결과에서 제외
+# - DB와 무관한 순수 파이썬 모듈 (server_search가 DB에서 채우고 게시글/댓글 변경 시 갱신)
+
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# -------------------------- 설정 --------------------------
+NGRAM_SIZE = 2          # MySQL ngram_token_size 기본값과 같음
+TITLE_WEIGHT = 2        # 제목에 나온 토큰은 본문보다 2배로 계산
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_MATCH_RATIO = 0.5   # 검색어 토큰 중 이 비율 이상이 들어 있는 문서만 결과에 포함
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    # 텍스트 → 토큰 목록 (소문자/NFKC 정규화 후 단어마다 글자 NGRAM_SIZE개씩 겹쳐 자름, 짧은 단어는 그대로)
+    tokens = []
+    for word in _WORD_RE.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if len(word) <= NGRAM_SIZE:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + NGRAM_SIZE] for i in range(len(word) - NGRAM_SIZE + 1))
+    return tokens
+
+
+class InvertedIndex:
+    # 게시글/댓글 역색인 (스레드 안전)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}         # {token: {doc_key: 가중 출현 횟수}}
+        self._doc_terms = {}        # {doc_key: Counter(token → 가중 출현 횟수)} - 수정/삭제 시 postings 정리용
+        self._doc_lengths = {}      # {doc_key: 가중 토큰 수}
+        self._total_length = 0
+        self._doc_post = {}         # {doc_key: 소속 게시글 ID} (게시글은 자기 자신)
+        self._post_comments = {}    # {post_id: set(댓글 doc_key)} - 게시글 삭제 시 댓글도 제거
+        self._hidden_posts = set()  # 비공개 게시글 ID
+
+    # -------------------------- 색인 --------------------------
+    def add_post(self, post_id, title, body, private=False):
+        terms = Counter()
+        for token in tokenize(title):
+            terms[token] += TITLE_WEIGHT
+        terms.update(tokenize(body))
+        with self._lock:
+            self._put(("post", post_id), terms, post_id)
+            if private:
+                self._hidden_posts.add(post_id)
+            else:
+                self._hidden_posts.discard(post_id)
+
+    def add_comment(self, comment_id, post_id, body):
+        with self._lock:
+            key = ("comment", comment_id)
+            self._put(key, Counter(tokenize(body)), post_id)
+            self._post_comments.setdefault(post_id, set()).add(key)
+
+    def remove_post(self, post_id):
+        # 게시글과 그 댓글 모두 제거
+        with self._lock:
+            self._drop(("post", post_id))
+            for key in self._post_comments.pop(post_id, ()):
+                self._drop(key)
+            self._hidden_posts.discard(post_id)
+
+    def remove_comments(self, comment_ids):
+        with self._lock:
+            for comment_id in comment_ids:
+                key = ("comment", comment_id)
+                post_id = self._doc_post.get(key)
+                self._drop(key)
+                if post_id in self._post_comments:
+                    self._post_comments[post_id].discard(key)
+
+    def _put(self, key, terms, post_id):
+        # 같은 문서가 있으면 교체 (수정)
+        self._drop(key)
+        for token, count in terms.items():
+            self._postings.setdefault(token, {})[key] = count
+        length = sum(terms.values())
+        self._doc_terms[key] = terms
+        self._doc_lengths[key] = length
+        self._total_length += length
+        self._doc_post[key] = post_id
+
+    def _drop(self, key):
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        for token in terms:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._doc_lengths.pop(key)
+        self._doc_post.pop(key, None)
+
+    # -------------------------- 검색 --------------------------
+    def search(self, query, kinds=("post", "comment"), limit=20, offset=0):
+        # BM25 점수 순 (doc_key, score) 목록과 다음 결과가 더 있는지 여부 반환
+        query_tokens = set(tokenize(query))
+        if not query_tokens:
+            return [], False
+        min_match = max(1, math.ceil(len(query_tokens) * MIN_MATCH_RATIO))
+
+        with self._lock:
+            total_docs = len(self._doc_terms)
+            if not total_docs:
+                return [], False
+            avg_length = self._total_length / total_docs
+            scores = {}
+            matched = Counter()
+            for token in query_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, count in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[key] / avg_length)
+                    scores[key] = scores.get(key, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+                    matched[key] += 1
+
+            candidates = [
+                (score, key) for key, score in scores.items()
+                if key[0] in kinds and matched[key] >= min_match
+                and self._doc_post.get(key) not in self._hidden_posts
+            ]
+
+        # 상위 offset + limit + 1개만 정렬 (동점이면 최신 ID 우선)
+        top = heapq.nlargest(offset + limit + 1, candidates, key=lambda item: (item[0], item[1][1]))
+        page = top[offset:offset + limit]
+        return [(key, round(score, 4)) for score, key in page], len(top) > offset + limit
+
+    def clear(self):
+        with self._lock:
+            for container in (self._postings, self._doc_terms, self._doc_lengths, self._doc_post,
+                              self._post_comments, self._hidden_posts):
+                container.clear()
+            self._total_length = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._doc_terms),
+                "tokens": len(self._postings),
+                "hidden_posts": len(self._hidden_posts),
+            }
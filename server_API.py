@@ -10,18 +10,27 @@ from flask_jwt_extended import JWTManager, create_access_token, jwt_required, ge
 # JWT 인증 관련 기능: 관리자(JWTManager), 토큰 생성(create_access_token), 
 # 인증 요구(jwt_required), 사용자 ID 추출(get_jwt_identity)
 
-from server_login_register import register_user, login_user 
+from server_login_register import register_user, login_user, is_admin
 # 로그인/회원가입 로직
 
-from server_posts import create_post, get_all_posts, get_post_detail, update_post, delete_post
+from server_posts import create_post, get_all_posts, get_hot_posts, get_post_detail, update_post, delete_post, DEFAULT_PAGE_SIZE
 # 게시글 로직
 
-from server_comment import create_comment, get_comments_by_post, update_comment, delete_comment
+from server_comment import create_comment, get_comments_by_post, get_comment_thread, update_comment, delete_comment, DEFAULT_COMMENT_PAGE_SIZE
 # 댓글 관리 로직
 
 from server_like import toggle_post_like 
 # 좋아요 관리 로직
 
+from cache_utils import get_cache_stats
+from db_utils import get_pool_stats
+from counter_buffer import view_counts, like_counts, comment_counts
+from password_hasher import password_hasher
+from rate_limiter import login_limiter, register_limiter, too_many_requests
+from author_names import author_names
+from server_search import search, get_search_stats, DEFAULT_SEARCH_PAGE_SIZE
+# 캐시/커넥션 풀/조회수 버퍼/비밀번호 해싱 실행기 상태 (모니터링용)
+
 # ----------------------------------------------------------------------------------------------
 
 
@@ -53,9 +62,17 @@ def api_register():
         # 필수 필드 누락 시 400 Bad Request
         return jsonify({"status": "FAILURE", "message": "이메일과 비밀번호를 입력해주세요."}), 400
 
+    # 요청 제한 확인 (IP별/전체) - 한도를 넘으면 해싱 전에 429 Too Many Requests
+    retry_after = register_limiter.check(ip=request.remote_addr)
+    if retry_after:
+        return jsonify(too_many_requests(retry_after)), 429, {"Retry-After": str(retry_after)}
+
     # DB 로직 호출
     result = register_user(email, password)
     
+    if result.get("busy"):
+        # 해싱 대기열이 가득 참 → 503 + Retry-After (잠시 후 재시도)
+        return jsonify(result), 503, {"Retry-After": str(result["retry_after"])}
     if result["status"] == "SUCCESS":
         # 성공 시 201 Created
         return jsonify(result), 201
@@ -71,9 +88,17 @@ def api_login():
     email = data.get('email')
     password = data.get('password')
     
+    # 요청 제한 확인 (IP별/계정별 실패/전체) - 한도를 넘으면 해싱 전에 429 Too Many Requests
+    retry_after = login_limiter.check(ip=request.remote_addr, email=email)
+    if retry_after:
+        return jsonify(too_many_requests(retry_after)), 429, {"Retry-After": str(retry_after)}
+
     # DB 로직 호출
     result = login_user(email, password)
     
+    if result.get("busy"):
+        # 해싱 대기열이 가득 참 → 503 + Retry-After (잠시 후 재시도)
+        return jsonify(result), 503, {"Retry-After": str(result["retry_after"])}
     if result["status"] == "SUCCESS":
         # 로그인 성공 시 사용자 ID를 이용해 JWT 액세스 토큰 생성
         user_id = result["user_id"]
@@ -88,6 +113,9 @@ def api_login():
         }), 200
     else:
         # 로그인 실패 (비밀번호 불일치, 사용자 없음 등) 시 401 Unauthorized
+        # 계정별 실패 한도에는 비밀번호 불일치/사용자 없음만 반영 (DB 오류 등은 제외)
+        if result.get("bad_credentials"):
+            login_limiter.record_failure(email=email)
         return jsonify(result), 401
     
 
@@ -98,14 +126,38 @@ def api_login():
 # 게시글 API 엔드포인트
 # =======================================================================
 
-# 1. 게시글 목록 조회 (GET: /api/posts)
+# 1. 게시글 목록 조회 (GET: /api/posts?limit=20&cursor=...)
 @community_API.route('/api/posts', methods=['GET'])
 def api_get_all_posts():
+    # 쿼리 파라미터: limit (페이지 크기), cursor (이전 응답의 next_cursor)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor')
+
     # DB 로직 호출 (권한 불필요)
-    result = get_all_posts()
+    result = get_all_posts(limit, cursor)
     
     if result["status"] == "SUCCESS":
         return jsonify(result), 200
+    elif result["message"] == "잘못된 커서입니다.":
+        # 디코딩할 수 없는 커서는 400 Bad Request
+        return jsonify(result), 400
+    else:
+        return jsonify(result), 500
+
+# 1-1. 인기 게시글 목록 조회 (GET: /api/posts/hot?limit=20&cursor=...)
+@community_API.route('/api/posts/hot', methods=['GET'])
+def api_get_hot_posts():
+    # 쿼리 파라미터: limit (페이지 크기), cursor (이전 응답의 next_cursor)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor')
+
+    # DB 로직 호출 (권한 불필요, hot_score 순)
+    result = get_hot_posts(limit, cursor)
+
+    if result["status"] == "SUCCESS":
+        return jsonify(result), 200
+    elif result["message"] == "잘못된 커서입니다.":
+        return jsonify(result), 400
     else:
         return jsonify(result), 500
 
@@ -214,30 +266,54 @@ def api_create_comment(post_id):
     user_id = int(get_jwt_identity())
     data = request.get_json()
     comment_body = data.get('body')
+    # 답글이면 부모 댓글 ID (선택)
+    parent_comment_id = data.get('parent_comment_id')
     
     if not comment_body:
         return jsonify({"status": "FAILURE", "message": "댓글 내용을 입력해주세요."}), 400
         
     # DB 로직 호출
-    result = create_comment(post_id, user_id, comment_body)
+    result = create_comment(post_id, user_id, comment_body, parent_comment_id)
     
     if result["status"] == "SUCCESS":
         # 성공 시 201 Created
         return jsonify(result), 201
+    elif result["message"] == "부모 댓글을 찾을 수 없습니다.":
+        return jsonify(result), 400
     else:
         return jsonify(result), 500
 
-# 2. 댓글 목록 조회 (GET: /api/posts/<post_id>/comments)
+# 2. 댓글 목록 조회 (GET: /api/posts/<post_id>/comments?limit=50&cursor=...&replies=1)
 @community_API.route('/api/posts/<int:post_id>/comments', methods=['GET'])
 def api_get_comments(post_id):
+    # 쿼리 파라미터: limit (최상위 댓글 수), cursor (이전 응답의 next_cursor), replies (1이면 답글 트리 포함)
+    limit = request.args.get('limit', DEFAULT_COMMENT_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor')
+    include_replies = request.args.get('replies', '0') in ('1', 'true')
+
     # DB 로직 호출 (인증 불필요)
-    result = get_comments_by_post(post_id)
+    result = get_comments_by_post(post_id, limit, cursor, include_replies)
     
     if result["status"] == "SUCCESS":
         return jsonify(result), 200
+    elif result["message"] == "잘못된 커서입니다.":
+        return jsonify(result), 400
     else:
         # 게시글 ID를 찾을 수 없는 경우 404 Not Found
         return jsonify(result), 404
+
+# 2-1. 댓글 스레드 조회 (GET: /api/comments/<comment_id>/thread)
+@community_API.route('/api/comments/<int:comment_id>/thread', methods=['GET'])
+def api_get_comment_thread(comment_id):
+    # 댓글 하나와 그 아래 모든 답글을 트리로 반환 (인증 불필요)
+    result = get_comment_thread(comment_id)
+
+    if result["status"] == "SUCCESS":
+        return jsonify(result), 200
+    elif result["message"] == "댓글을 찾을 수 없습니다.":
+        return jsonify(result), 404
+    else:
+        return jsonify(result), 500
     
 # 3. 댓글 수정 및 삭제 (PUT/DELETE: /api/comments/<comment_id>)
 @community_API.route('/api/comments/<int:comment_id>', methods=['PUT', 'DELETE'])
@@ -293,6 +369,64 @@ def api_toggle_like(post_id):
     if result["status"] == "SUCCESS":
         # 성공 시 200 OK
         return jsonify(result), 200
+    elif result["message"] == "게시글을 찾을 수 없습니다.":
+        # 존재하지 않는 게시글 404 Not Found
+        return jsonify(result), 404
     else:
         # DB 연결 오류 등 실패 시 500 Internal Server Error
-        return jsonify(result), 500
\ No newline at end of file
+        return jsonify(result), 500
+
+
+
+
+
+# =======================================================================
+# 검색 API 엔드포인트
+# =======================================================================
+# 게시글/댓글 검색 (GET: /api/search?q=검색어&type=all|posts|comments&limit=20&cursor=...)
+@community_API.route('/api/search', methods=['GET'])
+def api_search():
+    # 쿼리 파라미터: q (검색어), type (검색 대상), limit (페이지 크기), cursor (이전 응답의 next_cursor)
+    query = request.args.get('q', '')
+    search_type = request.args.get('type', 'all')
+    limit = request.args.get('limit', DEFAULT_SEARCH_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor')
+
+    # DB 로직 호출 (권한 불필요, 공개 게시글과 그 댓글만 검색)
+    result = search(query, search_type, limit, cursor)
+
+    if result["status"] == "SUCCESS":
+        return jsonify(result), 200
+    elif result["message"].startswith("DB"):
+        return jsonify(result), 500
+    else:
+        # 짧은 검색어, 잘못된 검색 종류/커서는 400 Bad Request
+        return jsonify(result), 400
+
+
+
+
+
+# =======================================================================
+# 모니터링 API 엔드포인트
+# =======================================================================
+# 캐시 적중/미스, 커넥션 풀, 조회수/좋아요/댓글 수 버퍼, 해싱 대기열, 요청 제한, 작성자 이름 캐시, 검색 통계 조회 (GET: /api/stats)
+# 서버 내부 상태를 드러내므로 관리자(users.role = 'admin')만 조회 가능
+@community_API.route('/api/stats', methods=['GET'])
+@jwt_required() # 인증 필수
+def api_get_stats():
+    user_id = int(get_jwt_identity())
+    if not is_admin(user_id):
+        return jsonify({"status": "FAILURE", "message": "관리자만 조회할 수 있습니다."}), 403
+    return jsonify({
+        "status": "SUCCESS",
+        "cache": get_cache_stats(),
+        "db_pool": get_pool_stats(),
+        "view_counts": view_counts.stats(),
+        "like_counts": like_counts.stats(),
+        "comment_counts": comment_counts.stats(),
+        "password_hasher": password_hasher.stats(),
+        "rate_limit": {"login": login_limiter.stats(), "register": register_limiter.stats()},
+        "author_names": author_names.stats(),
+        "search": get_search_stats(),
+    }), 200
\ No newline at end of file
@@ -1,35 +1,67 @@
 # server_comment.py
 # 댓글 데이터베이스 CRUD 로직을 담당하는 모듈
 
+import base64
+import json
 import mysql.connector
 from db_utils import get_connection, close_connection
+from cache_utils import post_cache
+from counter_buffer import comment_counts
+from author_names import author_names
+import server_search
 from datetime import datetime
 
+DEFAULT_COMMENT_PAGE_SIZE = 50
+MAX_COMMENT_PAGE_SIZE = 200
+MAX_THREAD_COMMENTS = 1000   # 한 번에 불러오는 답글(하위 댓글) 최대 수
+
+def _stage_comment_count(cursor, post_id, delta):
+    # sync 모드: 댓글 삽입/삭제와 같은 트랜잭션에서 posts.comment_count 갱신
+    if not comment_counts.buffered:
+        comment_counts.increment_now(cursor, post_id, delta)
+
+def _commit_comment_count(post_id, delta):
+    # 커밋 후 호출: buffered 모드면 증감분을 버퍼에 모아 일괄 반영 (반영 후 캐시 무효화)
+    # sync 모드면 comment_count가 이미 바뀌었으므로 게시글 상세/목록 캐시 무효화
+    if comment_counts.buffered:
+        comment_counts.add(post_id, delta)
+    else:
+        post_cache.invalidate_post(post_id)
+
 # -------------------------- 1. 댓글 생성 (Create) --------------------------
-def create_comment(post_id, user_id, comment_body):
+# parent_comment_id: 답글이면 부모 댓글 ID (같은 게시글의 댓글이어야 함), 최상위 댓글이면 None
+def create_comment(post_id, user_id, comment_body, parent_comment_id=None):
     conn = get_connection()
     if not conn:
         return {"status": "FAILURE", "message": "DB 연결 실패"}
 
     try:
         cursor = conn.cursor()
+
+        # 답글이면 부모 댓글이 같은 게시글에 있는지 확인
+        if parent_comment_id is not None:
+            cursor.execute("SELECT post_id FROM comments WHERE comment_id = %s", (parent_comment_id,))
+            parent = cursor.fetchone()
+            if not parent or parent[0] != post_id:
+                return {"status": "FAILURE", "message": "부모 댓글을 찾을 수 없습니다."}
         
         # a. 댓글 삽입
         insert_query = """
-        INSERT INTO comments (post_id, user_id, comment_body) 
-        VALUES (%s, %s, %s)
+        INSERT INTO comments (post_id, user_id, comment_body, parent_comment_id) 
+        VALUES (%s, %s, %s, %s)
         """
-        cursor.execute(insert_query, (post_id, user_id, comment_body))
+        cursor.execute(insert_query, (post_id, user_id, comment_body, parent_comment_id))
         
         # [안정성 유지] 삽입된 ID를 SELECT LAST_INSERT_ID()를 사용하여 명확하게 가져옴
         cursor.execute("SELECT LAST_INSERT_ID()")
         new_comment_id = cursor.fetchone()[0]
         
         # b. posts 테이블의 comment_count 증가
-        update_count_query = "UPDATE posts SET comment_count = comment_count + 1 WHERE post_id = %s"
-        cursor.execute(update_count_query, (post_id,))
+        _stage_comment_count(cursor, post_id, 1)
         
         conn.commit()
+        _commit_comment_count(post_id, 1)
+        server_search.index_comment(new_comment_id, post_id, comment_body)
         # 삽입된 댓글 ID를 반환하여 클라이언트에서 활용할 수 있게 함
         return {"status": "SUCCESS", "message": "댓글이 성공적으로 작성되었습니다.", "comment_id": new_comment_id}
 
@@ -40,42 +72,172 @@ def create_comment(post_id, user_id, comment_body):
     finally:
         close_connection(conn)
 
+# -------------------------- 댓글 커서 인코딩/디코딩 --------------------------
+# 마지막으로 받은 최상위 댓글의 (created_at, comment_id)를 server_posts의 목록 커서와 같은 방식으로 인코딩
+def encode_comment_cursor(created_at, comment_id):
+    raw = json.dumps([created_at, comment_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_comment_cursor(cursor):
+    # 잘못된 커서면 None 반환
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, comment_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")
+        return created_at, int(comment_id)
+    except (ValueError, TypeError):
+        return None
+
+def _comment_row(row):
+    # (comment_id, parent_comment_id, comment_body, created_at, user_id) → 응답용 딕셔너리
+    # 작성자 이름(user_name)은 author_names.fill()로 나중에 한 번에 채움
+    return {
+        "comment_id": row[0],
+        "parent_comment_id": row[1],
+        "body": row[2],
+        "created_at": row[3].strftime("%Y-%m-%d %H:%M:%S") if isinstance(row[3], datetime) else str(row[3]),
+        "user_id": row[4]
+    }
+
+def _load_subtrees(cursor, root_ids):
+    # root_ids 댓글들의 모든 하위 답글을 재귀 CTE 쿼리 한 번으로 조회 (MySQL 8.0 이상)
+    # 답글 수만큼 쿼리를 반복하지 않고, 부모 → 자식 순서로 FK 인덱스(parent_comment_id)를 따라 내려감
+    # MAX_THREAD_COMMENTS + 1개까지 읽어 잘린 경우를 표시
+    placeholders = ", ".join(["%s"] * len(root_ids))
+    thread_query = f"""
+    WITH RECURSIVE thread (comment_id) AS (
+        SELECT comment_id FROM comments WHERE parent_comment_id IN ({placeholders})
+        UNION ALL
+        SELECT c.comment_id FROM comments c JOIN thread t ON c.parent_comment_id = t.comment_id
+    )
+    SELECT c.comment_id, c.parent_comment_id, c.comment_body, c.created_at, c.user_id
+    FROM thread t
+    JOIN comments c ON c.comment_id = t.comment_id
+    ORDER BY c.created_at ASC, c.comment_id ASC
+    LIMIT %s
+    """
+    cursor.execute(thread_query, (*root_ids, MAX_THREAD_COMMENTS + 1))
+    rows = cursor.fetchall()
+    return [_comment_row(row) for row in rows[:MAX_THREAD_COMMENTS]], len(rows) > MAX_THREAD_COMMENTS
+
+def _attach_replies(roots, replies):
+    # 평평한 답글 목록을 부모의 "replies" 배열에 붙여 트리로 만듦 (작성 순서 유지)
+    by_id = {comment["comment_id"]: comment for comment in roots}
+    for comment in roots:
+        comment["replies"] = []
+    for reply in replies:
+        reply["replies"] = []
+        by_id[reply["comment_id"]] = reply
+    for reply in replies:
+        parent = by_id.get(reply["parent_comment_id"])
+        if parent is not None:
+            parent["replies"].append(reply)
+
 # -------------------------- 2. 댓글 목록 조회 (Read) --------------------------
-def get_comments_by_post(post_id):
+# limit: 한 페이지의 최상위 댓글 수 (기본 DEFAULT_COMMENT_PAGE_SIZE, 최대 MAX_COMMENT_PAGE_SIZE)
+# cursor: 이전 페이지 응답의 next_cursor (첫 페이지는 None)
+# include_replies: True면 각 최상위 댓글의 답글 트리를 "replies"로 함께 반환
+def get_comments_by_post(post_id, limit=DEFAULT_COMMENT_PAGE_SIZE, cursor=None, include_replies=False):
+    limit = max(1, min(int(limit), MAX_COMMENT_PAGE_SIZE))
+
+    after = None
+    if cursor:
+        after = decode_comment_cursor(cursor)
+        if after is None:
+            return {"status": "FAILURE", "message": "잘못된 커서입니다."}
+
     conn = get_connection()
     if not conn:
         return {"status": "FAILURE", "message": "DB 연결 실패"}
 
     try:
-        cursor = conn.cursor()
+        cursor_obj = conn.cursor()
         
-        # 댓글과 작성자 정보를 함께 조회: profiles 테이블의 name을 가져옴
-        # LEFT JOIN profiles를 사용하여 profiles 테이블에 항목이 없더라도 조회 가능하게 함
-        # COALESCE를 사용하여 name이 NULL일 경우 '익명'으로 표시
-        select_query = """
-        SELECT c.comment_id, c.comment_body, c.created_at, COALESCE(p.name, '익명') AS user_name
-        FROM comments c
-        LEFT JOIN profiles p ON c.user_id = p.user_id
-        WHERE c.post_id = %s
-        ORDER BY c.created_at ASC
+        # 키셋(커서) 페이지네이션: 마지막 댓글의 (created_at, comment_id) 이후부터 limit + 1개
+        # 안쪽 서브쿼리는 idx_comments_post (post_id, parent_comment_id, created_at, comment_id)만으로
+        # 처리되는 커버링 인덱스 범위 스캔이고, 본문/작성자는 이번 페이지 행에 대해서만 읽음
+        # 작성자 이름은 profiles JOIN 대신 이름 캐시에서 채움 (없으면 '익명')
+        where_clause = "post_id = %s AND parent_comment_id IS NULL"
+        params = [post_id]
+        if after:
+            created_at, comment_id = after
+            where_clause += " AND (created_at > %s OR (created_at = %s AND comment_id > %s))"
+            params += [created_at, created_at, comment_id]
+
+        select_query = f"""
+        SELECT c.comment_id, c.parent_comment_id, c.comment_body, c.created_at, c.user_id
+        FROM (
+            SELECT comment_id FROM comments
+            WHERE {where_clause}
+            ORDER BY created_at ASC, comment_id ASC
+            LIMIT %s
+        ) page
+        JOIN comments c ON c.comment_id = page.comment_id
+        ORDER BY c.created_at ASC, c.comment_id ASC
         """
-        cursor.execute(select_query, (post_id,))
-        rows = cursor.fetchall()
-        
-        comments_list = []
-        for row in rows:
-            comment = {
-                "comment_id": row[0],
-                "body": row[1],
-                "created_at": row[2].strftime("%Y-%m-%d %H:%M:%S") if isinstance(row[2], datetime) else str(row[2]),
-                "user_name": row[3] 
-            }
-            comments_list.append(comment)
+        cursor_obj.execute(select_query, (*params, limit + 1))
+        rows = cursor_obj.fetchall()
+
+        has_more = len(rows) > limit
+        comments_list = [_comment_row(row) for row in rows[:limit]]
             
-        if not comments_list:
+        if not comments_list and not after:
             return {"status": "FAILURE", "message": "해당 게시글에 댓글이 없습니다."}
-            
-        return {"status": "SUCCESS", "comments": comments_list, "total_comments": len(comments_list)}
+
+        result = {"status": "SUCCESS", "comments": comments_list, "total_comments": len(comments_list)}
+
+        replies = []
+        if include_replies:
+            truncated = False
+            if comments_list:
+                replies, truncated = _load_subtrees(cursor_obj, [c["comment_id"] for c in comments_list])
+            _attach_replies(comments_list, replies)
+            result["total_replies"] = len(replies)
+            result["replies_truncated"] = truncated
+
+        # 댓글과 답글 작성자 이름을 한 번에 채움
+        author_names.fill(cursor_obj, comments_list + replies)
+
+        # 마지막 최상위 댓글 기준으로 다음 페이지 커서 생성
+        next_cursor = None
+        if has_more:
+            last = comments_list[-1]
+            next_cursor = encode_comment_cursor(last["created_at"], last["comment_id"])
+        result["next_cursor"] = next_cursor
+        result["has_more"] = has_more
+        return result
+
+    except mysql.connector.Error as e:
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        close_connection(conn)
+
+# -------------------------- 2-1. 댓글 스레드 조회 (Read - Thread) --------------------------
+# comment_id 댓글과 그 아래 모든 답글을 트리로 반환 (답글 조회는 쿼리 한 번)
+def get_comment_thread(comment_id):
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    try:
+        cursor = conn.cursor()
+
+        select_query = """
+        SELECT c.comment_id, c.parent_comment_id, c.comment_body, c.created_at, c.user_id
+        FROM comments c
+        WHERE c.comment_id = %s
+        """
+        cursor.execute(select_query, (comment_id,))
+        row = cursor.fetchone()
+        if not row:
+            return {"status": "FAILURE", "message": "댓글을 찾을 수 없습니다."}
+
+        root = _comment_row(row)
+        replies, truncated = _load_subtrees(cursor, [root["comment_id"]])
+        _attach_replies([root], replies)
+        author_names.fill(cursor, [root] + replies)
+        return {"status": "SUCCESS", "comment": root, "total_replies": len(replies), "replies_truncated": truncated}
 
     except mysql.connector.Error as e:
         return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
@@ -93,14 +255,14 @@ def update_comment(comment_id, user_id, new_body):
         cursor = conn.cursor()
         
         # a. 권한 확인: 댓글 작성자 ID와 수정 요청자 ID가 일치하는지 확인
-        check_query = "SELECT user_id FROM comments WHERE comment_id = %s"
+        check_query = "SELECT user_id, post_id FROM comments WHERE comment_id = %s"
         cursor.execute(check_query, (comment_id,))
         result = cursor.fetchone()
 
         if not result:
             return {"status": "FAILURE", "message": "댓글을 찾을 수 없습니다."}
         
-        comment_owner_id = result[0]
+        comment_owner_id, post_id = result
         
         if comment_owner_id != user_id:
             return {"status": "FAILURE", "message": "권한 없음"} # 403 Forbidden
@@ -110,6 +272,7 @@ def update_comment(comment_id, user_id, new_body):
         cursor.execute(update_query, (new_body, comment_id))
         
         conn.commit()
+        server_search.index_comment(comment_id, post_id, new_body)
         return {"status": "SUCCESS", "message": "댓글이 성공적으로 수정되었습니다."}
 
     except mysql.connector.Error as e:
@@ -141,16 +304,31 @@ def delete_comment(comment_id, user_id):
         if comment_owner_id != user_id:
             return {"status": "FAILURE", "message": "권한 없음"} # 403 Forbidden
 
-        # b. 댓글 삭제
-        delete_query = "DELETE FROM comments WHERE comment_id = %s"
-        cursor.execute(delete_query, (comment_id,))
+        # b. 댓글과 그 아래 답글 전체 삭제
+        # 재귀 CTE로 하위 답글 ID를 한 번에 모으고, 답글은 항상 부모보다 나중에 생성되어 ID가 크므로
+        # ID 내림차순으로 지워 parent_comment_id 외래 키를 위반하지 않음
+        subtree_query = """
+        WITH RECURSIVE thread (comment_id) AS (
+            SELECT comment_id FROM comments WHERE comment_id = %s
+            UNION ALL
+            SELECT c.comment_id FROM comments c JOIN thread t ON c.parent_comment_id = t.comment_id
+        )
+        SELECT comment_id FROM thread
+        """
+        cursor.execute(subtree_query, (comment_id,))
+        comment_ids = [row[0] for row in cursor.fetchall()]
+        placeholders = ", ".join(["%s"] * len(comment_ids))
+        delete_query = f"DELETE FROM comments WHERE comment_id IN ({placeholders}) ORDER BY comment_id DESC"
+        cursor.execute(delete_query, comment_ids)
+        deleted = cursor.rowcount
         
-        # c. posts 테이블의 comment_count 감소
-        update_count_query = "UPDATE posts SET comment_count = comment_count - 1 WHERE post_id = %s"
-        cursor.execute(update_count_query, (post_id,))
+        # c. posts 테이블의 comment_count 감소 (지운 댓글 수만큼)
+        _stage_comment_count(cursor, post_id, -deleted)
         
         conn.commit()
-        return {"status": "SUCCESS", "message": "댓글이 성공적으로 삭제되었습니다."}
+        _commit_comment_count(post_id, -deleted)
+        server_search.remove_comments(comment_ids)
+        return {"status": "SUCCESS", "message": "댓글이 성공적으로 삭제되었습니다.", "deleted_count": deleted}
         
     except mysql.connector.Error as e:
         conn.rollback()
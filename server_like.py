@@ -1,14 +1,33 @@
 # server_like.py
 # 게시글 좋아요(Like) 및 좋아요 취소(Unlike) 로직을 담당하는 모듈
 
+import random
+import time
+
 import mysql.connector
+from mysql.connector import errorcode
 from db_utils import get_connection, close_connection
+from cache_utils import post_cache
+from counter_buffer import like_counts
+
+# 교착 상태(deadlock)/잠금 대기 시간 초과 시 재시도 횟수
+# 프로시저가 게시글 행을 먼저 잠그므로 보통은 대기만 하지만, 잠금 대기 시간 초과 등은 재시도
+MAX_LOCK_RETRIES = 5
+LOCK_RETRY_BACKOFF = 0.01  # 재시도 전 대기 시간 상한(초), 시도마다 2배 (0 ~ 상한 사이 임의 값)
+RETRYABLE_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+# 좋아요 토글 프로시저 (like_count는 갱신하지 않는 버전, 서버가 LIKE_DELTAS로 반영)
+# like_count까지 갱신하던 이전 sp_toggle_post_like와 섞이면 좋아요가 두 번 세어지므로 이름으로 구분
+TOGGLE_LIKE_PROCEDURE = "sp_toggle_post_like_v2"
+
+# 토글 결과별 like_count 증감
+LIKE_DELTAS = {"LIKE": 1, "UNLIKE": -1}
 
 # -------------------------- 좋아요 토글 로직 (Like/Unlike Toggle) --------------------------
 def toggle_post_like(post_id, user_id):
     # param post_id: 좋아요/취소할 게시글의 ID
     # param user_id: 요청을 보낸 사용자의 ID (인증 필수)
-    # return: 딕셔너리 형태의 결과 (SUCCESS/FAILURE, 메시지)
+    # return: 딕셔너리 형태의 결과 (SUCCESS/FAILURE, 메시지, 변경 후 like_count)
 
     conn = get_connection()
     if not conn:
@@ -18,55 +37,109 @@ def toggle_post_like(post_id, user_id):
     try:
         cursor = conn.cursor()
 
-        # 1. post_likes 테이블에서 사용자가 이미 '좋아요'를 눌렀는지 확인
-        check_query = """
-        SELECT COUNT(*) 
-        FROM post_likes 
-        WHERE user_id = %s AND post_id = %s
-        """
-        cursor.execute(check_query, (user_id, post_id))
-        is_liked = cursor.fetchone()[0] > 0 # 좋아요를 이미 눌렀으면 True
-
-        if is_liked:
-            # 2. 이미 좋아요를 눌렀다면 -> 좋아요 취소 (Unlike)
-            
-            # a. post_likes 테이블에서 레코드 삭제
-            delete_query = "DELETE FROM post_likes WHERE user_id = %s AND post_id = %s"
-            cursor.execute(delete_query, (user_id, post_id))
-            
-            # b. posts 테이블의 like_count 1 감소
-            update_count_query = "UPDATE posts SET like_count = like_count - 1 WHERE post_id = %s"
-            cursor.execute(update_count_query, (post_id,))
-            
-            action = "UNLIKE"
+        # 1. 저장 프로시저 한 번 호출로 토글 처리 (DB 왕복 1회)
+        #    - INSERT IGNORE가 (user_id, post_id) 기본키에 막히지 않으면 LIKE
+        #    - 막히면 이미 좋아요 상태이므로 DELETE (UNLIKE)
+        #    기본키 잠금으로 같은 사용자의 동시 토글이 직렬화되어 둘 다 "좋아요 안 함"으로 보는 경합이 없음
+        #    프로시저는 게시글 행을 먼저 FOR UPDATE로 잠근 뒤 post_likes만 바꿈 (like_count는 아래에서 반영)
+        #    → sync 모드에서 같은 트랜잭션의 UPDATE posts가 잠금을 올려 받다가 교착 상태가 되지 않음
+        for attempt in range(MAX_LOCK_RETRIES + 1):
+            try:
+                cursor.callproc(TOGGLE_LIKE_PROCEDURE, (user_id, post_id))
+                action, like_count = next(cursor.stored_results()).fetchone()
+                delta = LIKE_DELTAS.get(action, 0)
+                if delta and not like_counts.buffered:
+                    # sync 모드: 같은 트랜잭션에서 like_count 즉시 갱신
+                    like_counts.increment_now(cursor, post_id, delta)
+                    like_count += delta
+                # 2. 삽입/삭제(와 sync 모드의 카운트 업데이트)를 함께 확정 (트랜잭션)
+                conn.commit()
+                break
+            except mysql.connector.Error as e:
+                conn.rollback()
+                if e.errno in RETRYABLE_ERRORS and attempt < MAX_LOCK_RETRIES:
+                    # 같은 게시글에 몰린 요청들이 동시에 다시 부딪히지 않도록 임의 시간만큼 기다렸다가 재시도
+                    time.sleep(random.uniform(0, LOCK_RETRY_BACKOFF * 2 ** attempt))
+                    continue
+                raise
+
+        if action == "NONE":
+            # 게시글이 없는 경우 (프로시저가 게시글 행을 찾지 못함)
+            return {"status": "FAILURE", "message": "게시글을 찾을 수 없습니다."}
+
+        if action == "UNLIKE":
             message = "좋아요가 취소되었습니다."
-        
         else:
-            # 3. 좋아요를 누르지 않았다면 -> 좋아요 추가 (Like)
-            
-            # a. post_likes 테이블에 레코드 삽입
-            insert_query = """
-            INSERT INTO post_likes (user_id, post_id) 
-            VALUES (%s, %s)
-            """
-            cursor.execute(insert_query, (user_id, post_id))
-            
-            # b. posts 테이블의 like_count 1 증가
-            update_count_query = "UPDATE posts SET like_count = like_count + 1 WHERE post_id = %s"
-            cursor.execute(update_count_query, (post_id,))
-            
-            action = "LIKE"
             message = "좋아요가 성공적으로 반영되었습니다."
-            
-        # 4. 모든 DB 작업(삽입/삭제 및 카운트 업데이트)을 확정 (트랜잭션)
-        conn.commit()
-        return {"status": "SUCCESS", "action": action, "message": message}
+
+        if like_counts.buffered:
+            # buffered 모드: 증감분은 like_counts가 모아서 일괄 반영 (반영 후 캐시 무효화)
+            # 응답에는 아직 반영되지 않은 증감분까지 포함
+            like_counts.add(post_id, delta)
+            like_count += like_counts.pending(post_id)
+        else:
+            # like_count가 바뀌었으므로 게시글 상세/목록 캐시 무효화
+            post_cache.invalidate_post(post_id)
+        return {"status": "SUCCESS", "action": action, "message": message, "like_count": like_count}
 
     except mysql.connector.Error as e:
         # DB 작업 중 오류 발생 시
         conn.rollback() # 오류 발생 시 이전에 수행된 모든 작업 취소 (트랜잭션 롤백)
+        if e.errno == errorcode.ER_SP_DOES_NOT_EXIST:
+            # 이전 스키마의 DB: 이전 프로시저로 대신 처리하지 않고 스키마 갱신이 필요함을 알림
+            print(f"[LIKE] {TOGGLE_LIKE_PROCEDURE} 프로시저가 없습니다. setup_database.py를 다시 실행하세요.")
+            return {"status": "FAILURE", "message": f"DB 스키마가 최신이 아닙니다 ({TOGGLE_LIKE_PROCEDURE} 없음)."}
         return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
-        
+
     finally:
         # DB 연결을 안전하게 종료
-        close_connection(conn)
\ No newline at end of file
+        close_connection(conn)
+
+
+# -------------------------- 좋아요 여부 일괄 조회 (Bulk Liked Lookup) --------------------------
+# 게시글 목록 한 페이지에 대해 게시글마다 조회(N+1)하지 않고 한 번의 쿼리로 좋아요 여부를 확인
+LIKED_LOOKUP_CHUNK = 1000  # IN (...) 목록 하나에 넣을 최대 게시글 수
+
+def get_liked_post_ids(user_id, post_ids):
+    # param user_id: 좋아요 여부를 확인할 사용자 ID
+    # param post_ids: 확인할 게시글 ID 목록
+    # return: {"status": "SUCCESS", "liked_post_ids": 좋아요한 게시글 ID 집합}
+
+    post_ids = list(dict.fromkeys(post_ids)) # 중복 제거 (순서 유지)
+    if not post_ids:
+        return {"status": "SUCCESS", "liked_post_ids": set()}
+
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    try:
+        cursor = conn.cursor()
+        liked = set()
+
+        # (user_id, post_id) 기본키로 조회되므로 인덱스만으로 처리됨
+        for start in range(0, len(post_ids), LIKED_LOOKUP_CHUNK):
+            chunk = post_ids[start:start + LIKED_LOOKUP_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            select_query = f"""
+            SELECT post_id 
+            FROM post_likes 
+            WHERE user_id = %s AND post_id IN ({placeholders})
+            """
+            cursor.execute(select_query, (user_id, *chunk))
+            liked.update(row[0] for row in cursor.fetchall())
+
+        return {"status": "SUCCESS", "liked_post_ids": liked}
+
+    except mysql.connector.Error as e:
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        close_connection(conn)
+
+# 게시글 하나에 대한 좋아요 여부 (상세 조회용)
+def check_user_liked(post_id, user_id):
+    result = get_liked_post_ids(user_id, [post_id])
+    if result["status"] != "SUCCESS":
+        return result
+    return {"status": "SUCCESS", "liked": post_id in result["liked_post_ids"]}
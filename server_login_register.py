@@ -2,32 +2,59 @@
 # 회원가입 및 로그인 기능을 담당하는 모듈
 
 import mysql.connector
-from flask_bcrypt import Bcrypt
+from mysql.connector import errorcode
 from db_utils import get_connection, close_connection
+from password_hasher import HasherBusy, password_hasher
 
-# 1. Bcrypt 객체 생성 (비밀번호 암호화를 위한 도구)
-bcrypt = Bcrypt()
+# 1. 비밀번호 해싱은 password_hasher의 전용 실행기에서 처리 (요청 스레드에서 bcrypt를 직접 돌리지 않음)
+# 해싱 대기열이 가득 차면 {"status": "FAILURE", "busy": True, "retry_after": 초} 반환 → API에서 503 응답
+# 사용자 없음/비밀번호 불일치는 "bad_credentials": True 포함 → API에서 계정별 로그인 실패 한도에 반영
+# (DB 연결 실패 등 서버 쪽 오류로 사용자의 실패 횟수가 늘지 않도록)
+
+
+def _busy_result(e):
+    return {"status": "FAILURE", "busy": True, "retry_after": e.retry_after, "message": str(e)}
+
+
+def _bad_credentials_result():
+    return {"status": "FAILURE", "bad_credentials": True, "message": "사용자 이름 또는 비밀번호가 잘못되었습니다."}
 
 # A. 회원가입 로직
 def register_user(email, password):
     # 새 사용자를 등록, DB에 저장
+    # 1. 이메일 중복 확인 (해싱 전에 확인해 이미 있는 이메일로는 해싱 비용이 들지 않도록)
     conn = get_connection()
     if not conn: # DB 연결 실패 시
         return {"status": "FAILURE", "message": "DB 연결 실패"}
 
     try:
         cursor = conn.cursor()
-        
-        # 1. 이메일 중복 확인
         check_query = "SELECT id FROM users WHERE email = %s"
         cursor.execute(check_query, (email,))
         if cursor.fetchone():
             return {"status": "FAILURE", "message": "이미 존재하는 이메일입니다."}
-            
-        # 2. 비밀번호 해싱 
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-        
-        # 3. DB에 사용자 정보 삽입
+
+    except mysql.connector.Error as e:
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        # 해싱을 기다리는 동안 DB 연결을 잡고 있지 않도록 확인 직후 반납
+        close_connection(conn)
+
+    # 2. 비밀번호 해싱
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HasherBusy as e:
+        return _busy_result(e)
+
+    conn = get_connection()
+    if not conn: # DB 연결 실패 시
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    try:
+        cursor = conn.cursor()
+
+        # 3. DB에 사용자 정보 삽입 (비밀번호는 위에서 해싱한 값)
         insert_user_query = "INSERT INTO users (email, password) VALUES (%s, %s)"
         cursor.execute(insert_user_query, (email, hashed_password))
         
@@ -36,6 +63,13 @@ def register_user(email, password):
 
         return {"status": "SUCCESS", "message": "회원가입이 완료되었습니다."}
 
+    except mysql.connector.IntegrityError as e:
+        # 확인과 삽입 사이에 같은 이메일이 먼저 가입된 경우 (email UNIQUE 제약)
+        conn.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            return {"status": "FAILURE", "message": "이미 존재하는 이메일입니다."}
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
     except mysql.connector.Error as e:
         # 오류 발생 시 저장된 내용 취소
         conn.rollback() 
@@ -58,26 +92,76 @@ def login_user(email, password):
         select_query = "SELECT id, password FROM users WHERE email = %s"
         cursor.execute(select_query, (email,))
         result = cursor.fetchone()
-        
-        if not result:
-            # 해당 이메일을 가진 사용자가 없으면
-            return {"status": "FAILURE", "message": "사용자 이름 또는 비밀번호가 잘못되었습니다."}
-        
-        user_id, hashed_password_from_db = result
-        
-        # 2. 비밀번호 일치 확인 (암호화된 비밀번호와 비교)
-        # 입력된 비밀번호를 암호화하여 DB의 해시 값과 비교
-        if bcrypt.check_password_hash(hashed_password_from_db, password):
-            # 비밀번호 일치
-            
-            # TODO: ID를 생성하고 반환하는 로직이 추가
-            return {"status": "SUCCESS", "user_id": user_id, "message": "로그인 성공"}
-        else:
-            # 비밀번호 불일치
-            return {"status": "FAILURE", "message": "사용자 이름 또는 비밀번호가 잘못되었습니다."}
 
     except mysql.connector.Error as e:
         return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
         
     finally:
-        close_connection(conn)
\ No newline at end of file
+        # 해시 검증(수백 ms)을 기다리는 동안 연결을 잡고 있지 않도록 조회 직후 반납
+        close_connection(conn)
+
+    if not result:
+        # 해당 이메일을 가진 사용자가 없으면
+        return _bad_credentials_result()
+    
+    user_id, hashed_password_from_db = result
+    
+    # 2. 비밀번호 일치 확인 (암호화된 비밀번호와 비교)
+    # 입력된 비밀번호를 암호화하여 DB의 해시 값과 비교
+    try:
+        if not password_hasher.verify(password, hashed_password_from_db):
+            # 비밀번호 불일치
+            return _bad_credentials_result()
+    except HasherBusy as e:
+        return _busy_result(e)
+
+    # 3. 해시 비용(rounds) 설정이 바뀌었으면 새 비용으로 다시 해싱해 저장 (사용자는 알 필요 없음)
+    # 검증은 이미 성공했으므로 재해싱은 기다리지 않고 실행기에 넣기만 함 (대기열이 가득 차면 다음 로그인 때 다시 시도)
+    if password_hasher.needs_rehash(hashed_password_from_db):
+        password_hasher.rehash_later(
+            password,
+            lambda new_hash: _update_password_hash(user_id, hashed_password_from_db, new_hash),
+        )
+
+    # TODO: ID를 생성하고 반환하는 로직이 추가
+    return {"status": "SUCCESS", "user_id": user_id, "message": "로그인 성공"}
+
+
+def _update_password_hash(user_id, old_hash, new_hash):
+    # 로그인 중 재해싱한 비밀번호 저장 (그 사이 비밀번호가 바뀌었으면 덮어쓰지 않음)
+    # 실패해도 로그인은 성공으로 처리 (다음 로그인 때 다시 시도)
+    conn = get_connection()
+    if not conn:
+        return False
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET password = %s WHERE id = %s AND password = %s",
+            (new_hash, user_id, old_hash),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+    except mysql.connector.Error as e:
+        conn.rollback()
+        print(f"[LOGIN] 비밀번호 재해싱 저장 실패 (user_id={user_id}): {e}")
+        return False
+    finally:
+        close_connection(conn)
+
+
+# C. 관리자 확인
+def is_admin(user_id):
+    # users.role이 'admin'이면 True (사용자가 없거나 DB 오류면 False)
+    conn = get_connection()
+    if not conn:
+        return False
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT role FROM users WHERE id = %s", (user_id,))
+        row = cursor.fetchone()
+        return row is not None and row[0] == "admin"
+    except mysql.connector.Error as e:
+        print(f"[LOGIN] 관리자 확인 실패 (user_id={user_id}): {e}")
+        return False
+    finally:
+        close_connection(conn)
@@ -1,10 +1,32 @@
 # server_posts.py
 # 게시글 데이터베이스 CRUD 로직을 담당하는 모듈
 
+import base64
+import json
+import math
 import mysql.connector
 from db_utils import get_connection, close_connection
+from counter_buffer import view_counts, like_counts, comment_counts
+from cache_utils import post_cache
+from author_names import author_names
+import server_search
 from datetime import datetime
 
+# 게시글 목록 페이지 크기 (limit 미지정 시 기본값 / 최대값)
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# 조회수가 DB에 일괄 반영되면 해당 게시글 상세 캐시를 비워서 반영된 값을 다시 읽도록 함
+# (목록 페이지의 조회수는 캐시 TTL 동안 이전 값이 보일 수 있음)
+view_counts.add_flush_listener(post_cache.invalidate_posts)
+
+# 좋아요/댓글 수는 목록 페이지에도 보이므로 반영되면 상세 캐시와 목록 페이지를 함께 무효화
+def _invalidate_posts_and_lists(post_ids):
+    post_cache.invalidate_posts(post_ids, lists=True)
+
+like_counts.add_flush_listener(_invalidate_posts_and_lists)
+comment_counts.add_flush_listener(_invalidate_posts_and_lists)
+
 
 
 # -------------------------- 1. 게시글 생성 (Create) --------------------------
@@ -36,6 +58,9 @@ def create_post(user_id, title, body, pinned=False, private=False):
         
         # 변경 사항 DB에 확정
         conn.commit()
+        # 새 게시글이 목록에 보이도록 목록 캐시 무효화
+        post_cache.invalidate_lists()
+        server_search.index_post(new_post_id, title, body, private)
         # 성공 메시지와 생성된 ID 반환
         return {"status": "SUCCESS", "message": "게시글이 성공적으로 작성되었습니다.", "post_id": new_post_id}
 
@@ -50,52 +75,142 @@ def create_post(user_id, title, body, pinned=False, private=False):
 
 
 
+# -------------------------- 목록 커서 인코딩/디코딩 --------------------------
+# 커서는 마지막으로 받은 게시글의 (pinned, created_at, post_id)를 JSON으로 묶어
+# URL-safe base64로 인코딩한 불투명 문자열 (클라이언트는 내용을 해석하지 않고 그대로 돌려보냄)
+def encode_cursor(pinned, created_at, post_id):
+    raw = json.dumps([int(bool(pinned)), created_at, post_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    # 잘못된 커서면 None 반환
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        pinned, created_at, post_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")
+        return int(pinned), created_at, int(post_id)
+    except (ValueError, TypeError):
+        return None
+
+
+
+# 인기 목록 커서: 마지막 게시글의 (hot_score, post_id)
+def encode_hot_cursor(hot_score, post_id):
+    raw = json.dumps([hot_score, post_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_hot_cursor(cursor):
+    # 잘못된 커서면 None 반환
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        hot_score, post_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        hot_score = float(hot_score)
+        # json은 NaN/Infinity도 읽으므로 유한한 점수만 허용 (NaN은 비교가 항상 거짓이라 목록이 비거나 어긋남)
+        if not math.isfinite(hot_score):
+            return None
+        return hot_score, int(post_id)
+    except (ValueError, TypeError):
+        return None
+
+
+# 목록 조회 결과 행 → 게시글 dict (SELECT 열 순서: post_id, title, body, created_at, like_count,
+# comment_count, view_count, pinned, private, user_id)
+def _list_item(row):
+    return {
+        "post_id": row[0],
+        "title": row[1],
+        "body": row[2],
+        # 날짜/시간 형식 변환
+        "created_at": row[3].strftime("%Y-%m-%d %H:%M:%S") if isinstance(row[3], datetime) else str(row[3]),
+        "like_count": row[4],
+        "comment_count": row[5],
+        "view_count": row[6],
+        "pinned": bool(row[7]),
+        "private": bool(row[8]),
+        "user_id": row[9]
+    }
+
+
+
 # -------------------------- 2. 게시글 전체 목록 조회 (Read - List) --------------------------
-def get_all_posts():
+# limit: 한 페이지에 가져올 게시글 수 (기본 DEFAULT_PAGE_SIZE, 최대 MAX_PAGE_SIZE)
+# cursor: 이전 페이지 응답의 next_cursor (첫 페이지는 None)
+def get_all_posts(limit=DEFAULT_PAGE_SIZE, cursor=None):
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if after is None:
+            return {"status": "FAILURE", "message": "잘못된 커서입니다."}
+
+    # 같은 페이지 요청이 캐시에 있으면 DB 조회 없이 반환
+    list_key = post_cache.list_key(limit, cursor)
+    cached = post_cache.get(list_key)
+    if cached is not None:
+        return cached
+
     # DB 연결 객체 가져오기
     conn = get_connection()
     if not conn:
         return {"status": "FAILURE", "message": "DB 연결 실패"}
 
     try:
-        cursor = conn.cursor()
+        cursor_obj = conn.cursor()
         
         # 게시글 정보 조회 쿼리
         # private=FALSE인 게시글만 조회
         # pinned=TRUE인 게시글이 최상단에 오도록 정렬, 그 후 최신순(created_at DESC) 정렬
-        select_query = """
+        # 키셋(커서) 페이지네이션: OFFSET 대신 마지막 행의 (pinned, created_at, post_id) 이후부터 읽어서
+        # idx_posts_list (private, pinned, created_at, post_id) 인덱스 범위 스캔으로 처리됨
+        where_clause = "p.private = FALSE"
+        params = []
+        if after:
+            pinned, created_at, post_id = after
+            where_clause += """
+          AND (p.pinned < %s
+               OR (p.pinned = %s AND (p.created_at < %s
+                                      OR (p.created_at = %s AND p.post_id < %s))))"""
+            params = [pinned, pinned, created_at, created_at, post_id]
+
+        # 다음 페이지 존재 여부를 알기 위해 limit + 1개 조회
+        select_query = f"""
         SELECT 
             p.post_id, p.title, p.body, p.created_at, p.like_count, p.comment_count, 
-            p.view_count, p.pinned, p.private, COALESCE(pr.name, '익명') AS user_name, p.user_id
+            p.view_count, p.pinned, p.private, p.user_id
         FROM posts p
-        LEFT JOIN profiles pr ON p.user_id = pr.user_id
-        WHERE p.private = FALSE
-        ORDER BY p.pinned DESC, p.created_at DESC
+        WHERE {where_clause}
+        ORDER BY p.pinned DESC, p.created_at DESC, p.post_id DESC
+        LIMIT %s
         """
-        cursor.execute(select_query)
-        rows = cursor.fetchall()
+        cursor_obj.execute(select_query, (*params, limit + 1))
+        rows = cursor_obj.fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
-        posts_list = []
         # 조회된 결과를 JSON 형태로 변환
-        for row in rows:
-            post = {
-                "post_id": row[0],
-                "title": row[1],
-                "body": row[2],
-                # 날짜/시간 형식 변환
-                "created_at": row[3].strftime("%Y-%m-%d %H:%M:%S") if isinstance(row[3], datetime) else str(row[3]),
-                "like_count": row[4],
-                "comment_count": row[5],
-                "view_count": row[6],
-                "pinned": bool(row[7]),
-                "private": bool(row[8]),
-                "user_name": row[9],
-                "user_id": row[10]
-            }
-            posts_list.append(post)
+        posts_list = [_list_item(row) for row in rows]
+
+        # 작성자 이름은 profiles JOIN 대신 이름 캐시에서 페이지 단위로 채움 (캐시 미스만 IN 쿼리 1회)
+        author_names.fill(cursor_obj, posts_list)
+
+        # 마지막 행 기준으로 다음 페이지 커서 생성
+        next_cursor = None
+        if has_more:
+            last = posts_list[-1]
+            next_cursor = encode_cursor(last["pinned"], last["created_at"], last["post_id"])
             
-        # 성공 메시지, 게시글 목록, 총 개수 반환
-        return {"status": "SUCCESS", "posts": posts_list, "total_posts": len(posts_list)}
+        # 성공 메시지, 게시글 목록, 이번 페이지 개수, 다음 페이지 커서 반환
+        result = {
+            "status": "SUCCESS",
+            "posts": posts_list,
+            "total_posts": len(posts_list),
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
+        post_cache.set(list_key, result)
+        return result
 
     except mysql.connector.Error as e:
         return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
@@ -106,11 +221,127 @@ def get_all_posts():
 
 
 
+# -------------------------- 2-1. 인기 게시글 목록 조회 (Read - Hot Feed) --------------------------
+# 조회/좋아요/댓글이 생길 때마다 누적되고 시간이 지나면 감쇠하는 posts.hot_score 순 (hot_feed.py 참고)
+# limit: 한 페이지에 가져올 게시글 수, cursor: 이전 페이지 응답의 next_cursor (첫 페이지는 None)
+# 점수는 페이지를 넘기는 사이에도 바뀌므로 다음 페이지에 앞 페이지 게시글이 다시 나올 수 있음
+def get_hot_posts(limit=DEFAULT_PAGE_SIZE, cursor=None):
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    after = None
+    if cursor:
+        after = decode_hot_cursor(cursor)
+        if after is None:
+            return {"status": "FAILURE", "message": "잘못된 커서입니다."}
+
+    list_key = post_cache.list_key(limit, cursor, feed="hot")
+    cached = post_cache.get(list_key)
+    if cached is not None:
+        return cached
+
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    try:
+        cursor_obj = conn.cursor()
+
+        # idx_posts_hot (private, hot_score, post_id) 인덱스를 역순으로 범위 스캔해 상위 limit + 1개만 읽음
+        where_clause = "p.private = FALSE"
+        params = []
+        if after:
+            hot_score, post_id = after
+            where_clause += " AND (p.hot_score < %s OR (p.hot_score = %s AND p.post_id < %s))"
+            params = [hot_score, hot_score, post_id]
+
+        select_query = f"""
+        SELECT 
+            p.post_id, p.title, p.body, p.created_at, p.like_count, p.comment_count, 
+            p.view_count, p.pinned, p.private, p.user_id, p.hot_score
+        FROM posts p
+        WHERE {where_clause}
+        ORDER BY p.hot_score DESC, p.post_id DESC
+        LIMIT %s
+        """
+        cursor_obj.execute(select_query, (*params, limit + 1))
+        rows = cursor_obj.fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        posts_list = []
+        for row in rows:
+            post = _list_item(row)
+            post["hot_score"] = float(row[10])
+            posts_list.append(post)
+        author_names.fill(cursor_obj, posts_list)
+
+        next_cursor = None
+        if has_more:
+            last = posts_list[-1]
+            next_cursor = encode_hot_cursor(last["hot_score"], last["post_id"])
+
+        result = {
+            "status": "SUCCESS",
+            "posts": posts_list,
+            "total_posts": len(posts_list),
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
+        post_cache.set(list_key, result)
+        return result
+
+    except mysql.connector.Error as e:
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        close_connection(conn)
+
+
+
 
 # -------------------------- 3. 게시글 상세 조회 (Read - Detail) --------------------------
 # post_id: 조회할 게시글의 ID
 # requested_user_id: 요청을 보낸 사용자의 ID (비로그인 시 None)
 def get_post_detail(post_id, requested_user_id=None):
+    # 1. 상세 정보 조회 (캐시에 없을 때만 DB 조회)
+    detail_key = post_cache.post_key(post_id)
+    post_detail = post_cache.get(detail_key)
+    if post_detail is None:
+        result = _load_post_detail(post_id)
+        if result["status"] != "SUCCESS":
+            return result
+        post_detail = result["post"]
+        post_cache.set(detail_key, post_detail)
+
+    # 2. Private 게시글 권한 확인
+    # 비공개(private=True)인 경우, 요청자가 작성자 본인이 아니라면 접근 거부
+    if post_detail["private"] and (requested_user_id is None or post_detail["user_id"] != requested_user_id):
+        return {"status": "FAILURE", "message": "비공개 게시글이거나, 접근 권한이 없습니다."}
+
+    # 3. 조회수 증가 (접근 권한 확인 후 증가)
+    if view_counts.buffered:
+        # 메모리 버퍼에 누적만 하고 DB 반영은 counter_buffer가 주기적으로 일괄 처리 (읽기 경로에서 쓰기 잠금 없음)
+        view_counts.add(post_id)
+        # 응답에는 이번 조회와 아직 반영되지 않은 증가분까지 포함
+        post_detail["view_count"] += view_counts.pending(post_id)
+    else:
+        # sync 모드: 조회수 증가를 즉시 DB에 반영
+        result = _increment_view_count(post_id)
+        if result["status"] != "SUCCESS":
+            return result
+        post_cache.invalidate_post(post_id, lists=False)
+        post_detail["view_count"] += 1
+
+    # 4. 아직 DB에 반영되지 않은 좋아요/댓글 증감분 보정 (sync 모드에서는 항상 0)
+    post_detail["like_count"] += like_counts.pending(post_id)
+    post_detail["comment_count"] += comment_counts.pending(post_id)
+
+    return {"status": "SUCCESS", "post": post_detail}
+
+
+# DB에서 게시글 상세 정보를 읽어옴 (조회수 증가/권한 확인 없음, 캐시 미스 시 사용)
+def _load_post_detail(post_id):
     # DB 연결 객체 가져오기
     conn = get_connection()
     if not conn:
@@ -119,40 +350,20 @@ def get_post_detail(post_id, requested_user_id=None):
     try:
         cursor = conn.cursor()
         
-        # 0. 게시글 존재 여부 및 권한 체크를 위한 기본 정보 조회
-        check_query = "SELECT user_id, private FROM posts WHERE post_id = %s"
-        cursor.execute(check_query, (post_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            # 게시글이 존재하지 않는 경우
-            return {"status": "FAILURE", "message": "게시글을 찾을 수 없습니다."}
-            
-        post_owner_id, is_private = result
-        is_private = bool(is_private)
-        
-        # 1. Private 게시글 권한 확인
-        # 비공개(private=True)인 경우, 요청자가 작성자 본인이 아니라면 접근 거부
-        if is_private and (requested_user_id is None or post_owner_id != requested_user_id):
-            return {"status": "FAILURE", "message": "비공개 게시글이거나, 접근 권한이 없습니다."}
-
-        # 2. 조회수 증가 (접근 권한 확인 후 증가)
-        update_view_count_query = "UPDATE posts SET view_count = view_count + 1 WHERE post_id = %s"
-        cursor.execute(update_view_count_query, (post_id,))
-        # 조회수 증가는 즉시 DB에 반영
-        conn.commit() 
-
-        # 3. 상세 정보 조회 (증가된 view_count 포함)
+        # 상세 정보 조회 (존재 여부/권한 체크에 필요한 user_id, private 포함 - 한 번의 SELECT로 처리)
         select_query = """
         SELECT 
             p.post_id, p.title, p.body, p.created_at, p.like_count, p.comment_count, 
-            p.view_count, p.pinned, p.private, COALESCE(pr.name, '익명') AS user_name, p.user_id
+            p.view_count, p.pinned, p.private, p.user_id
         FROM posts p
-        LEFT JOIN profiles pr ON p.user_id = pr.user_id
         WHERE p.post_id = %s
         """
         cursor.execute(select_query, (post_id,))
         row = cursor.fetchone()
+        
+        if not row:
+            # 게시글이 존재하지 않는 경우
+            return {"status": "FAILURE", "message": "게시글을 찾을 수 없습니다."}
             
         # 조회된 결과를 딕셔너리로 변환
         post_detail = {
@@ -165,15 +376,13 @@ def get_post_detail(post_id, requested_user_id=None):
             "view_count": row[6],
             "pinned": bool(row[7]),
             "private": bool(row[8]),
-            "user_name": row[9],
-            "user_id": row[10]
+            "user_id": row[9]
         }
+        author_names.fill(cursor, [post_detail])
         
         return {"status": "SUCCESS", "post": post_detail}
 
     except mysql.connector.Error as e:
-        # DB 오류 발생 시 롤백 (조회수 증가 포함)
-        conn.rollback() 
         return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
 
     finally:
@@ -181,6 +390,27 @@ def get_post_detail(post_id, requested_user_id=None):
         close_connection(conn)
 
 
+# sync 모드 조회수 증가 (요청마다 즉시 UPDATE 후 COMMIT)
+def _increment_view_count(post_id):
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    try:
+        cursor = conn.cursor()
+        # 조회수와 인기 점수를 함께 증가
+        view_counts.increment_now(cursor, post_id)
+        conn.commit()
+        return {"status": "SUCCESS"}
+
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        close_connection(conn)
+
+
 
 
 # -------------------------- 4. 게시글 수정 (Update) --------------------------
@@ -221,6 +451,9 @@ def update_post(post_id, user_id, title, body, pinned, private):
         
         # 변경 사항 DB에 확정
         conn.commit()
+        # 수정된 게시글의 상세 캐시와 목록 캐시 무효화
+        post_cache.invalidate_post(post_id)
+        server_search.index_post(post_id, title, body, private)
         return {"status": "SUCCESS", "message": "게시글이 성공적으로 수정되었습니다."}
 
     except mysql.connector.Error as e:
@@ -269,6 +502,9 @@ def delete_post(post_id, user_id):
         
         # 변경 사항 DB에 확정
         conn.commit()
+        # 삭제된 게시글의 상세 캐시와 목록 캐시 무효화
+        post_cache.invalidate_post(post_id)
+        server_search.remove_post(post_id)
         return {"status": "SUCCESS", "message": "게시글이 성공적으로 삭제되었습니다."}
         
     except mysql.connector.Error as e:
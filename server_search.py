@@ -0,0 +1,321 @@
+# server_search.py
+# 게시글/댓글 검색 로직을 담당하는 모듈
+# - 기본: MySQL FULLTEXT 인덱스 (ngram 파서, 한국어 2글자 단위) + MATCH ... AGAINST 관련도 점수 순 정렬
+# - MySQL FULLTEXT를 쓸 수 없으면 search_index의 프로세스 내 역색인으로 검색 (SEARCH_BACKEND)
+#   memory 엔진은 첫 검색 때 DB에서 게시글/댓글을 읽어 색인하고, 이후 게시글/댓글 작성/수정/삭제 시 갱신함
+#   (프로세스마다 따로 색인하므로 서버 프로세스가 하나인 배포용)
+# - 어느 엔진이든 결과 ID만 순위대로 받고, 이번 페이지 행만 DB에서 읽어 최신 내용과 공개 여부를 확인함
+
+import base64
+import json
+import threading
+import time
+import mysql.connector
+from mysql.connector import errorcode
+from db_utils import get_connection, close_connection
+from author_names import author_names
+from search_index import InvertedIndex
+from datetime import datetime
+
+# -------------------------- 설정 --------------------------
+# "mysql": FULLTEXT 인덱스 사용 / "memory": 프로세스 내 역색인 사용
+# "auto": mysql로 시작하고 FULLTEXT 인덱스가 없으면 memory로 전환
+SEARCH_BACKEND = "auto"
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 50
+MAX_SEARCH_OFFSET = 500         # 관련도 순 결과는 이 위치까지만 페이지를 넘길 수 있음 (깊은 페이지는 비용만 큼)
+MIN_QUERY_LENGTH = 2            # ngram_token_size(2)보다 짧은 검색어는 색인에 없음
+MAX_QUERY_LENGTH = 100
+SNIPPET_LENGTH = 120            # 결과에 포함할 본문 앞부분 길이
+INDEX_BUILD_CHUNK = 1000        # memory 엔진 색인 시 한 번에 읽는 행 수
+
+SEARCH_TYPES = {"all": ("post", "comment"), "posts": ("post",), "comments": ("comment",)}
+
+_active_backend = "mysql" if SEARCH_BACKEND in ("mysql", "auto") else "memory"
+_memory_index = InvertedIndex()
+_index_ready = False
+_index_building = False         # 첫 색인 중에도 변경 훅을 반영 (색인 도중 커밋된 변경이 빠지지 않도록)
+_index_lock = threading.Lock()  # 색인 작업은 한 번에 하나만
+_hook_lock = threading.Lock()   # 변경 훅 반영과 색인 중 행 추가를 한 단위로 처리
+_build_touched = set()          # 색인 중 변경 훅이 반영한 문서 키 (DB에서 먼저 읽은 이전 내용으로 덮어쓰지 않음)
+_build_removed_posts = set()    # 색인 중 삭제된 게시글 ID (그 댓글을 다시 색인하지 않음)
+_stats_lock = threading.Lock()
+_stats = {"queries": 0, "total_ms": 0.0, "fallbacks": 0, "index_builds": 0}
+
+
+# -------------------------- 검색 커서 인코딩/디코딩 --------------------------
+# 관련도 순 결과는 키셋으로 이어 읽을 수 없으므로 커서에 다음 위치(offset)를 담아 불투명 문자열로 전달
+def encode_search_cursor(offset):
+    raw = json.dumps([offset], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_search_cursor(cursor):
+    # 잘못된 커서면 None 반환
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (offset,) = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(offset)
+        return offset if 0 <= offset <= MAX_SEARCH_OFFSET else None
+    except (ValueError, TypeError):
+        return None
+
+
+# -------------------------- MySQL FULLTEXT 검색 --------------------------
+def _mysql_ranked(cursor, query, kinds, count):
+    # 관련도 순 (doc_key, score) 목록 (종류별로 count개까지 읽어 점수 순으로 합침)
+    ranked = []
+    if "post" in kinds:
+        cursor.execute("""
+        SELECT post_id, MATCH(title, body) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score
+        FROM posts
+        WHERE private = FALSE AND MATCH(title, body) AGAINST (%s IN NATURAL LANGUAGE MODE)
+        ORDER BY score DESC, post_id DESC
+        LIMIT %s
+        """, (query, query, count))
+        ranked.extend((("post", row[0]), float(row[1])) for row in cursor.fetchall())
+    if "comment" in kinds:
+        cursor.execute("""
+        SELECT c.comment_id, MATCH(c.comment_body) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score
+        FROM comments c
+        JOIN posts p ON p.post_id = c.post_id
+        WHERE p.private = FALSE AND MATCH(c.comment_body) AGAINST (%s IN NATURAL LANGUAGE MODE)
+        ORDER BY score DESC, c.comment_id DESC
+        LIMIT %s
+        """, (query, query, count))
+        ranked.extend((("comment", row[0]), float(row[1])) for row in cursor.fetchall())
+    ranked.sort(key=lambda item: (item[1], item[0][1]), reverse=True)
+    return ranked
+
+
+# -------------------------- 프로세스 내 역색인 (memory 엔진) --------------------------
+def _ensure_memory_index(cursor):
+    # 첫 검색 때 posts/comments를 post_id/comment_id 순서로 나눠 읽어 색인 (이후에는 변경 훅으로 갱신)
+    # 색인 중에도 변경 훅을 반영하고, 훅이 먼저 반영한 문서는 DB에서 읽은 행으로 덮어쓰지 않음
+    global _index_ready, _index_building
+    if _index_ready:
+        return
+    with _index_lock:
+        if _index_ready:
+            return
+        with _hook_lock:
+            _memory_index.clear()
+            _build_touched.clear()
+            _build_removed_posts.clear()
+            _index_building = True
+        try:
+            last_id = 0
+            while True:
+                cursor.execute(
+                    "SELECT post_id, title, body, private FROM posts WHERE post_id > %s ORDER BY post_id LIMIT %s",
+                    (last_id, INDEX_BUILD_CHUNK),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                with _hook_lock:
+                    for post_id, title, body, private in rows:
+                        if ("post", post_id) not in _build_touched:
+                            _memory_index.add_post(post_id, title, body, bool(private))
+                last_id = rows[-1][0]
+            last_id = 0
+            while True:
+                cursor.execute(
+                    "SELECT comment_id, post_id, comment_body FROM comments WHERE comment_id > %s ORDER BY comment_id LIMIT %s",
+                    (last_id, INDEX_BUILD_CHUNK),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                with _hook_lock:
+                    for comment_id, post_id, body in rows:
+                        if ("comment", comment_id) not in _build_touched and post_id not in _build_removed_posts:
+                            _memory_index.add_comment(comment_id, post_id, body)
+                last_id = rows[-1][0]
+            with _hook_lock:
+                _index_ready = True
+        finally:
+            # 색인 도중 실패하면 다음 검색에서 처음부터 다시 색인
+            with _hook_lock:
+                _index_building = False
+                _build_touched.clear()
+                _build_removed_posts.clear()
+        with _stats_lock:
+            _stats["index_builds"] += 1
+
+
+# 게시글/댓글 변경 훅 (server_posts, server_comment에서 커밋 후 호출, memory 색인이 없으면 아무것도 안 함)
+# 색인 중이면 색인에 바로 반영하고 문서 키를 기록해 둠 (InvertedIndex는 같은 키를 교체하므로 중복 반영해도 무방)
+def index_post(post_id, title, body, private=False):
+    with _hook_lock:
+        if _index_ready or _index_building:
+            _memory_index.add_post(post_id, title, body, bool(private))
+            if _index_building:
+                _build_touched.add(("post", post_id))
+
+def remove_post(post_id):
+    with _hook_lock:
+        if _index_ready or _index_building:
+            _memory_index.remove_post(post_id)
+            if _index_building:
+                _build_touched.add(("post", post_id))
+                _build_removed_posts.add(post_id)
+
+def index_comment(comment_id, post_id, body):
+    with _hook_lock:
+        if _index_ready or _index_building:
+            _memory_index.add_comment(comment_id, post_id, body)
+            if _index_building:
+                _build_touched.add(("comment", comment_id))
+
+def remove_comments(comment_ids):
+    with _hook_lock:
+        if _index_ready or _index_building:
+            _memory_index.remove_comments(comment_ids)
+            if _index_building:
+                _build_touched.update(("comment", comment_id) for comment_id in comment_ids)
+
+
+# -------------------------- 결과 행 읽기 --------------------------
+def _snippet(text):
+    text = " ".join((text or "").split())
+    return text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH] + "…"
+
+def _format_date(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime) else str(value)
+
+def _load_results(cursor, ranked):
+    # 순위가 정해진 doc_key 목록의 이번 페이지 행만 읽어 결과 목록 생성 (삭제/비공개 전환된 항목은 제외)
+    post_ids = [key[1] for key, _ in ranked if key[0] == "post"]
+    comment_ids = [key[1] for key, _ in ranked if key[0] == "comment"]
+    rows = {}
+
+    if post_ids:
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        cursor.execute(f"""
+        SELECT post_id, title, body, created_at, like_count, comment_count, view_count, pinned, user_id
+        FROM posts
+        WHERE post_id IN ({placeholders}) AND private = FALSE
+        """, post_ids)
+        for row in cursor.fetchall():
+            rows[("post", row[0])] = {
+                "type": "post",
+                "post_id": row[0],
+                "title": row[1],
+                "snippet": _snippet(row[2]),
+                "created_at": _format_date(row[3]),
+                "like_count": row[4],
+                "comment_count": row[5],
+                "view_count": row[6],
+                "pinned": bool(row[7]),
+                "user_id": row[8],
+            }
+
+    if comment_ids:
+        placeholders = ", ".join(["%s"] * len(comment_ids))
+        cursor.execute(f"""
+        SELECT c.comment_id, c.post_id, p.title, c.comment_body, c.created_at, c.user_id
+        FROM comments c
+        JOIN posts p ON p.post_id = c.post_id
+        WHERE c.comment_id IN ({placeholders}) AND p.private = FALSE
+        """, comment_ids)
+        for row in cursor.fetchall():
+            rows[("comment", row[0])] = {
+                "type": "comment",
+                "comment_id": row[0],
+                "post_id": row[1],
+                "title": row[2],
+                "snippet": _snippet(row[3]),
+                "created_at": _format_date(row[4]),
+                "user_id": row[5],
+            }
+
+    results = []
+    for key, score in ranked:
+        item = rows.get(key)
+        if item is not None:
+            item["score"] = round(score, 4)
+            results.append(item)
+    author_names.fill(cursor, results)
+    return results
+
+
+# -------------------------- 검색 (Read) --------------------------
+# query: 검색어, search_type: "all" / "posts" / "comments"
+# limit: 한 페이지 결과 수, cursor: 이전 응답의 next_cursor (첫 페이지는 None)
+def search(query, search_type="all", limit=DEFAULT_SEARCH_PAGE_SIZE, cursor=None):
+    global _active_backend
+    query = " ".join((query or "").split())
+    if len(query) < MIN_QUERY_LENGTH:
+        return {"status": "FAILURE", "message": f"검색어를 {MIN_QUERY_LENGTH}글자 이상 입력해주세요."}
+    query = query[:MAX_QUERY_LENGTH]
+    kinds = SEARCH_TYPES.get(search_type)
+    if kinds is None:
+        return {"status": "FAILURE", "message": "잘못된 검색 종류입니다."}
+    limit = max(1, min(int(limit), MAX_SEARCH_PAGE_SIZE))
+
+    offset = 0
+    if cursor:
+        offset = decode_search_cursor(cursor)
+        if offset is None:
+            return {"status": "FAILURE", "message": "잘못된 커서입니다."}
+
+    conn = get_connection()
+    if not conn:
+        return {"status": "FAILURE", "message": "DB 연결 실패"}
+
+    started = time.perf_counter()
+    try:
+        cursor_obj = conn.cursor()
+
+        # 1. 검색 엔진에서 이번 페이지까지의 순위 (다음 페이지 존재 여부 확인용으로 1개 더)
+        ranked = None
+        if _active_backend == "mysql":
+            try:
+                ranked = _mysql_ranked(cursor_obj, query, kinds, offset + limit + 1)
+                has_more = len(ranked) > offset + limit
+                ranked = ranked[offset:offset + limit]
+            except mysql.connector.Error as e:
+                if SEARCH_BACKEND != "auto" or e.errno != errorcode.ER_FT_MATCHING_KEY_NOT_FOUND:
+                    raise
+                # FULLTEXT 인덱스가 없는 DB → 이후 검색은 프로세스 내 역색인 사용
+                print("[SEARCH] FULLTEXT 인덱스가 없어 memory 검색 엔진으로 전환합니다.")
+                _active_backend = "memory"
+                with _stats_lock:
+                    _stats["fallbacks"] += 1
+        if ranked is None:
+            _ensure_memory_index(cursor_obj)
+            ranked, has_more = _memory_index.search(query, kinds, limit, offset)
+
+        # 2. 이번 페이지 행만 DB에서 읽기
+        results = _load_results(cursor_obj, ranked)
+
+        next_offset = offset + limit
+        next_cursor = encode_search_cursor(next_offset) if has_more and next_offset <= MAX_SEARCH_OFFSET else None
+        return {
+            "status": "SUCCESS",
+            "query": query,
+            "type": search_type,
+            "results": results,
+            "total_results": len(results),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+
+    except mysql.connector.Error as e:
+        return {"status": "FAILURE", "message": f"DB 처리 중 오류 발생: {e}"}
+
+    finally:
+        close_connection(conn)
+        with _stats_lock:
+            _stats["queries"] += 1
+            _stats["total_ms"] += (time.perf_counter() - started) * 1000
+
+
+def get_search_stats():
+    # 검색 횟수, 평균 처리 시간, 사용 중인 엔진, memory 색인 크기
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["avg_ms"] = round(stats.pop("total_ms") / stats["queries"], 2) if stats["queries"] else 0.0
+    stats["backend"] = _active_backend
+    stats["index"] = _memory_index.stats() if _index_ready else None
+    return stats
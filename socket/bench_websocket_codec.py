@@ -0,0 +1,87 @@
+"""
+WebSocket 프레임 디코딩 마이크로벤치마크
+기존 방식(바이트 단위 언마스킹)과 websocket_codec.FrameDecoder(정수 XOR 일괄 언마스킹)를
+100 B / 4 KB / 1 MB 프레임에서 비교
+
+사용법:
+    python bench_websocket_codec.py
+"""
+
+import os
+import time
+
+from websocket_codec import FrameDecoder, encode_frame, OP_TEXT
+
+FRAME_SIZES = [100, 4 * 1024, 1024 * 1024]
+TARGET_SECONDS = 0.5   # 크기마다 대략 이 시간만큼 반복
+READ_CHUNK = 64 * 1024  # 서버가 소켓에서 한 번에 읽는 크기와 동일
+
+
+def legacy_unmask(payload, masking_key):
+    """기존 receive_websocket_frame의 언마스킹 (바이트마다 파이썬 루프)"""
+    return bytes(payload[i] ^ masking_key[i % 4] for i in range(len(payload)))
+
+
+def decode_legacy(frame):
+    """기존 방식: 헤더 파싱 후 바이트 단위 언마스킹"""
+    length = frame[1] & 0x7F
+    position = 2
+    if length == 126:
+        length = int.from_bytes(frame[2:4], "big")
+        position = 4
+    elif length == 127:
+        length = int.from_bytes(frame[2:10], "big")
+        position = 10
+    masking_key = frame[position:position + 4]
+    return legacy_unmask(frame[position + 4:position + 4 + length], masking_key)
+
+
+def decode_codec(frame, decoder):
+    """FrameDecoder: 소켓에서 읽듯이 READ_CHUNK 단위로 나눠 넣음"""
+    for start in range(0, len(frame), READ_CHUNK):
+        decoder.feed(frame[start:start + READ_CHUNK])
+        for _, payload in decoder.messages():
+            return payload
+    return None
+
+
+def bench(func):
+    """TARGET_SECONDS 동안 반복 실행하여 1회 평균 시간(초) 반환"""
+    func()
+    count = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= TARGET_SECONDS:
+            return elapsed / count
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def main():
+    print("=" * 72)
+    print("WebSocket 프레임 디코딩 벤치마크 (마스크된 텍스트 프레임 1개 기준)")
+    print("=" * 72)
+    print(f"{'프레임 크기':>12} | {'기존 (바이트 루프)':>18} | {'FrameDecoder':>14} | {'처리량':>12} | {'배율':>7}")
+
+    for size in FRAME_SIZES:
+        payload = os.urandom(size)
+        frame = encode_frame(payload, OP_TEXT, masking_key=os.urandom(4))
+        decoder = FrameDecoder(max_message_bytes=size, require_mask=True)
+        assert decode_legacy(frame) == decode_codec(frame, decoder) == payload
+
+        legacy = bench(lambda: decode_legacy(frame))
+        codec = bench(lambda: decode_codec(frame, decoder))
+        throughput = size / codec / (1024 * 1024)
+        print(f"{size:>10} B | {format_time(legacy):>18} | {format_time(codec):>14} | "
+              f"{throughput:>8.0f} MB/s | {legacy / codec:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
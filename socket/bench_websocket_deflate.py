@@ -0,0 +1,112 @@
+"""
+permessage-deflate 벤치마크
+채팅 패킷(JSON)을 설정별로 압축해 메시지당 전송 바이트와 CPU 시간을 비교
+
+- 압축 없음
+- server_no_context_takeover (서버 기본값): 브로드캐스트당 한 번 압축해 모든 클라이언트가 공유
+- context takeover: 이전 메시지를 사전으로 써서 압축률이 좋지만 클라이언트마다 따로 압축
+
+사용법:
+    python bench_websocket_deflate.py
+    python bench_websocket_deflate.py --messages 5000 --room 1000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from socket_chat_load_test import build_chat_packet
+from websocket_codec import PerMessageDeflate, encode_text_frame, MAX_WINDOW_BITS
+
+SAMPLE_BODIES = [
+    "안녕하세요! 오늘 과제 다들 하셨나요?",
+    "저는 아직 절반 정도밖에 못 했어요 ㅠㅠ",
+    "@AI 파이썬에서 리스트 컴프리헨션이 뭔가요?",
+    "점심 뭐 먹을지 추천 좀 해주세요",
+    "내일 스터디 몇 시에 모이는 거였죠?",
+    "ㅋㅋㅋㅋ 그거 진짜 웃기네요",
+    "DB 연결 풀 설정은 db_utils.py에 있습니다. POOL_SIZE를 바꿔 보세요.",
+    "네 확인했습니다!",
+]
+
+CONFIGS = [
+    # (이름, context takeover, window bits)
+    ("no_context_takeover, 15", False, MAX_WINDOW_BITS),
+    ("no_context_takeover, 10", False, 10),
+    ("context_takeover, 15", True, MAX_WINDOW_BITS),
+    ("context_takeover, 10", True, 10),
+]
+
+
+def build_messages(count, seed=0):
+    """실제 채팅과 비슷한 패킷 JSON 생성 (발신자/본문/메타데이터가 섞여 있음)"""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        packet = build_chat_packet(rng.choice(SAMPLE_BODIES))
+        packet["header"]["sender"] = f"user{rng.randint(1, 50)}@test.com"
+        packet["header"]["message_id"] = f"msg-{i:08d}"
+        if rng.random() < 0.2:
+            packet["payload"]["metadata"] = {"ask_ai": True, "normalized": True}
+        messages.append(json.dumps(packet, ensure_ascii=False).encode("utf-8"))
+    return messages
+
+
+def compressor_memory_kb(window_bits, mem_level=8):
+    """zlib 압축기 하나가 잡는 메모리 (zconf.h 공식: 2^(windowBits+2) + 2^(memLevel+9))"""
+    return ((1 << (window_bits + 2)) + (1 << (mem_level + 9))) / 1024
+
+
+def bench_config(messages, context_takeover, window_bits):
+    """메시지 전체를 한 연결로 압축/해제 → (평균 프레임 바이트, 압축 us/메시지, 해제 us/메시지)"""
+    server = PerMessageDeflate(server_context_takeover=context_takeover, server_max_window_bits=window_bits)
+    # 클라이언트 쪽 압축 해제기는 서버의 압축 방식(창 크기/takeover)에 맞춰야 함
+    client = PerMessageDeflate(client_context_takeover=context_takeover, client_max_window_bits=window_bits)
+
+    started = time.process_time()
+    frames = [server.encode(message) for message in messages]
+    compress_time = time.process_time() - started
+
+    payloads = [frame[2:] if frame[1] < 126 else frame[4:] for frame in frames]
+    started = time.process_time()
+    for payload, message in zip(payloads, messages):
+        assert client.decompress(payload) == message
+    decompress_time = time.process_time() - started
+
+    count = len(messages)
+    return (sum(len(frame) for frame in frames) / count,
+            compress_time / count * 1e6,
+            decompress_time / count * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="permessage-deflate 벤치마크")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--room", type=int, default=1000, help="브로드캐스트를 받는 클라이언트 수")
+    args = parser.parse_args()
+
+    messages = build_messages(args.messages)
+    plain = sum(len(encode_text_frame(m.decode("utf-8"))) for m in messages) / len(messages)
+
+    print("=" * 96)
+    print(f"permessage-deflate 벤치마크 (메시지 {args.messages}개, 브로드캐스트 대상 {args.room}명)")
+    print("=" * 96)
+    print(f"{'설정':<26} | {'바이트/메시지':>12} | {'비율':>6} | {'압축 us':>8} | {'해제 us':>8} | "
+          f"{'브로드캐스트당 CPU':>16} | {'브로드캐스트당 전송':>16} | {'연결당 압축기':>10}")
+    print(f"{'압축 없음':<26} | {plain:>12.1f} | {1:>6.2f} | {0:>8.1f} | {0:>8.1f} | "
+          f"{0:>13.2f} ms | {plain * args.room / 1024:>13.1f} KB | {0:>7.0f} KB")
+
+    for name, context_takeover, window_bits in CONFIGS:
+        size, compress_us, decompress_us = bench_config(messages, context_takeover, window_bits)
+        # 공유 가능한 설정은 브로드캐스트당 한 번, context takeover는 클라이언트마다 압축
+        compressions = args.room if context_takeover else 1
+        broadcast_ms = compress_us * compressions / 1000
+        # context takeover는 압축기를 연결 내내 유지하므로 연결마다 메모리를 차지함
+        memory_kb = compressor_memory_kb(window_bits) if context_takeover else 0
+        print(f"{name:<26} | {size:>12.1f} | {size / plain:>6.2f} | {compress_us:>8.1f} | {decompress_us:>8.1f} | "
+              f"{broadcast_ms:>13.2f} ms | {size * args.room / 1024:>13.1f} KB | {memory_kb:>7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,9 @@ from datetime import datetime, timezone
 HOST = '127.0.0.1'
 PORT = 9999
 
+# 스트리밍으로 출력 중인 AI 응답의 message_id (완성 패킷이 오면 본문을 다시 출력하지 않음)
+streaming_ids = set()
+
 
 def receive_messages(client_socket):
     """서버로부터 메시지 수신 (별도 스레드)"""
@@ -56,6 +59,22 @@ def display_message(packet):
     msg_type = header.get("message_type", "CHAT")
     timestamp = header.get("timestamp", "")
     body = payload.get("body", "")
+    metadata = payload.get("metadata") or {}
+    message_id = header.get("message_id")
+    
+    # AI 스트리밍: 중간 패킷은 같은 줄에 이어서 출력
+    if metadata.get("partial"):
+        if message_id not in streaming_ids:
+            if metadata.get("offset"):
+                return  # 앞부분을 놓친 응답은 완성 패킷으로 출력
+            streaming_ids.add(message_id)
+            print(f"\n\033[96m🤖 {sender}\033[0m\n   ", end="")
+        print(body, end="", flush=True)
+        return
+    if message_id in streaming_ids:
+        streaming_ids.discard(message_id)
+        print(f"\n{'─' * 60}")
+        return
     
     # 시간 포맷팅
     try:
@@ -82,31 +101,31 @@ def display_message(packet):
     print(f"{'─' * 60}")
 
 
-def build_packet(sender, body, ask_ai=False):
+def build_packet(sender, body, ask_ai=False, channel="lobby", message_type="CHAT", action=None):
     """채팅 프로토콜 패킷 생성"""
+    metadata = {"ask_ai": ask_ai, "user_id": 0}
+    if action:
+        metadata["action"] = action  # 채널 참여/나가기 ("join" / "leave")
     return {
         "header": {
             "version": "1.0",
-            "message_type": "CHAT",
+            "message_type": message_type,
             "message_id": str(id(body)),  # 간단한 ID 생성
             "sender": sender,
-            "channel": "lobby",
+            "channel": channel,
             "timestamp": datetime.now(timezone.utc).isoformat()
         },
         "payload": {
             "body": body,
-            "metadata": {
-                "ask_ai": ask_ai,
-                "user_id": 0
-            }
+            "metadata": metadata
         }
     }
 
 
-def send_message(client_socket, sender, message, ask_ai):
+def send_message(client_socket, sender, message, ask_ai, channel="lobby"):
     """메시지 전송"""
     try:
-        packet = build_packet(sender, message, ask_ai)
+        packet = build_packet(sender, message, ask_ai, channel)
         message_json = json.dumps(packet, ensure_ascii=False) + "\n"
         client_socket.sendall(message_json.encode('utf-8'))
         print(f"[전송 완료] '{message[:30]}...'")
@@ -150,14 +169,16 @@ def main():
     print("💡 사용 방법:")
     print("   - 메시지 입력 후 Enter로 전송")
     print("   - '@ai'로 시작하면 AI 응답 요청")
+    print("   - '/join 채널이름'으로 채널 이동, '/leave'로 현재 채널 나가기")
     print("   - '/quit' 또는 '/exit'로 종료")
     print("=" * 60)
     print()
     
     # 메시지 입력 루프
+    channel = "lobby"
     try:
         while True:
-            message = input(f"\n💭 메시지 입력 > ").strip()
+            message = input(f"\n💭 [#{channel}] 메시지 입력 > ").strip()
             
             if not message:
                 continue
@@ -166,6 +187,18 @@ def main():
             if message.lower() in ['/quit', '/exit', '/q']:
                 print("\n👋 채팅방을 나갑니다...")
                 break
+
+            # 채널 참여/나가기
+            if message.startswith('/join '):
+                channel = message[6:].strip() or "lobby"
+                packet = build_packet(user_name, "join", channel=channel, message_type="SYSTEM", action="join")
+                client_socket.sendall((json.dumps(packet, ensure_ascii=False) + "\n").encode('utf-8'))
+                continue
+            if message == '/leave':
+                packet = build_packet(user_name, "leave", channel=channel, message_type="SYSTEM", action="leave")
+                client_socket.sendall((json.dumps(packet, ensure_ascii=False) + "\n").encode('utf-8'))
+                channel = "lobby"
+                continue
             
             # AI 응답 요청 확인
             ask_ai = message.startswith('@ai')
@@ -174,7 +207,7 @@ def main():
                 print("🤖 AI 응답을 요청합니다...")
             
             # 메시지 전송
-            send_message(client_socket, user_name, message, ask_ai)
+            send_message(client_socket, user_name, message, ask_ai, channel)
     
     except KeyboardInterrupt:
         print("\n\n👋 Ctrl+C 감지. 종료합니다...")
@@ -0,0 +1,274 @@
+"""
+채팅 서버 부하 테스트
+로컬에서 일반 TCP 클라이언트 수천~수만 개를 열어 유휴 연결을 유지한 뒤,
+메시지 하나가 모든 클라이언트에게 전달되는 시간(fan-out)을 측정
+
+사용법:
+    python socket_chat_load_test.py                  # 이미 실행 중인 서버(127.0.0.1:9999)에 10,000개 연결
+    python socket_chat_load_test.py --spawn          # 서버를 하위 프로세스로 띄운 뒤 테스트
+    python socket_chat_load_test.py --clients 2000 --port 9999
+    python socket_chat_load_test.py --spawn --slow 50  # 읽지 않는 클라이언트 50개를 섞어 fan-out 지연 확인
+    python socket_chat_load_test.py --spawn --rooms 100  # 클라이언트를 채널 100개에 나눠 넣고 채널 단위 fan-out 측정
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+HOST = '127.0.0.1'
+PORT = 9999
+NUM_CLIENTS = 10000
+CONNECT_CONCURRENCY = 500   # 동시에 진행하는 connect 수 (accept 대기열 폭주 방지)
+BURST_MESSAGES = 200        # 느린 클라이언트 테스트에서 연속으로 보내는 메시지 수
+BURST_BODY_SIZE = 4096      # 연속 메시지 본문 크기 (느린 클라이언트의 소켓 버퍼를 빨리 채우기 위함)
+
+
+def raise_open_file_limit():
+    """클라이언트 소켓 수만큼 파일 디스크립터 한도를 올림"""
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        target = hard if hard != resource.RLIM_INFINITY else max(soft, 65536)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+def build_chat_packet(body, channel="lobby", message_type="CHAT", metadata=None):
+    """채팅 프로토콜 패킷 생성"""
+    return {
+        "header": {
+            "version": "1.0",
+            "message_type": message_type,
+            "message_id": f"load-{time.time_ns()}",
+            "sender": "load-tester",
+            "channel": channel,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        },
+        "payload": {"body": body, "metadata": metadata or {}}
+    }
+
+
+def send_packet(writer, packet):
+    writer.write((json.dumps(packet, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+async def open_client(host, port, semaphore):
+    """연결 하나를 열고 환영 메시지를 받을 때까지 대기"""
+    async with semaphore:
+        reader, writer = await asyncio.open_connection(host, port, limit=1024 * 1024)
+        # 빈 줄을 보내 일반 TCP 클라이언트임을 바로 알림 (프로토콜 판별 대기 생략)
+        writer.write(b"\n")
+        await reader.readline()
+        return reader, writer
+
+
+async def wait_for_body(reader, body):
+    """특정 본문을 가진 패킷이 올 때까지 읽음"""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return False
+        try:
+            packet = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if packet.get("payload", {}).get("body") == body:
+            return True
+
+
+def read_rss_kb(pid):
+    """리눅스에서 프로세스 메모리 사용량(RSS, KB) 조회"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+async def join_room(reader, writer, channel):
+    """채널 참여 요청 후 자기 참여 알림을 받을 때까지 대기"""
+    email = f"guest_{writer.get_extra_info('sockname')[1]}"
+    send_packet(writer, build_chat_packet("join", channel, "SYSTEM", {"action": "join"}))
+    while True:
+        line = await reader.readline()
+        if not line:
+            return False
+        packet = json.loads(line)
+        if packet["header"]["channel"] == channel and packet["payload"]["body"].startswith(email + "님이"):
+            return True
+
+
+async def run_rooms_test(connections, num_rooms):
+    """클라이언트를 채널 num_rooms개에 나눠 넣고, 한 채널에 보낸 메시지가
+    그 채널 참여자에게만 전달되는 시간을 측정 (fan-out 비용이 전체 접속자가 아닌 채널 크기에 비례하는지 확인)"""
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def join(index, reader, writer):
+        async with semaphore:
+            return await asyncio.wait_for(join_room(reader, writer, f"room-{index % num_rooms}"), 60)
+
+    started = time.perf_counter()
+    joined = await asyncio.gather(*(join(i, r, w) for i, (r, w) in enumerate(connections)), return_exceptions=True)
+    print(f"[채널 참여] {sum(1 for r in joined if r is True)}/{len(connections)} ({time.perf_counter() - started:.2f}s)")
+
+    members = connections[::num_rooms]   # room-0 참여자
+    body = f"room fan-out test {time.time_ns()}"
+    started = time.perf_counter()
+    send_packet(members[0][1], build_chat_packet(body, "room-0"))
+    received = await asyncio.gather(
+        *(asyncio.wait_for(wait_for_body(reader, body), 60) for reader, _ in members),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    delivered = sum(1 for r in received if r is True)
+    print(f"[채널 브로드캐스트] room-0 {delivered}/{len(members)}명 수신 ({elapsed * 1000:.1f} ms, "
+          f"전체 접속 {len(connections)}명)")
+    return delivered == len(members)
+
+
+async def run_slow_consumer_test(host, port, connections, num_slow):
+    """읽지 않는 클라이언트를 섞은 상태에서 메시지를 연속으로 보내
+    나머지 클라이언트가 마지막 메시지를 받는 시간을 측정"""
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    slow = await asyncio.gather(*(open_client(host, port, semaphore) for _ in range(num_slow)))
+    for reader, _ in slow:
+        # 수신 버퍼를 최소로 줄이고 읽지 않음 → 서버 쪽 송신 버퍼가 금방 가득 참
+        reader._transport.pause_reading()
+
+    padding = "x" * BURST_BODY_SIZE
+    last_body = f"burst end {time.time_ns()}"
+    _, sender_writer = connections[0]
+    started = time.perf_counter()
+    for i in range(BURST_MESSAGES):
+        body = last_body if i == BURST_MESSAGES - 1 else f"burst {i} {padding}"
+        send_packet(sender_writer, build_chat_packet(body))
+    received = await asyncio.gather(
+        *(asyncio.wait_for(wait_for_body(reader, last_body), 60) for reader, _ in connections),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    delivered = sum(1 for r in received if r is True)
+    print(f"[느린 클라이언트 {num_slow}개] 메시지 {BURST_MESSAGES}개 연속 전송 → "
+          f"{delivered}/{len(connections)} 클라이언트 마지막 메시지 수신 ({elapsed * 1000:.0f} ms)")
+
+    for _, writer in slow:
+        writer.close()
+    return delivered == len(connections)
+
+
+async def run_load_test(host, port, num_clients, server_pid=None, num_slow=0, num_rooms=0):
+    print("=" * 60)
+    print(f"채팅 서버 부하 테스트: {num_clients}개 연결 ({host}:{port})")
+    print(f"파일 디스크립터 한도: {raise_open_file_limit()}")
+    print("=" * 60)
+
+    # 1. 연결 열기
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(open_client(host, port, semaphore) for _ in range(num_clients)),
+        return_exceptions=True
+    )
+    connections = [r for r in results if not isinstance(r, BaseException)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    elapsed = time.perf_counter() - started
+    print(f"[연결] 성공 {len(connections)} / 실패 {len(errors)} ({elapsed:.2f}s, {len(connections) / elapsed:.0f} conn/s)")
+    if errors:
+        print(f"       실패 예시: {errors[0]!r}")
+    if server_pid:
+        rss = read_rss_kb(server_pid)
+        if rss:
+            print(f"[메모리] 서버 RSS {rss / 1024:.1f} MB (연결당 약 {rss / max(1, len(connections)):.1f} KB)")
+
+    if not connections:
+        return False
+
+    # 2. 메시지 하나를 보내고 모든 클라이언트가 받을 때까지 시간 측정
+    body = f"fan-out test {time.time_ns()}"
+    sender_reader, sender_writer = connections[0]
+    started = time.perf_counter()
+    send_packet(sender_writer, build_chat_packet(body))
+    received = await asyncio.gather(
+        *(asyncio.wait_for(wait_for_body(reader, body), 60) for reader, _ in connections),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    delivered = sum(1 for r in received if r is True)
+    print(f"[브로드캐스트] {delivered}/{len(connections)} 클라이언트 수신 완료 ({elapsed * 1000:.0f} ms)")
+    ok = delivered == len(connections)
+
+    # 3. 느린(읽지 않는) 클라이언트가 섞여 있어도 다른 클라이언트 전송이 밀리지 않는지 확인
+    if num_slow:
+        ok = await run_slow_consumer_test(host, port, connections, num_slow) and ok
+
+    # 4. 채널(방) 단위 브로드캐스트
+    if num_rooms:
+        ok = await run_rooms_test(connections, num_rooms) and ok
+
+    # 5. 연결 종료
+    for _, writer in connections:
+        writer.close()
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채팅 서버 부하 테스트")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--clients", type=int, default=NUM_CLIENTS)
+    parser.add_argument("--spawn", action="store_true", help="서버를 하위 프로세스로 실행")
+    parser.add_argument("--slow", type=int, default=0, help="읽지 않는 느린 클라이언트 수")
+    parser.add_argument("--rooms", type=int, default=0, help="클라이언트를 나눠 넣을 채널 수")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        here = os.path.dirname(os.path.abspath(__file__))
+        # chat_protocol.py(프로젝트 루트)와 ai_service.py(gui)를 찾을 수 있도록 경로 추가
+        root = os.path.dirname(here)
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (root, os.path.join(root, "gui"), env.get("PYTHONPATH")) if p
+        )
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(here, "socket_chat_server.py")],
+            stdout=subprocess.DEVNULL,
+            env=env,
+        )
+        time.sleep(1.5)
+
+    try:
+        ok = asyncio.run(run_load_test(args.host, args.port, args.clients,
+                                       server.pid if server else None, args.slow, args.rooms))
+    finally:
+        if server:
+            # 수많은 퇴장 메시지 브로드캐스트가 끝나기를 기다리지 않고 서버 종료
+            server.terminate()
+            server.wait()
+
+    print("\n[SUCCESS] 부하 테스트 통과" if ok else "\n[FAIL] 일부 클라이언트가 메시지를 받지 못했습니다.")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
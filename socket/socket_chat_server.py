@@ -1,366 +1,658 @@
 """
 WebSocket 기반 채팅 서버
-순수 소켓 모듈을 사용한 실시간 채팅 서버
+asyncio 이벤트 루프 하나에서 일반 TCP(줄바꿈으로 구분된 JSON)와 WebSocket 클라이언트를 함께 처리
+연결마다 OS 스레드를 만들지 않으므로 한 프로세스에서 수만 개의 유휴 연결을 유지할 수 있음
 """
 
-import socket
+import asyncio
+import functools
 import json
-import threading
-import uuid
+import os
+from collections import deque
 import hashlib
 import base64
-import struct
 from datetime import datetime, timezone
-from chat_protocol import validate_packet, build_packet, ProtocolError
+from chat_protocol import validate_packet, build_packet, ProtocolError, DEFAULT_CHANNEL
+from chat_history_store import ChatHistoryStore
 from ai_service import ai_service
+from ai_jobs import AIJobQueue, AIJobRejected
+from ai_context import ContextBuilder
+from websocket_codec import (
+    FrameDecoder, WebSocketError, encode_frame, encode_text_frame, encode_close, negotiate_deflate,
+    OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG, CLOSE_NORMAL, CLOSE_INVALID_DATA,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # 서버 설정
 HOST = '127.0.0.1'
 PORT = 9999
-MAX_CLIENTS = 50
+MAX_CONNECTIONS = 20000     # 동시에 유지할 최대 연결 수 (초과 연결은 즉시 종료)
+LISTEN_BACKLOG = 1024       # accept 대기열 길이 (접속 폭주 시 SYN 드롭 방지)
+PROTOCOL_SNIFF_TIMEOUT = 1.0  # 첫 줄로 프로토콜을 판별할 때 기다리는 시간(초), 지나면 일반 TCP로 간주
+MAX_LINE_BYTES = 64 * 1024  # TCP 한 줄(패킷) 최대 크기
+MAX_FRAME_BYTES = 1024 * 1024  # WebSocket 메시지 최대 크기 (조각 합계)
+READ_CHUNK_BYTES = 64 * 1024   # WebSocket 수신 시 한 번에 읽는 크기
+
+# 송신 큐 설정 (느린 클라이언트 하나가 다른 클라이언트 전송을 막지 않도록 클라이언트별로 분리)
+SEND_BUFFER_HIGH_WATER = 64 * 1024  # 소켓 송신 버퍼가 이 크기를 넘으면 큐에 쌓기 시작
+SEND_QUEUE_SIZE = 256               # 클라이언트별 대기 메시지 최대 개수
+# 큐가 가득 찼을 때 정책
+# - "drop": 새 메시지를 버림
+# - "coalesce": 가장 오래된 메시지를 버리고 새 메시지를 넣음 (최신 상태 우선)
+# - "disconnect": 따라오지 못하는 클라이언트 연결 종료
+SLOW_CONSUMER_POLICY = "coalesce"
+METRICS_INTERVAL = 60               # 송신 큐 지표 출력 주기(초), 0이면 출력 안 함
+
+# 채널(방) 설정
+MAX_CHANNELS_PER_CLIENT = 20        # 클라이언트 하나가 동시에 참여할 수 있는 채널 수
+MAX_CHANNEL_NAME = 64
+HISTORY_ON_JOIN = 20                # 채널 참여 시 보내 주는 최근 메시지 수
+HISTORY_REPLAY_MAX = 200            # since 지정 시 다시 보내 주는 최대 메시지 수
+
+# permessage-deflate 설정 (클라이언트가 Sec-WebSocket-Extensions로 요청한 경우에만 사용)
+DEFLATE_ENABLED = True
+# False면 메시지마다 압축기를 새로 시작 → 브로드캐스트당 한 번만 압축해서 모든 클라이언트가 공유
+# True면 이전 메시지를 사전으로 써서 압축률이 좋아지지만 클라이언트마다 따로 압축 (CPU가 클라이언트 수에 비례)
+DEFLATE_SERVER_CONTEXT_TAKEOVER = False
+DEFLATE_SERVER_MAX_WINDOW_BITS = 15  # 서버 압축 창 크기 (9~15, 작을수록 연결당 메모리 감소)
+DEFLATE_CLIENT_MAX_WINDOW_BITS = 15  # 클라이언트가 제한을 허용한 경우 요청할 창 크기
+DEFLATE_LEVEL = 6
+DEFLATE_MIN_BYTES = 64               # 이보다 짧은 메시지는 압축하지 않음
+
+WEBSOCKET_MAGIC = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# 연결된 클라이언트 관리 (이벤트 루프 스레드에서만 접근하므로 락 불필요)
+clients = set()
+
+# 채널별 참여 클라이언트 {channel: set(ChatClient)} - 브로드캐스트는 해당 채널 참여자에게만 전송
+channel_members = {}
+
+# 채팅 히스토리 (채널별 최근 메시지 링 버퍼 + 디스크 세그먼트 로그, 재시작 시 복원)
+HISTORY_DIR = os.getenv(
+    "CHAT_HISTORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_history")
+)
+chat_history = ChatHistoryStore(HISTORY_DIR)
+
+# AI 프롬프트용 채널별 대화 맥락 (토큰 예산 안의 최근 메시지, 메시지별 토큰 추정치는 한 번만 계산)
+ai_context = ContextBuilder()
+for _channel in chat_history.channels():
+    ai_context.seed(chat_history.recent(_channel))
+
+# 실행 중인 백그라운드 태스크 (참조를 잡아 두지 않으면 완료 전에 GC될 수 있음)
+background_tasks = set()
+
+# 송신 지표
+metrics = {
+    "broadcasts": 0,          # 브로드캐스트 횟수
+    "messages_sent": 0,       # 소켓 버퍼에 바로 쓴 메시지 수
+    "messages_queued": 0,     # 송신 큐를 거친 메시지 수
+    "messages_dropped": 0,    # 큐가 가득 차 버린 메시지 수
+    "slow_disconnects": 0,    # 느린 클라이언트 강제 종료 수
+    "max_queue_depth": 0,     # 관측된 최대 큐 길이
+    "bytes_sent": 0,          # 브로드캐스트/응답으로 보낸 바이트 수 (프레임 헤더 포함)
+}
+
+
+def spawn_task(coro):
+    """백그라운드 태스크 실행 (참조 유지)"""
+    task = asyncio.get_running_loop().create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+class OutgoingMessage:
+    """브로드캐스트할 메시지 - JSON 직렬화와 프로토콜별 인코딩을 메시지당 한 번만 수행"""
+
+    __slots__ = ("text", "_tcp", "_websocket", "_deflated")
+
+    def __init__(self, packet_dict):
+        self.text = json.dumps(packet_dict, ensure_ascii=False)
+        self._tcp = None
+        self._websocket = None
+        self._deflated = None   # 압축 설정(창 크기, 수준)별 압축 프레임
+
+    def encoded(self, client):
+        if not client.is_websocket:
+            if self._tcp is None:
+                self._tcp = (self.text + "\n").encode('utf-8')
+            return self._tcp
+
+        deflate = client.deflate
+        if deflate is None:
+            if self._websocket is None:
+                self._websocket = encode_text_frame(self.text)
+            return self._websocket
+
+        if not deflate.shared:
+            # context takeover: 연결마다 압축 사전이 달라 결과를 공유할 수 없음
+            return deflate.encode(self.text.encode('utf-8'))
+        if self._deflated is None:
+            self._deflated = {}
+        frame = self._deflated.get(deflate.cache_key)
+        if frame is None:
+            frame = self._deflated[deflate.cache_key] = deflate.encode(self.text.encode('utf-8'))
+        return frame
+
+
+class ChatClient:
+    """연결 하나의 상태 (프로토콜 종류, 사용자 정보, 스트림)"""
+
+    def __init__(self, reader, writer, address, is_websocket, deflate=None):
+        self.reader = reader
+        self.writer = writer
+        self.address = address
+        self.is_websocket = is_websocket
+        self.email = f"guest_{address[1]}"
+        self.user_id = 0
+        self.channels = set()       # 참여 중인 채널
+        self.closed = False
+        self.dropped = 0
+        self._queue = deque()       # 소켓 버퍼가 찬 동안 대기하는 인코딩된 메시지
+        self._flusher = None        # 큐를 비우는 태스크 (느린 클라이언트에만 생성)
+        # 클라이언트→서버 프레임은 반드시 마스크되어 있어야 함 (RFC 6455 5.1)
+        self.decoder = FrameDecoder(MAX_FRAME_BYTES, require_mask=True, allow_rsv1=deflate is not None) if is_websocket else None
+        self.deflate = deflate      # 협상된 permessage-deflate 상태 (없으면 None)
+        writer.transport.set_write_buffer_limits(high=SEND_BUFFER_HIGH_WATER)
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def send(self, message):
+        """OutgoingMessage를 전송 (블로킹 없음)
+        소켓 버퍼에 여유가 있으면 바로 쓰고, 아니면 클라이언트별 큐에 넣어 별도 태스크가 비움"""
+        if self.closed:
+            return
+        data = message.encoded(self)
+
+        if not self._queue and self.writer.transport.get_write_buffer_size() < SEND_BUFFER_HIGH_WATER:
+            self.writer.write(data)
+            metrics["messages_sent"] += 1
+            metrics["bytes_sent"] += len(data)
+            return
+
+        if len(self._queue) >= SEND_QUEUE_SIZE:
+            if SLOW_CONSUMER_POLICY == "disconnect":
+                print(f"[SLOW] {self.address} 송신 큐 초과 - 연결 종료")
+                metrics["slow_disconnects"] += 1
+                self.close()
+                return
+            self.dropped += 1
+            metrics["messages_dropped"] += 1
+            if SLOW_CONSUMER_POLICY == "drop":
+                return
+            self._queue.popleft()
+
+        self._queue.append(data)
+        metrics["messages_queued"] += 1
+        metrics["bytes_sent"] += len(data)
+        metrics["max_queue_depth"] = max(metrics["max_queue_depth"], len(self._queue))
+        if self._flusher is None:
+            self._flusher = spawn_task(self._flush_queue())
+
+    def send_packet(self, packet_dict):
+        self.send(OutgoingMessage(packet_dict))
+
+    def send_control(self, frame):
+        """WebSocket 제어 프레임(pong/close) 전송 - 크기가 작아 큐를 거치지 않고 바로 씀"""
+        if not self.closed:
+            self.writer.write(frame)
 
-# 연결된 클라이언트 관리
-clients = {}  # {socket: {"email": str, "user_id": int}}
-clients_lock = threading.Lock()
+    async def _flush_queue(self):
+        """소켓 버퍼가 비워질 때마다 큐에 쌓인 메시지를 이어서 씀"""
+        try:
+            while self._queue and not self.closed:
+                await self.writer.drain()
+                batch = list(self._queue)
+                self._queue.clear()
+                self.writer.writelines(batch)
+        except (ConnectionError, RuntimeError):
+            self.close()
+        finally:
+            self._flusher = None
 
-# 채팅 히스토리
-chat_history = []
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self.writer.close()
 
 
-def websocket_handshake(client_socket):
-    """WebSocket 핸드셰이크 처리"""
+def websocket_accept_key(websocket_key):
+    """Sec-WebSocket-Key로 Sec-WebSocket-Accept 값 생성"""
+    return base64.b64encode(
+        hashlib.sha1((websocket_key + WEBSOCKET_MAGIC).encode()).digest()
+    ).decode()
+
+
+async def websocket_handshake(reader, writer, request_line):
+    """WebSocket 핸드셰이크 처리 (요청 첫 줄은 이미 읽은 상태)
+    반환: (성공 여부, 협상된 permessage-deflate 또는 None)"""
     try:
-        # HTTP 요청 읽기
-        request = b""
-        while b"\r\n\r\n" not in request:
-            chunk = client_socket.recv(1024)
-            if not chunk:
-                return False
-            request += chunk
-        
-        # Sec-WebSocket-Key 추출
-        request_str = request.decode('utf-8')
-        lines = request_str.split('\r\n')
-        
-        websocket_key = None
-        for line in lines:
-            if line.startswith('Sec-WebSocket-Key:'):
-                websocket_key = line.split(':', 1)[1].strip()
-                break
-        
+        # 나머지 HTTP 헤더 읽기
+        request = request_line + await reader.readuntil(b"\r\n\r\n")
+        lines = request.decode('utf-8').split('\r\n')
+
+        # 헤더 추출 (같은 헤더가 여러 줄이면 쉼표로 이어 붙임)
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                name = name.strip().lower()
+                headers[name] = f"{headers[name]}, {value.strip()}" if name in headers else value.strip()
+
+        websocket_key = headers.get('sec-websocket-key')
         if not websocket_key:
-            return False
-        
-        # WebSocket Accept 키 생성
-        magic_string = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
-        accept_key = base64.b64encode(
-            hashlib.sha1((websocket_key + magic_string).encode()).digest()
-        ).decode()
-        
+            return False, None
+
+        # permessage-deflate 협상
+        deflate = None
+        if DEFLATE_ENABLED:
+            deflate = negotiate_deflate(
+                headers.get('sec-websocket-extensions'),
+                server_context_takeover=DEFLATE_SERVER_CONTEXT_TAKEOVER,
+                server_max_window_bits=DEFLATE_SERVER_MAX_WINDOW_BITS,
+                client_max_window_bits=DEFLATE_CLIENT_MAX_WINDOW_BITS,
+                compress_level=DEFLATE_LEVEL,
+                min_size=DEFLATE_MIN_BYTES,
+            )
+
         # 핸드셰이크 응답
         response = (
             "HTTP/1.1 101 Switching Protocols\r\n"
             "Upgrade: websocket\r\n"
             "Connection: Upgrade\r\n"
-            f"Sec-WebSocket-Accept: {accept_key}\r\n"
-            "\r\n"
+            f"Sec-WebSocket-Accept: {websocket_accept_key(websocket_key)}\r\n"
         )
-        
-        client_socket.sendall(response.encode('utf-8'))
-        return True
-    
+        if deflate:
+            response += f"Sec-WebSocket-Extensions: {deflate.response_header()}\r\n"
+        writer.write((response + "\r\n").encode('utf-8'))
+        await writer.drain()
+        return True, deflate
+
     except Exception as e:
         print(f"[ERROR] WebSocket 핸드셰이크 실패: {e}")
-        return False
+        return False, None
+
+
+async def receive_websocket_messages(client):
+    """WebSocket 클라이언트에서 텍스트 메시지를 차례로 반환 (close 프레임/연결 종료 시 끝남)
+    받은 바이트를 디코더에 넣고 완성된 메시지만 꺼내므로 프레임이 나뉘어 도착해도 안전함
+    ping에는 pong으로 응답하고, 프로토콜 위반 시 close 프레임을 보내고 종료"""
+    decoder = client.decoder
+    while True:
+        try:
+            data = await client.reader.read(READ_CHUNK_BYTES)
+        except ConnectionError:
+            return
+        if not data:
+            return
+        decoder.feed(data)
+
+        try:
+            for opcode, payload in decoder.messages():
+                if opcode in (OP_TEXT, OP_BINARY):
+                    if decoder.last_rsv1:
+                        payload = client.deflate.decompress(payload, MAX_FRAME_BYTES)
+                    try:
+                        yield payload.decode('utf-8')
+                    except UnicodeDecodeError:
+                        raise WebSocketError("UTF-8이 아닌 텍스트 메시지", CLOSE_INVALID_DATA)
+                elif opcode == OP_PING:
+                    client.send_control(encode_frame(payload, OP_PONG))
+                elif opcode == OP_CLOSE:
+                    # 받은 상태 코드를 그대로 돌려주고 종료 (closing handshake)
+                    client.send_control(encode_frame(payload[:2], OP_CLOSE) if payload else encode_close(CLOSE_NORMAL))
+                    return
+        except WebSocketError as e:
+            print(f"[ERROR] WebSocket 프로토콜 오류 ({client.address}): {e}")
+            client.send_control(encode_close(e.close_code))
+            return
+
+
+async def receive_tcp_lines(client):
+    """일반 TCP 클라이언트에서 한 줄(패킷)씩 반환 (연결 종료 시 끝남)"""
+    while True:
+        try:
+            line = await client.reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError:
+            return
+        except asyncio.LimitOverrunError:
+            print("[ERROR] TCP 패킷이 너무 깁니다. 연결을 종료합니다.")
+            return
+        except ConnectionError:
+            return
+        yield line.decode('utf-8')
+
 
+def broadcast_message(packet_dict, exclude=None):
+    """패킷의 채널(header.channel)에 참여한 클라이언트에게만 메시지 브로드캐스트
+    직렬화/프레임 인코딩은 한 번만 하고, 각 클라이언트에는 송신 큐에 넣기만 하므로
+    느린 클라이언트가 있어도 다른 클라이언트 전송이나 새 연결 처리가 지연되지 않음"""
+    members = channel_members.get(packet_dict["header"]["channel"])
+    if not members:
+        return
+    message = OutgoingMessage(packet_dict)
+    metrics["broadcasts"] += 1
 
-def send_websocket_frame(client_socket, data):
-    """WebSocket 프레임 인코딩하여 전송"""
+    for client in list(members):
+        if client is exclude:
+            continue
+        try:
+            client.send(message)
+        except Exception as e:
+            print(f"[ERROR] 클라이언트 전송 실패: {e}")
+            client.close()
+
+
+def get_metrics():
+    """송신 지표와 현재 큐 상태 반환"""
+    depths = [client.queue_depth for client in clients]
+    return dict(
+        metrics,
+        connections=len(clients),
+        channels=len(channel_members),
+        ai_jobs=ai_jobs.stats(),
+        ai_cache=ai_service.cache_stats(),
+        ai_upstream=ai_service.upstream_stats(),
+        ai_context=ai_context.stats(),
+        queued_now=sum(depths),
+        slow_clients=sum(1 for depth in depths if depth),
+        deflate_clients=sum(1 for client in clients if client.deflate),
+    )
+
+
+async def report_metrics():
+    """송신 큐 지표를 주기적으로 출력"""
+    while True:
+        await asyncio.sleep(METRICS_INTERVAL)
+        print(f"[METRICS] {get_metrics()}")
+
+
+# AI 응답 작업 큐 (모델 호출은 작업자 스레드에서 실행, 완료되면 이벤트 루프로 돌아와 브로드캐스트)
+ai_jobs = AIJobQueue(ai_service, sender="AI-Assistant")
+
+
+def deliver_ai_packet(ai_packet):
+    """AI 응답을 질문한 채널에 브로드캐스트 (이벤트 루프 스레드에서 실행)
+    스트리밍 중간 패킷(metadata.partial)은 전송만 하고, 완성된 응답만 히스토리에 저장"""
+    if ai_packet["payload"]["metadata"].get("partial"):
+        broadcast_message(ai_packet)
+        return
+    chat_history.append(ai_packet)
+    broadcast_message(ai_packet)
+    print(f"[AI] {ai_packet['payload']['body'][:50]}...")
+
+
+def request_ai_reply(client, normalized):
+    """AI 응답 작업 등록 - 수신 루프는 모델 응답을 기다리지 않음"""
+    channel = normalized["header"]["channel"]
+    loop = asyncio.get_running_loop()
     try:
-        message = data.encode('utf-8')
-        length = len(message)
-        
-        # 프레임 헤더 생성
-        frame = bytearray()
-        frame.append(0x81)  # FIN=1, opcode=1 (텍스트)
-        
-        if length <= 125:
-            frame.append(length)
-        elif length <= 65535:
-            frame.append(126)
-            frame.extend(struct.pack(">H", length))
-        else:
-            frame.append(127)
-            frame.extend(struct.pack(">Q", length))
-        
-        frame.extend(message)
-        client_socket.sendall(bytes(frame))
-        return True
-    except Exception as e:
-        print(f"[ERROR] WebSocket 프레임 전송 실패: {e}")
+        ai_jobs.submit(
+            user=client.email,
+            channel=channel,
+            in_reply_to=normalized["header"]["message_id"],
+            message=normalized["payload"]["body"],
+            history=ai_context.build(channel),
+            deliver=lambda packet: loop.call_soon_threadsafe(deliver_ai_packet, packet),
+        )
+    except AIJobRejected as e:
+        client.send_packet(system_packet(str(e), channel, error=True))
+
+
+def system_packet(body, channel=DEFAULT_CHANNEL, **metadata):
+    return build_packet(sender="SYSTEM", body=body, message_type="SYSTEM", channel=channel, metadata=metadata)
+
+
+def join_channel(client, channel):
+    """채널 참여 (이미 참여 중이면 False)"""
+    if channel in client.channels:
         return False
+    client.channels.add(channel)
+    channel_members.setdefault(channel, set()).add(client)
+    return True
+
+
+def leave_channel(client, channel):
+    """채널 나가기 (참여자가 없으면 채널 제거)"""
+    client.channels.discard(channel)
+    members = channel_members.get(channel)
+    if members is not None:
+        members.discard(client)
+        if not members:
+            del channel_members[channel]
 
 
-def receive_websocket_frame(client_socket):
-    """WebSocket 프레임 디코딩"""
+def handle_channel_action(client, normalized):
+    """채널 참여/나가기 SYSTEM 패킷 처리
+    - {"message_type": "SYSTEM", "channel": "<채널>"}, metadata {"action": "join" | "leave"}
+    - join 시 metadata.since(message_id) 또는 metadata.since_time(시각)을 주면 그 이후 메시지만 다시 보내 줌"""
+    channel = normalized["header"]["channel"]
+    metadata = normalized["payload"]["metadata"]
+
+    if metadata["action"] == "leave":
+        if channel in client.channels:
+            leave_channel(client, channel)
+            client.send_packet(system_packet(f"#{channel} 채널에서 나왔습니다.", channel, action="leave"))
+            broadcast_message(system_packet(f"{client.email}님이 채널을 나갔습니다.", channel, user_left=True))
+        return
+
+    if channel not in client.channels:
+        if len(client.channels) >= MAX_CHANNELS_PER_CLIENT:
+            raise ProtocolError(f"channel limit exceeded ({MAX_CHANNELS_PER_CLIENT})")
+        join_channel(client, channel)
+        broadcast_message(system_packet(f"{client.email}님이 채널에 참여했습니다.", channel, user_joined=True))
+
+    # 참여한 채널의 히스토리 전송 (재접속한 클라이언트는 since로 놓친 메시지만 받음)
+    if metadata.get("since") or metadata.get("since_time"):
+        # 디스크 로그를 읽을 수 있으므로 이벤트 루프를 막지 않도록 스레드 풀에서 조회
+        spawn_task(send_missed_history(client, channel, metadata.get("since"), metadata.get("since_time")))
+    else:
+        for packet in chat_history.recent(channel, HISTORY_ON_JOIN):
+            client.send_packet(packet)
+
+
+async def send_missed_history(client, channel, since, since_time):
+    """since 이후 놓친 메시지를 최대 HISTORY_REPLAY_MAX개 전송 (조회는 스레드 풀에서 실행)"""
+    history = await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(chat_history.since, channel, message_id=since, timestamp=since_time,
+                                limit=HISTORY_REPLAY_MAX)
+    )
+    if channel not in client.channels:
+        # 조회하는 사이에 채널을 나감
+        return
+    for packet in history:
+        client.send_packet(packet)
+
+
+def handle_packet(client, line):
+    """수신한 한 줄(JSON 패킷)을 검증하고 브로드캐스트"""
     try:
-        # 첫 2바이트 읽기
-        header = client_socket.recv(2)
-        if len(header) < 2:
-            return None
-        
-        # 페이로드 길이 파싱
-        payload_length = header[1] & 0x7F
-        
-        if payload_length == 126:
-            extended = client_socket.recv(2)
-            payload_length = struct.unpack(">H", extended)[0]
-        elif payload_length == 127:
-            extended = client_socket.recv(8)
-            payload_length = struct.unpack(">Q", extended)[0]
-        
-        # 마스킹 키 읽기
-        masking_key = client_socket.recv(4)
-        
-        # 페이로드 읽기
-        payload = bytearray()
-        while len(payload) < payload_length:
-            chunk = client_socket.recv(payload_length - len(payload))
-            if not chunk:
-                break
-            payload.extend(chunk)
-        
-        # 언마스킹
-        unmasked = bytearray()
-        for i in range(len(payload)):
-            unmasked.append(payload[i] ^ masking_key[i % 4])
-        
-        return unmasked.decode('utf-8')
-    
+        # JSON 파싱
+        raw_packet = json.loads(line)
+
+        # 프로토콜 검증
+        normalized = validate_packet(raw_packet)
+
+        # 서버 측에서 sender 정보 덮어쓰기 (보안)
+        normalized["header"]["sender"] = client.email
+        normalized["payload"]["metadata"]["user_id"] = client.user_id
+
+        channel = normalized["header"]["channel"]
+        if len(channel) > MAX_CHANNEL_NAME:
+            raise ProtocolError("channel name is too long")
+
+        # 채널 참여/나가기 요청
+        if normalized["header"]["message_type"] == "SYSTEM" and \
+                normalized["payload"]["metadata"].get("action") in ("join", "leave"):
+            handle_channel_action(client, normalized)
+            return
+
+        # 참여하지 않은 채널에는 보낼 수 없음
+        if channel not in client.channels:
+            raise ProtocolError(f"not a member of channel: {channel}")
+
+        # 히스토리와 AI 대화 맥락에 추가
+        chat_history.append(normalized)
+        ai_context.add(normalized)
+
+        print(f"[MESSAGE] {client.email} #{channel}: {normalized['payload']['body']}")
+
+        # 같은 채널 참여자에게만 브로드캐스트
+        broadcast_message(normalized)
+
+        # AI 응답 요청 (필요시) - 작업 큐에 넣고 바로 다음 패킷 처리
+        if normalized["payload"]["metadata"].get("ask_ai", False):
+            request_ai_reply(client, normalized)
+
+    except ProtocolError as e:
+        error_packet = build_packet(
+            sender="SYSTEM",
+            body=f"프로토콜 오류: {str(e)}",
+            message_type="SYSTEM",
+            metadata={"error": True}
+        )
+        client.send_packet(error_packet)
+        print(f"[PROTOCOL ERROR] {e}")
+
+    except json.JSONDecodeError as e:
+        print(f"[JSON ERROR] {e}: {line[:100]}")
+
     except Exception as e:
-        print(f"[ERROR] WebSocket 프레임 수신 실패: {e}")
-        return None
+        print(f"[ERROR] 메시지 처리 중 오류: {e}")
+
 
+async def handle_client(reader, writer):
+    """개별 클라이언트 처리 (연결마다 코루틴 하나)"""
+    address = writer.get_extra_info("peername") or ("unknown", 0)
+
+    if len(clients) >= MAX_CONNECTIONS:
+        print(f"[REJECTED] {address} 최대 연결 수 초과")
+        writer.close()
+        return
+
+    # 첫 줄로 프로토콜 판별: "GET ... HTTP/1.1"이면 WebSocket, 아니면 줄바꿈 구분 TCP
+    # WebSocket 클라이언트는 접속 즉시 핸드셰이크를 보내므로, 아무것도 보내지 않는 클라이언트는 일반 TCP로 처리
+    try:
+        first_line = await asyncio.wait_for(reader.readline(), PROTOCOL_SNIFF_TIMEOUT)
+        if not first_line:
+            writer.close()
+            return
+    except asyncio.TimeoutError:
+        first_line = b""
+    except (ConnectionError, ValueError):
+        writer.close()
+        return
+
+    is_websocket = first_line.startswith(b"GET ")
+    deflate = None
+    if is_websocket:
+        handshake_ok, deflate = await websocket_handshake(reader, writer, first_line)
+        if not handshake_ok:
+            writer.close()
+            return
+
+    client = ChatClient(reader, writer, address, is_websocket, deflate)
+    clients.add(client)
+    # 기본 채널에 자동 참여 (채널을 모르는 기존 클라이언트 호환)
+    join_channel(client, DEFAULT_CHANNEL)
 
-def broadcast_message(packet_dict, exclude_socket=None):
-    """모든 클라이언트에게 메시지 브로드캐스트"""
-    message = json.dumps(packet_dict, ensure_ascii=False)
-    
-    with clients_lock:
-        disconnected = []
-        for client_socket, client_info in clients.items():
-            if client_socket != exclude_socket:
-                try:
-                    if client_info.get("is_websocket", False):
-                        send_websocket_frame(client_socket, message)
-                    else:
-                        # 일반 TCP 소켓 (터미널 클라이언트)
-                        client_socket.sendall((message + "\n").encode('utf-8'))
-                except Exception as e:
-                    print(f"[ERROR] 클라이언트 전송 실패: {e}")
-                    disconnected.append(client_socket)
-        
-        # 연결이 끊긴 클라이언트 제거
-        for sock in disconnected:
-            if sock in clients:
-                del clients[sock]
-
-
-def handle_client(client_socket, address):
-    """개별 클라이언트 처리"""
-    print(f"[NEW CONNECTION] {address} 연결됨")
-    
-    # WebSocket 핸드셰이크 시도
-    is_websocket = websocket_handshake(client_socket)
-    
-    client_info = {
-        "email": f"guest_{address[1]}", 
-        "user_id": 0,
-        "is_websocket": is_websocket
-    }
-    
-    with clients_lock:
-        clients[client_socket] = client_info
-    
     if is_websocket:
-        print(f"[WebSocket] {address} WebSocket 연결 완료")
+        print(f"[WebSocket] {address} WebSocket 연결 완료" + (" (permessage-deflate)" if deflate else ""))
     else:
         print(f"[TCP] {address} 일반 TCP 소켓 연결")
-    
+
     # 환영 메시지
-    welcome_packet = build_packet(
-        sender="SYSTEM",
-        body=f"채팅 서버에 오신 것을 환영합니다! (연결: {address})",
-        message_type="SYSTEM",
-        metadata={"connection_time": datetime.now(timezone.utc).isoformat()}
+    welcome_packet = system_packet(
+        f"채팅 서버에 오신 것을 환영합니다! (연결: {address})",
+        connection_time=datetime.now(timezone.utc).isoformat(),
     )
-    
-    try:
-        welcome_msg = json.dumps(welcome_packet, ensure_ascii=False)
-        if is_websocket:
-            send_websocket_frame(client_socket, welcome_msg)
-        else:
-            client_socket.sendall((welcome_msg + "\n").encode('utf-8'))
-    except Exception as e:
-        print(f"[ERROR] 환영 메시지 전송 실패: {e}")
-    
-    buffer = ""
-    
+    client.send_packet(welcome_packet)
+
     try:
-        while True:
-            # 데이터 수신
-            if is_websocket:
-                # WebSocket 프레임 수신
-                line = receive_websocket_frame(client_socket)
-                if not line:
-                    break
-                line = line.strip()
-            else:
-                # 일반 TCP 소켓 (터미널 클라이언트)
-                data = client_socket.recv(4096).decode('utf-8')
-                if not data:
-                    break
-                
-                buffer += data
-                
-                # 줄바꿈으로 구분된 메시지 처리
-                if '\n' not in buffer:
-                    continue
-                    
-                line, buffer = buffer.split('\n', 1)
-                line = line.strip()
-            
+        # TCP 클라이언트는 첫 줄이 이미 패킷
+        if not is_websocket and first_line.strip():
+            handle_packet(client, first_line.decode('utf-8').strip())
+
+        # 데이터 수신
+        messages = receive_websocket_messages(client) if is_websocket else receive_tcp_lines(client)
+        async for line in messages:
+            line = line.strip()
             if not line:
                 continue
-            
-            try:
-                # JSON 파싱
-                raw_packet = json.loads(line)
-                
-                # 프로토콜 검증
-                normalized = validate_packet(raw_packet)
-                
-                # 서버 측에서 sender 정보 덮어쓰기 (보안)
-                normalized["header"]["sender"] = client_info["email"]
-                normalized["payload"]["metadata"]["user_id"] = client_info["user_id"]
-                
-                # 히스토리에 추가
-                chat_history.append(normalized)
-                
-                print(f"[MESSAGE] {client_info['email']}: {normalized['payload']['body']}")
-                
-                # 모든 클라이언트에게 브로드캐스트
-                broadcast_message(normalized, exclude_socket=None)
-                
-                # AI 응답 생성 (필요시)
-                if normalized["payload"]["metadata"].get("ask_ai", False):
-                    user_message = normalized["payload"]["body"]
-                    history_texts = [
-                        msg["payload"]["body"] 
-                        for msg in chat_history[-10:] 
-                        if msg["header"]["message_type"] == "CHAT"
-                    ]
-                    
-                    ai_response = ai_service.reply(history_texts, user_message)
-                    
-                    ai_packet = build_packet(
-                        sender="AI-Assistant",
-                        body=ai_response,
-                        message_type="AI",
-                        channel=normalized["header"]["channel"],
-                        metadata={
-                            "source": "gemini" if ai_service.available else "fallback",
-                            "in_reply_to": normalized["header"]["message_id"]
-                        }
-                    )
-                    
-                    chat_history.append(ai_packet)
-                    broadcast_message(ai_packet)
-                    
-                    print(f"[AI] {ai_response[:50]}...")
-            
-            except ProtocolError as e:
-                error_packet = build_packet(
-                    sender="SYSTEM",
-                    body=f"프로토콜 오류: {str(e)}",
-                    message_type="SYSTEM",
-                    metadata={"error": True}
-                )
-                error_msg = json.dumps(error_packet, ensure_ascii=False)
-                if is_websocket:
-                    send_websocket_frame(client_socket, error_msg)
-                else:
-                    client_socket.sendall((error_msg + "\n").encode('utf-8'))
-                print(f"[PROTOCOL ERROR] {e}")
-            
-            except json.JSONDecodeError as e:
-                print(f"[JSON ERROR] {e}: {line[:100]}")
-            
-            except Exception as e:
-                print(f"[ERROR] 메시지 처리 중 오류: {e}")
-    
+
+            handle_packet(client, line)
+
     except Exception as e:
         print(f"[ERROR] 클라이언트 처리 중 오류: {e}")
-    
+
     finally:
         # 연결 종료
-        with clients_lock:
-            if client_socket in clients:
-                del clients[client_socket]
-        
-        # 퇴장 메시지 브로드캐스트
-        leave_packet = build_packet(
-            sender="SYSTEM",
-            body=f"{client_info['email']}님이 채팅방을 나갔습니다.",
-            message_type="SYSTEM",
-            metadata={"user_left": True}
-        )
-        broadcast_message(leave_packet)
-        
-        client_socket.close()
+        clients.discard(client)
+        client.close()
+
+        # 참여했던 채널에만 퇴장 메시지 브로드캐스트
+        for channel in list(client.channels):
+            leave_channel(client, channel)
+            broadcast_message(system_packet(f"{client.email}님이 채팅방을 나갔습니다.", channel, user_left=True))
+
         print(f"[DISCONNECTED] {address} 연결 종료")
 
 
+def raise_open_file_limit():
+    """열 수 있는 파일(소켓) 수 제한을 hard limit까지 올림 (수만 개 연결 대비)"""
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        target = hard if hard != resource.RLIM_INFINITY else max(soft, MAX_CONNECTIONS + 1024)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+async def run_server(host=HOST, port=PORT):
+    """이벤트 루프에서 서버 실행"""
+    server = await asyncio.start_server(
+        handle_client, host, port,
+        backlog=LISTEN_BACKLOG, limit=MAX_LINE_BYTES, reuse_address=True
+    )
+
+    print("=" * 60)
+    print(f"🚀 WebSocket 채팅 서버 시작 (asyncio)")
+    print(f"📡 주소: {host}:{port}")
+    print(f"👥 최대 연결: {MAX_CONNECTIONS} (파일 디스크립터 한도: {raise_open_file_limit()})")
+    print(f"🤖 AI 서비스: {'활성화' if ai_service.available else '비활성화 (fallback 모드)'}")
+    print("=" * 60)
+
+    if METRICS_INTERVAL:
+        spawn_task(report_metrics())
+
+    async with server:
+        await server.serve_forever()
+
+
 def start_server():
     """소켓 채팅 서버 시작"""
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    
     try:
-        server_socket.bind((HOST, PORT))
-        server_socket.listen(MAX_CLIENTS)
-        
-        print("=" * 60)
-        print(f"🚀 WebSocket 채팅 서버 시작")
-        print(f"📡 주소: {HOST}:{PORT}")
-        print(f"👥 최대 클라이언트: {MAX_CLIENTS}")
-        print(f"🤖 AI 서비스: {'활성화' if ai_service.available else '비활성화 (fallback 모드)'}")
-        print("=" * 60)
-        
-        while True:
-            client_socket, address = server_socket.accept()
-            
-            # 새 클라이언트를 별도 스레드에서 처리
-            client_thread = threading.Thread(
-                target=handle_client,
-                args=(client_socket, address),
-                daemon=True
-            )
-            client_thread.start()
-            
-            print(f"[ACTIVE CONNECTIONS] 현재 {len(clients)}명 접속 중")
-    
+        asyncio.run(run_server())
     except KeyboardInterrupt:
         print("\n[SHUTDOWN] 서버 종료 중...")
-    
     except Exception as e:
         print(f"[ERROR] 서버 오류: {e}")
-    
     finally:
-        server_socket.close()
         print("[SHUTDOWN] 서버가 종료되었습니다.")
 
 
 if __name__ == "__main__":
     start_server()
-
@@ -0,0 +1,363 @@
+"""
+WebSocket 프레임 인코더/디코더 (RFC 6455)
+소켓 I/O와 분리된 증분 디코더: 받은 바이트를 feed()로 넣으면 완성된 메시지만 꺼내 줌
+- 짧게 읽힌 경우(헤더/페이로드가 나뉘어 도착)에도 필요한 길이가 모일 때까지 기다림
+- 수신 버퍼와 조각(fragment) 재조립 버퍼를 연결마다 재사용
+- 마스크 해제는 바이트 단위 루프 대신 C 수준 일괄 연산으로 처리
+  (작은 페이로드는 정수 XOR, 큰 페이로드는 4바이트 간격 슬라이스별 bytes.translate)
+"""
+
+import struct
+import zlib
+
+# opcode
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+DATA_OPCODES = (OP_TEXT, OP_BINARY)
+CONTROL_OPCODES = (OP_CLOSE, OP_PING, OP_PONG)
+
+# close 상태 코드
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_INVALID_DATA = 1007
+CLOSE_TOO_BIG = 1009
+
+MAX_CONTROL_PAYLOAD = 125
+DEFAULT_MAX_MESSAGE_BYTES = 1024 * 1024
+
+# 이 크기 이상이면 translate 방식으로 언마스킹 (작을 때는 정수 XOR이, 클 때는 translate가 빠름)
+TRANSLATE_UNMASK_THRESHOLD = 2048
+# XOR_TABLES[k]: 모든 바이트를 k와 XOR한 변환표
+XOR_TABLES = [bytes(b ^ k for b in range(256)) for k in range(256)]
+
+
+class WebSocketError(Exception):
+    """프로토콜 위반 - close_code로 상대에게 close 프레임을 보내고 연결을 끊어야 함"""
+
+    def __init__(self, message, close_code=CLOSE_PROTOCOL_ERROR):
+        super().__init__(message)
+        self.close_code = close_code
+
+
+def unmask(payload, masking_key):
+    """마스크 해제 (마스크 적용도 같은 연산)"""
+    length = len(payload)
+    if not length:
+        return b""
+    if length < TRANSLATE_UNMASK_THRESHOLD:
+        # 마스크를 페이로드 길이만큼 늘린 뒤 정수 XOR 한 번
+        key = (masking_key * (length // 4 + 1))[:length]
+        return (int.from_bytes(payload, "little") ^ int.from_bytes(key, "little")).to_bytes(length, "little")
+
+    # i, i+4, i+8 ... 위치의 바이트는 모두 masking_key[i]와 XOR되므로 슬라이스 4개를 변환표로 한 번에 처리
+    result = bytearray(payload)
+    for i in range(4):
+        result[i::4] = result[i::4].translate(XOR_TABLES[masking_key[i]])
+    return bytes(result)
+
+
+def encode_frame(payload, opcode=OP_TEXT, fin=True, rsv1=False, masking_key=None):
+    """프레임 하나 인코딩 (서버→클라이언트는 마스크 없음, 클라이언트 역할이면 masking_key 지정)"""
+    length = len(payload)
+    first = (0x80 if fin else 0) | (0x40 if rsv1 else 0) | opcode
+    mask_bit = 0x80 if masking_key else 0
+
+    if length <= 125:
+        header = struct.pack(">BB", first, mask_bit | length)
+    elif length <= 65535:
+        header = struct.pack(">BBH", first, mask_bit | 126, length)
+    else:
+        header = struct.pack(">BBQ", first, mask_bit | 127, length)
+
+    if masking_key:
+        return header + masking_key + unmask(payload, masking_key)
+    return header + payload
+
+
+def encode_text_frame(text):
+    return encode_frame(text.encode("utf-8"), OP_TEXT)
+
+
+def encode_close(code=CLOSE_NORMAL, reason=""):
+    """close 프레임 인코딩"""
+    return encode_frame(struct.pack(">H", code) + reason.encode("utf-8")[:MAX_CONTROL_PAYLOAD - 2], OP_CLOSE)
+
+
+def parse_close(payload):
+    """close 프레임 페이로드 → (상태 코드, 사유)"""
+    if len(payload) < 2:
+        return CLOSE_NORMAL, ""
+    return struct.unpack(">H", payload[:2])[0], payload[2:].decode("utf-8", "replace")
+
+
+class FrameDecoder:
+    """증분 WebSocket 디코더
+
+    사용법:
+        decoder = FrameDecoder()
+        decoder.feed(data)
+        for opcode, payload in decoder.messages():
+            ...
+
+    - 텍스트/바이너리 메시지는 조각이 모두 모인 뒤 한 번에 반환 (opcode는 첫 조각 기준)
+    - 제어 프레임(ping/pong/close)은 조각 사이에 끼어 와도 도착 즉시 반환
+    - 규칙 위반은 WebSocketError (close_code 포함)
+    """
+
+    def __init__(self, max_message_bytes=DEFAULT_MAX_MESSAGE_BYTES, require_mask=False, allow_rsv1=False):
+        self.max_message_bytes = max_message_bytes
+        self.require_mask = require_mask  # 서버는 클라이언트 프레임에 마스크를 요구할 수 있음
+        self.allow_rsv1 = allow_rsv1      # 확장(permessage-deflate)이 협상된 경우에만 RSV1 허용
+        self._buffer = bytearray()        # 아직 처리하지 않은 수신 바이트
+        self._fragments = bytearray()     # 조각난 메시지 재조립용
+        self._fragment_opcode = None
+        self._fragment_rsv1 = False
+        self.last_rsv1 = False            # 마지막으로 반환한 데이터 메시지의 RSV1 (압축 여부)
+
+    def feed(self, data):
+        self._buffer += data
+
+    def _parse_frame(self, offset):
+        """offset 위치의 프레임 하나를 파싱. 바이트가 부족하면 None
+        반환: (다음 offset, fin, rsv1, opcode, payload)"""
+        buffer = self._buffer
+        available = len(buffer) - offset
+        if available < 2:
+            return None
+
+        first, second = buffer[offset], buffer[offset + 1]
+        fin = bool(first & 0x80)
+        rsv1 = bool(first & 0x40)
+        opcode = first & 0x0F
+        masked = bool(second & 0x80)
+        length = second & 0x7F
+        position = offset + 2
+
+        if first & 0x30 or (rsv1 and not self.allow_rsv1):
+            raise WebSocketError("예약 비트(RSV)가 설정된 프레임")
+        if rsv1 and opcode not in DATA_OPCODES:
+            # 압축 비트는 메시지의 첫 프레임에만 올 수 있음 (RFC 7692 6.1)
+            raise WebSocketError("제어/continuation 프레임에 RSV1 설정")
+        if self.require_mask and not masked:
+            raise WebSocketError("마스크되지 않은 클라이언트 프레임")
+
+        if opcode in CONTROL_OPCODES:
+            if not fin or length > MAX_CONTROL_PAYLOAD:
+                raise WebSocketError("잘못된 제어 프레임")
+        elif opcode not in DATA_OPCODES and opcode != OP_CONTINUATION:
+            raise WebSocketError(f"알 수 없는 opcode: {opcode}")
+
+        if length == 126:
+            if available < 4:
+                return None
+            length = struct.unpack_from(">H", buffer, position)[0]
+            position += 2
+        elif length == 127:
+            if available < 10:
+                return None
+            length = struct.unpack_from(">Q", buffer, position)[0]
+            position += 8
+
+        # 페이로드를 다 받기 전에 크기 제한을 확인 (거대한 길이로 메모리를 잡아먹는 것 방지)
+        if length + len(self._fragments) > self.max_message_bytes:
+            raise WebSocketError(f"메시지가 너무 큽니다: {length} bytes", CLOSE_TOO_BIG)
+
+        masking_key = None
+        if masked:
+            if len(buffer) < position + 4:
+                return None
+            masking_key = bytes(buffer[position:position + 4])
+            position += 4
+
+        end = position + length
+        if len(buffer) < end:
+            return None
+
+        payload = buffer[position:end]
+        payload = unmask(payload, masking_key) if masking_key else bytes(payload)
+        return end, fin, rsv1, opcode, payload
+
+    def messages(self):
+        """버퍼에 모인 바이트에서 완성된 (opcode, payload) 메시지를 차례로 반환"""
+        offset = 0
+        try:
+            while True:
+                frame = self._parse_frame(offset)
+                if frame is None:
+                    break
+                offset, fin, rsv1, opcode, payload = frame
+
+                if opcode in CONTROL_OPCODES:
+                    yield opcode, payload
+                    continue
+
+                if opcode == OP_CONTINUATION:
+                    if self._fragment_opcode is None:
+                        raise WebSocketError("시작 프레임 없는 continuation 프레임")
+                    self._fragments += payload
+                    if fin:
+                        message = bytes(self._fragments)
+                        opcode = self._fragment_opcode
+                        self.last_rsv1 = self._fragment_rsv1
+                        self._fragments.clear()
+                        self._fragment_opcode = None
+                        yield opcode, message
+                    continue
+
+                if self._fragment_opcode is not None:
+                    raise WebSocketError("조각난 메시지가 끝나기 전에 새 메시지 시작")
+
+                if fin:
+                    self.last_rsv1 = rsv1
+                    yield opcode, payload
+                else:
+                    self._fragment_opcode = opcode
+                    self._fragment_rsv1 = rsv1
+                    self._fragments += payload
+        finally:
+            # 처리한 바이트를 한 번에 잘라냄 (프레임마다 자르면 큰 버퍼에서 매번 복사가 일어남)
+            if offset:
+                del self._buffer[:offset]
+
+
+# -------------------------- permessage-deflate (RFC 7692) --------------------------
+DEFLATE_EXTENSION = "permessage-deflate"
+DEFLATE_TAIL = b"\x00\x00\xff\xff"  # Z_SYNC_FLUSH 끝의 빈 블록 (전송 시 제거, 수신 시 다시 붙임)
+MIN_WINDOW_BITS = 9  # zlib raw deflate는 8을 9로 바꿔 버리므로 8은 협상하지 않음
+MAX_WINDOW_BITS = 15
+
+
+def parse_extensions(header_value):
+    """Sec-WebSocket-Extensions 헤더 → [(확장 이름, {파라미터: 값 또는 None}), ...] (제안 순서 유지)"""
+    offers = []
+    for offer in header_value.split(","):
+        parts = [part.strip() for part in offer.split(";")]
+        if not parts[0]:
+            continue
+        params = {}
+        for part in parts[1:]:
+            if not part:
+                continue
+            key, _, value = part.partition("=")
+            params[key.strip().lower()] = value.strip().strip('"') or None
+        offers.append((parts[0].lower(), params))
+    return offers
+
+
+class PerMessageDeflate:
+    """협상된 permessage-deflate 상태 (연결마다 하나)
+
+    - server_context_takeover=False면 메시지마다 압축기를 새로 시작하므로
+      같은 메시지의 압축 결과가 모든 클라이언트에서 같아 브로드캐스트 시 한 번만 압축하면 됨
+    - context takeover를 쓰면 이전 메시지를 사전으로 활용해 압축률이 더 좋지만 클라이언트마다 따로 압축해야 함
+    """
+
+    def __init__(self, server_context_takeover=False, client_context_takeover=True,
+                 server_max_window_bits=MAX_WINDOW_BITS, client_max_window_bits=MAX_WINDOW_BITS,
+                 compress_level=6, min_size=0):
+        self.server_context_takeover = server_context_takeover
+        self.client_context_takeover = client_context_takeover
+        self.server_max_window_bits = server_max_window_bits
+        self.client_max_window_bits = client_max_window_bits
+        self.compress_level = compress_level
+        self.min_size = min_size  # 이보다 작은 메시지는 압축하지 않고 보냄 (헤더 오버헤드가 더 큼)
+        self._compressor = None
+        self._decompressor = None
+
+    @property
+    def shared(self):
+        """압축 결과를 다른 연결과 공유할 수 있는지 (서버 쪽 context takeover 미사용)"""
+        return not self.server_context_takeover
+
+    @property
+    def cache_key(self):
+        """공유 가능한 압축 결과를 구분하는 키 (창 크기/압축 수준이 같으면 결과도 같음)"""
+        return (self.server_max_window_bits, self.compress_level)
+
+    def response_header(self):
+        """협상 결과를 Sec-WebSocket-Extensions 응답 값으로 변환"""
+        params = [DEFLATE_EXTENSION]
+        if not self.server_context_takeover:
+            params.append("server_no_context_takeover")
+        if not self.client_context_takeover:
+            params.append("client_no_context_takeover")
+        if self.server_max_window_bits < MAX_WINDOW_BITS:
+            params.append(f"server_max_window_bits={self.server_max_window_bits}")
+        if self.client_max_window_bits < MAX_WINDOW_BITS:
+            params.append(f"client_max_window_bits={self.client_max_window_bits}")
+        return "; ".join(params)
+
+    def compress(self, data):
+        """메시지 하나 압축 (RSV1을 설정해 보낼 페이로드)"""
+        if self._compressor is None or not self.server_context_takeover:
+            self._compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, -self.server_max_window_bits)
+        compressed = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return compressed[:-4] if compressed.endswith(DEFLATE_TAIL) else compressed
+
+    def encode(self, data, opcode=OP_TEXT):
+        """메시지 하나를 프레임으로 인코딩 (min_size 미만이면 압축하지 않음)"""
+        if len(data) < self.min_size:
+            return encode_frame(data, opcode)
+        return encode_frame(self.compress(data), opcode, rsv1=True)
+
+    def decompress(self, data, max_size=DEFAULT_MAX_MESSAGE_BYTES):
+        """RSV1이 설정된 메시지 압축 해제 (압축 폭탄 방지를 위해 max_size까지만 풀어 봄)"""
+        if self._decompressor is None or not self.client_context_takeover:
+            self._decompressor = zlib.decompressobj(-self.client_max_window_bits)
+        try:
+            result = self._decompressor.decompress(data + DEFLATE_TAIL, max_size + 1)
+        except zlib.error as e:
+            raise WebSocketError(f"압축 해제 실패: {e}", CLOSE_INVALID_DATA)
+        if len(result) > max_size:
+            raise WebSocketError("압축 해제한 메시지가 너무 큽니다", CLOSE_TOO_BIG)
+        return result
+
+
+def _window_bits(value, default):
+    """window bits 파라미터 값 검증 (없으면 default, 잘못되면 None)"""
+    if value is None:
+        return default
+    if not value.isdigit() or not MIN_WINDOW_BITS <= int(value) <= MAX_WINDOW_BITS:
+        return None
+    return int(value)
+
+
+def negotiate_deflate(header_value, server_context_takeover=False, server_max_window_bits=MAX_WINDOW_BITS,
+                      client_max_window_bits=MAX_WINDOW_BITS, compress_level=6, min_size=0):
+    """클라이언트의 permessage-deflate 제안 중 받아들일 수 있는 첫 번째로 협상
+    반환: PerMessageDeflate 또는 None (제안이 없거나 모두 받아들일 수 없음)"""
+    for name, params in parse_extensions(header_value or ""):
+        if name != DEFLATE_EXTENSION:
+            continue
+        if set(params) - {"server_no_context_takeover", "client_no_context_takeover",
+                          "server_max_window_bits", "client_max_window_bits"}:
+            continue
+
+        # 클라이언트가 서버 창 크기를 제한하면 그 값과 서버 설정 중 작은 값 사용
+        server_bits = _window_bits(params.get("server_max_window_bits"), MAX_WINDOW_BITS)
+        if server_bits is None:
+            continue
+        server_bits = min(server_bits, server_max_window_bits)
+
+        # 클라이언트 창 크기는 클라이언트가 client_max_window_bits를 제안한 경우에만 제한할 수 있음
+        client_bits = MAX_WINDOW_BITS
+        if "client_max_window_bits" in params:
+            offered = _window_bits(params["client_max_window_bits"], MAX_WINDOW_BITS)
+            if offered is None:
+                continue
+            client_bits = min(offered, client_max_window_bits)
+
+        return PerMessageDeflate(
+            server_context_takeover=server_context_takeover and "server_no_context_takeover" not in params,
+            client_context_takeover="client_no_context_takeover" not in params,
+            server_max_window_bits=server_bits,
+            client_max_window_bits=client_bits,
+            compress_level=compress_level,
+            min_size=min_size,
+        )
+    return None
@@ -3,11 +3,18 @@ const API = {
     register: "/register",
     history: "/api/chat/history",
     send: "/api/chat/send",
+    stream: "/api/chat/stream",
 };
 
+const POLL_INTERVAL_MS = 10000; // 실시간 연결(EventSource)을 쓸 수 없을 때의 증분 조회 주기
+
 const state = {
     user: window.__AI_COMMUNITY_USER__ || null,
     theme: localStorage.getItem('theme') || 'dark',
+    lastMessageId: null,   // 마지막으로 화면에 추가한 패킷 (증분 조회 기준)
+    seenIds: new Set(),    // 이미 표시한 패킷 (실시간 전송/전송 응답/증분 조회 중복 방지)
+    stream: null,
+    pollTimer: null,
 };
 
 // Theme Management
@@ -123,52 +130,109 @@ function hideTypingIndicator() {
     }
 }
 
+function createChatEntry(packet, log, animate = true) {
+    const wrapper = document.createElement("article");
+    wrapper.className = "chat-entry";
+    wrapper.dataset.messageId = packet.header.message_id;
+    if (packet.header.message_type === "AI") {
+        wrapper.classList.add("chat-entry--ai");
+    }
+    const meta = document.createElement("div");
+    meta.className = "chat-entry__meta";
+    const timestamp = new Date(packet.header.timestamp);
+    meta.textContent = `${packet.header.sender} • ${timestamp.toLocaleTimeString()}`;
+    const body = document.createElement("div");
+    body.className = "chat-entry__body";
+    
+    // Typing effect for messages
+    const text = packet.payload.body;
+    if (packet.header.message_type === "AI" && animate) {
+        let charIndex = 0;
+        body.textContent = '';
+        const typingInterval = setInterval(() => {
+            if (charIndex < text.length) {
+                body.textContent += text[charIndex];
+                charIndex++;
+                log.scrollTop = log.scrollHeight;
+            } else {
+                clearInterval(typingInterval);
+            }
+        }, 20);
+    } else {
+        body.textContent = text;
+    }
+    
+    wrapper.append(meta, body);
+    return wrapper;
+}
+
+function rememberPacket(packet) {
+    state.seenIds.add(packet.header.message_id);
+    state.lastMessageId = packet.header.message_id;
+}
+
 function renderHistory(history) {
     const log = document.getElementById("chat-log");
     if (!log) return;
     
     hideTypingIndicator();
     log.innerHTML = "";
+    state.seenIds.clear();
+    state.lastMessageId = null;
     
     history.forEach((packet, index) => {
+        rememberPacket(packet);
         setTimeout(() => {
-            const wrapper = document.createElement("article");
-            wrapper.className = "chat-entry";
-            if (packet.header.message_type === "AI") {
-                wrapper.classList.add("chat-entry--ai");
-            }
-            const meta = document.createElement("div");
-            meta.className = "chat-entry__meta";
-            const timestamp = new Date(packet.header.timestamp);
-            meta.textContent = `${packet.header.sender} • ${timestamp.toLocaleTimeString()}`;
-            const body = document.createElement("div");
-            body.className = "chat-entry__body";
-            
-            // Typing effect for messages
-            const text = packet.payload.body;
-            if (packet.header.message_type === "AI") {
-                let charIndex = 0;
-                body.textContent = '';
-                const typingInterval = setInterval(() => {
-                    if (charIndex < text.length) {
-                        body.textContent += text[charIndex];
-                        charIndex++;
-                        log.scrollTop = log.scrollHeight;
-                    } else {
-                        clearInterval(typingInterval);
-                    }
-                }, 20);
-            } else {
-                body.textContent = text;
-            }
-            
-            wrapper.append(meta, body);
-            log.appendChild(wrapper);
+            log.appendChild(createChatEntry(packet, log));
             log.scrollTop = log.scrollHeight;
         }, index * 100); // Stagger animation
     });
 }
 
+// 새 패킷만 기존 기록 뒤에 추가 (이미 표시한 패킷은 건너뜀)
+function appendPackets(packets) {
+    const log = document.getElementById("chat-log");
+    if (!log) return;
+
+    packets.forEach((packet) => {
+        if (!packet || state.seenIds.has(packet.header.message_id)) return;
+        const metadata = packet.payload.metadata || {};
+        if (metadata.partial !== undefined && applyStreamPacket(packet, log, metadata)) return;
+        rememberPacket(packet);
+        if (packet.header.message_type === "AI") {
+            hideTypingIndicator();
+        }
+        const indicator = document.getElementById("typing-indicator");
+        log.insertBefore(createChatEntry(packet, log), indicator);
+        log.scrollTop = log.scrollHeight;
+    });
+}
+
+// AI 스트리밍 패킷: 같은 message_id의 항목을 이어서 키움 (처리했으면 true)
+// 중간 패킷 본문은 metadata.offset 위치부터의 새 텍스트, 완성 패킷 본문은 전체 텍스트
+function applyStreamPacket(packet, log, metadata) {
+    const entry = log.querySelector(`[data-message-id="${packet.header.message_id}"]`);
+    if (!metadata.partial) {
+        if (!entry) return false; // 스트리밍 없이 도착한 응답은 일반 패킷처럼 표시
+        rememberPacket(packet);
+        entry.querySelector(".chat-entry__body").textContent = packet.payload.body;
+        return true;
+    }
+    const length = Array.from(packet.payload.body).length;
+    if (!entry) {
+        if (metadata.offset !== 0) return true; // 앞부분을 놓친 경우 완성 패킷을 기다림
+        hideTypingIndicator();
+        const created = createChatEntry(packet, log, false);
+        created.dataset.streamed = length;
+        log.insertBefore(created, document.getElementById("typing-indicator"));
+    } else if (Number(entry.dataset.streamed) === metadata.offset) {
+        entry.querySelector(".chat-entry__body").textContent += packet.payload.body;
+        entry.dataset.streamed = metadata.offset + length;
+    }
+    log.scrollTop = log.scrollHeight;
+    return true;
+}
+
 async function refreshHistory() {
     try {
         const res = await fetch(API.history);
@@ -180,6 +244,64 @@ async function refreshHistory() {
     }
 }
 
+// 마지막으로 받은 패킷 이후만 조회 (실시간 연결을 쓸 수 없는 경우의 대체 경로)
+async function fetchNewPackets() {
+    if (!state.lastMessageId) {
+        await refreshHistory();
+        return;
+    }
+    try {
+        const res = await fetch(`${API.history}?since=${encodeURIComponent(state.lastMessageId)}`);
+        if (!res.ok) throw new Error("기록을 가져오지 못했습니다.");
+        const data = await res.json();
+        appendPackets(data.history || []);
+    } catch (error) {
+        console.error("History fetch error:", error);
+    }
+}
+
+function startPolling() {
+    if (state.pollTimer) return;
+    state.pollTimer = setInterval(() => {
+        fetchNewPackets().catch(() => {});
+    }, POLL_INTERVAL_MS);
+}
+
+function stopPolling() {
+    clearInterval(state.pollTimer);
+    state.pollTimer = null;
+}
+
+// 서버가 새 패킷을 보내 주는 실시간 연결 (Server-Sent Events)
+// 연결이 끊기면 브라우저가 Last-Event-ID를 붙여 자동으로 재접속하므로 놓친 패킷도 이어서 받음
+function connectStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    const url = state.lastMessageId
+        ? `${API.stream}?since=${encodeURIComponent(state.lastMessageId)}`
+        : API.stream;
+    const source = new EventSource(url);
+    state.stream = source;
+
+    source.onopen = () => stopPolling();
+    source.onmessage = (event) => {
+        try {
+            appendPackets([JSON.parse(event.data)]);
+        } catch (error) {
+            console.error("Stream message error:", error);
+        }
+    };
+    source.onerror = () => {
+        // 자동 재접속을 포기한 경우(401/503 등)에는 증분 조회로 전환
+        if (source.readyState === EventSource.CLOSED) {
+            state.stream = null;
+            startPolling();
+        }
+    };
+}
+
 function wireAuthForms() {
     const loginForm = document.getElementById("login-form");
     if (loginForm) {
@@ -266,12 +388,14 @@ function wireChatElements() {
             
             const result = await postJSON(API.send, { packet, ask_ai: askAi });
             
-            await refreshHistory();
-            
-            if (result.ai_packet) {
-                // Wait a bit for AI response animation
-                await new Promise(resolve => setTimeout(resolve, 500));
-                await refreshHistory();
+            // 실시간 연결로 먼저 도착했으면 중복 없이 건너뜀
+            appendPackets([result.packet, result.ai_packet]);
+            // AI 응답은 준비되면 실시간 연결로 도착하며, 그때 입력 중 표시가 사라짐
+            if (!result.ai_packet && !result.ai_pending) {
+                hideTypingIndicator();
+            }
+            if (result.ai_error) {
+                alert("⚠️ " + result.ai_error);
             }
             
             // Reset button
@@ -316,13 +440,10 @@ function wireChatElements() {
         }, 500);
     });
 
-    // Initial load
-    refreshHistory().catch(() => {});
-    
-    // Auto-refresh every 10 seconds (최적화)
-    setInterval(() => {
-        refreshHistory().catch(() => {});
-    }, 10000);
+    // Initial load, 이후 새 패킷은 실시간 연결로 받음
+    refreshHistory()
+        .catch(() => {})
+        .then(connectStream);
 }
 
 // Smooth scroll animations
@@ -400,7 +521,7 @@ document.addEventListener('keydown', (e) => {
 
 // Add visibility change handler for auto-refresh
 document.addEventListener('visibilitychange', () => {
-    if (!document.hidden) {
-        refreshHistory().catch(() => {});
+    if (!document.hidden && !state.stream) {
+        fetchNewPackets().catch(() => {});
     }
 });
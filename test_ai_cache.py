@@ -0,0 +1,103 @@
+# test_ai_cache.py
+# AI 응답 캐시 테스트 (gui/ai_service.py)
+# 실제 Gemini 대신 가짜 모델(FakeModel)로 다음을 확인함.
+# - 같은 질문(공백/대소문자 차이 포함)은 캐시에서 응답, 대화 맥락이 다르면 새로 호출
+# - TTL 만료, LRU 크기 제한, 적중률 통계
+# - 동시에 들어온 같은 질문은 모델 호출 1회를 공유 (스트리밍 포함)
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui"))
+
+from cache_utils import LRUCache
+from ai_service import AIService, FakeModel
+from test_utils import Checks, run_test
+
+MODEL_DELAY = 0.3
+
+
+def make_service(max_entries=16):
+    model = FakeModel(first_token_delay=MODEL_DELAY, chunk_delay=0)
+    return AIService(model=model, cache=LRUCache(max_entries)), model
+
+
+def ask_together(service, count, message, stream=False):
+    # count개 스레드가 같은 질문을 동시에 보내고 응답 목록 반환
+    answers = []
+
+    def ask():
+        if stream:
+            answers.append("".join(service.stream_reply([], message)))
+        else:
+            answers.append(service.reply([], message))
+
+    threads = [threading.Thread(target=ask) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return answers
+
+
+def run_ai_cache_test():
+    check = Checks("AI 응답 캐시")
+
+    # 1. 같은 질문은 두 번째부터 캐시에서 바로 응답
+    service, model = make_service()
+    history = ["오늘 스터디 어디서 해요?", "도서관 3층이요"]
+    first = service.reply(history, "파이썬 GIL이 뭐예요?")
+    started = time.perf_counter()
+    second = service.reply(history, "  파이썬 gil이   뭐예요? ")
+    elapsed = time.perf_counter() - started
+    check(model.calls == 1 and first == second and elapsed < MODEL_DELAY / 3,
+          f"정규화된 같은 질문은 캐시 적중 ({elapsed * 1000:.1f} ms)")
+
+    # 2. 질문 자체가 대화 기록에 들어가도 같은 키
+    service.reply(history + ["파이썬 GIL이 뭐예요?"], "파이썬 GIL이 뭐예요?")
+    check(model.calls == 1, "대화 기록에 포함된 질문 자신은 키에서 제외")
+
+    # 3. 대화 맥락이 다르면 새로 호출
+    service.reply(["전혀 다른 이야기"], "파이썬 GIL이 뭐예요?")
+    check(model.calls == 2, "최근 대화가 다르면 캐시 미스")
+
+    stats = service.cache_stats()
+    check(stats["hits"] == 2 and stats["misses"] == 2 and stats["hit_rate"] == 0.5,
+          f"적중률 통계 ({stats['hits']}/{stats['hits'] + stats['misses']})")
+
+    # 4. TTL 만료
+    service.cache_ttl = 0.1
+    service.reply([], "TTL 질문")
+    time.sleep(0.15)
+    service.reply([], "TTL 질문")
+    check(model.calls == 4, "TTL이 지나면 다시 호출")
+
+    # 5. LRU 크기 제한
+    service, model = make_service(max_entries=2)
+    for message in ("질문 A", "질문 B", "질문 C", "질문 A"):
+        service.reply([], message)
+    stats = service.cache_stats()
+    check(model.calls == 4 and stats["entries"] == 2 and stats["evictions"] >= 1,
+          f"최대 항목 수 초과 시 오래된 응답 제거 (제거 {stats['evictions']}건)")
+
+    # 6. 동시에 들어온 같은 질문은 모델 호출 1회 공유
+    service, model = make_service()
+    answers = ask_together(service, 5, "동시에 묻는 질문")
+    stats = service.cache_stats()
+    check(model.calls == 1 and len(set(answers)) == 1 and stats["coalesced"] == 4,
+          f"동시 질문 합치기 (모델 호출 {model.calls}회, 대기 합류 {stats['coalesced']}건)")
+
+    # 7. 스트리밍도 호출을 공유하고 완성된 응답을 캐시에 저장
+    answers = ask_together(service, 3, "스트리밍 동시 질문", stream=True)
+    cached = service.reply([], "스트리밍 동시 질문")
+    check(model.calls == 2 and len(set(answers)) == 1 and cached == answers[0],
+          "스트리밍 응답 공유 및 캐시 저장")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_ai_cache_test)
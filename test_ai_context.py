@@ -0,0 +1,79 @@
+# test_ai_context.py
+# AI 프롬프트 대화 맥락 테스트 (gui/ai_context.py)
+# - 채널별로 토큰 예산 안의 최근 메시지만 선택, 긴 메시지는 잘라서 포함
+# - 메시지별 토큰 추정은 추가할 때 한 번만 계산, 채널이 바뀌지 않으면 같은 맥락 객체 재사용
+# - AIService 프롬프트에 미리 만든 히스토리 블록이 그대로 들어감
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui"))
+
+import ai_context
+from ai_context import ContextBuilder, estimate_tokens
+from ai_service import AIService
+from chat_protocol import build_packet
+from test_utils import Checks, run_test
+
+BUDGET = 100
+NUM_MESSAGES = 2000
+
+
+def run_ai_context_test():
+    check = Checks("AI 대화 맥락")
+
+    # 1. 토큰 예산 안의 최근 메시지만, 오래된 것부터 순서대로
+    builder = ContextBuilder(budget_tokens=BUDGET, max_message_tokens=40)
+    bodies = [f"메시지 {i}번 내용입니다" for i in range(50)]
+    for body in bodies:
+        builder.add(build_packet("user@test.com", body, channel="lobby"))
+    context = builder.build("lobby")
+    used = sum(estimate_tokens(text) for text in context)
+    check(used <= BUDGET and list(context) == bodies[-len(context):] and context.tokens == used,
+          f"예산 {BUDGET} 토큰 안의 최근 메시지 {len(context)}개 선택 ({used} 토큰)")
+
+    # 2. 채널끼리 섞이지 않고, AI/SYSTEM 패킷은 맥락에서 제외
+    builder.add(build_packet("user@test.com", "개발 채널 메시지", channel="dev"))
+    builder.add(build_packet("AI-Assistant", "AI 답변", message_type="AI", channel="dev"))
+    check(list(builder.build("dev")) == ["개발 채널 메시지"], "채널별 맥락 분리, CHAT만 포함")
+    check(len(builder.build("empty")) == 0, "메시지 없는 채널은 빈 맥락")
+
+    # 3. 긴 메시지는 잘라서 넣음
+    builder.add(build_packet("user@test.com", "가" * 500, channel="long"))
+    check(estimate_tokens(builder.build("long")[0]) <= 41, "긴 메시지는 메시지당 최대 토큰으로 자름")
+
+    # 4. 채널이 바뀌지 않으면 같은 맥락 객체, 토큰 추정은 메시지당 한 번
+    check(builder.build("lobby") is context, "변경 없는 채널은 맥락을 다시 만들지 않음")
+    calls = []
+    original = ai_context.estimate_tokens
+    ai_context.estimate_tokens = lambda text: calls.append(text) or original(text)
+    try:
+        counted = ContextBuilder(budget_tokens=BUDGET)
+        for i in range(NUM_MESSAGES):
+            counted.add(build_packet("user@test.com", f"질문 {i}", channel="lobby"))
+            counted.build("lobby")
+    finally:
+        ai_context.estimate_tokens = original
+    # _truncate가 1번, 항목 추정이 1번 → 메시지당 2번 (기존 메시지는 다시 세지 않음)
+    check(len(calls) == 2 * NUM_MESSAGES, f"토큰 추정 호출 {len(calls)}회 / 메시지 {NUM_MESSAGES}개")
+
+    # 5. 프롬프트에는 미리 만든 블록이 그대로 들어감
+    prompt = AIService._build_prompt(context, "새 질문")
+    check(context.block in prompt and prompt.endswith("사용자: 새 질문\nAI:"), "프롬프트에 히스토리 블록 포함")
+    legacy = AIService._build_prompt(["a", "b"], "질문")
+    check("- a\n- b\n" in legacy, "문자열 목록도 기존처럼 처리")
+
+    # 6. 시간: 맥락 선택은 채널 히스토리 길이와 무관
+    started = time.perf_counter()
+    for _ in range(10000):
+        AIService._build_prompt(counted.build("lobby"), "질문")
+    elapsed = (time.perf_counter() - started) / 10000 * 1e6
+    print(f"    프롬프트 조립 평균 {elapsed:.1f} µs (맥락 {len(counted.build('lobby'))}개 메시지)")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_ai_context_test)
@@ -0,0 +1,179 @@
+# test_ai_jobs.py
+# AI 응답 작업 큐(gui/ai_jobs.py) 테스트
+# 실제 Gemini 대신 일정 시간 뒤 답하는 가짜 서비스로 다음을 확인함.
+# - submit은 모델 응답을 기다리지 않고 바로 반환, 응답은 in_reply_to와 함께 전달
+# - 같은 채널의 같은 질문은 모델 호출 1회로 합쳐짐
+# - 사용자별/전체 동시 작업 수 제한, 시간 초과 시 대체 응답
+# - 스트리밍 모드: 첫 부분 응답이 먼저 도착하고, 같은 message_id의 부분 응답을 이어 붙이면 완성 응답과 같음
+# - 응답 출처(metadata.source)는 서비스가 실제로 답한 경로 (모델 장애로 로컬 답변이면 fallback)
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui"))
+
+from ai_jobs import AIJobQueue, AIJobRejected, TIMEOUT_MESSAGE
+from ai_service import AIService, FakeModel
+from ai_resilience import RetryPolicy
+from test_utils import Checks, run_test
+
+MODEL_DELAY = 0.3
+
+
+class FakeAIService:
+    # 호출 횟수를 세고 delay초 뒤 답하는 가짜 모델
+    available = True
+
+    def __init__(self, delay=MODEL_DELAY):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def reply(self, chat_history, user_message, info=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if info is not None:
+            info["source"] = "gemini"
+        return f"답변: {user_message}"
+
+
+class Collector:
+    # deliver 콜백으로 받은 패킷 모음
+    def __init__(self):
+        self.packets = []
+        self.event = threading.Event()
+
+    def __call__(self, packet):
+        self.packets.append(packet)
+        self.event.set()
+
+    def wait(self, count, timeout=5):
+        deadline = time.time() + timeout
+        while len(self.packets) < count and time.time() < deadline:
+            time.sleep(0.01)
+        return len(self.packets) >= count
+
+
+def submit(queue, deliver, user, message_id, message, channel="lobby"):
+    return queue.submit(user=user, channel=channel, in_reply_to=message_id,
+                        message=message, history=[], deliver=deliver)
+
+
+def run_ai_jobs_test():
+    check = Checks("AI 응답 작업 큐")
+
+    # 1. 제출은 즉시 반환되고 응답은 나중에 전달됨
+    service = FakeAIService()
+    queue = AIJobQueue(service, workers=2, max_per_user=2, timeout=5)
+    collector = Collector()
+    started = time.perf_counter()
+    submit(queue, collector, "a@test.com", "m1", "파이썬이 뭐예요?")
+    submit_time = time.perf_counter() - started
+    check(submit_time < MODEL_DELAY / 3, f"submit이 모델 응답을 기다리지 않음 ({submit_time * 1000:.1f} ms)")
+    check(collector.wait(1), "AI 응답 패킷 전달")
+    packet = collector.packets[0] if collector.packets else None
+    check(packet is not None and packet["payload"]["metadata"]["in_reply_to"] == "m1",
+          "응답 패킷에 in_reply_to 포함")
+
+    # 2. 같은 채널의 같은 질문은 한 번만 호출하고 질문마다 응답 전달
+    service.calls = 0
+    collector = Collector()
+    submit(queue, collector, "a@test.com", "m2", "오늘 스터디 주제는?")
+    submit(queue, collector, "b@test.com", "m3", "오늘  스터디 주제는? ")
+    submit(queue, collector, "b@test.com", "m3", "오늘 스터디 주제는?")  # 같은 메시지 재전송
+    collector.wait(2)
+    time.sleep(0.05)
+    replied_to = sorted(p["payload"]["metadata"]["in_reply_to"] for p in collector.packets)
+    check(service.calls == 1 and replied_to == ["m2", "m3"],
+          f"중복 질문 합치기 (모델 호출 {service.calls}회, 응답 {replied_to})")
+
+    # 3. 사용자별 동시 작업 수 제한
+    collector = Collector()
+    submit(queue, collector, "c@test.com", "m4", "질문 1")
+    submit(queue, collector, "c@test.com", "m5", "질문 2")
+    try:
+        submit(queue, collector, "c@test.com", "m6", "질문 3")
+        rejected = False
+    except AIJobRejected:
+        rejected = True
+    check(rejected, "사용자별 동시 작업 수 초과 시 거절")
+    collector.wait(2)
+
+    # 4. 전체 대기 작업 수 제한
+    small = AIJobQueue(FakeAIService(), workers=1, max_pending=2, max_per_user=10, timeout=5)
+    collector = Collector()
+    submit(small, collector, "d@test.com", "m7", "질문 A")
+    submit(small, collector, "e@test.com", "m8", "질문 B")
+    try:
+        submit(small, collector, "f@test.com", "m9", "질문 C")
+        rejected = False
+    except AIJobRejected:
+        rejected = True
+    check(rejected, "전체 대기 작업 수 초과 시 거절")
+    collector.wait(2)
+
+    # 5. 시간 초과 시 대체 응답을 보내고 늦게 온 모델 결과는 버림
+    slow = AIJobQueue(FakeAIService(delay=1.0), workers=1, timeout=0.2)
+    collector = Collector()
+    submit(slow, collector, "g@test.com", "m10", "느린 질문")
+    collector.wait(1)
+    time.sleep(1.0)
+    bodies = [p["payload"]["body"] for p in collector.packets]
+    check(bodies == [TIMEOUT_MESSAGE], "시간 초과 시 대체 응답 1회만 전달")
+    check(slow.stats()["timeouts"] == 1 and slow.stats()["pending"] == 0, "시간 초과 통계")
+
+    # 6. 스트리밍 응답 (가짜 모델: 0.1초 뒤 첫 조각, 이후 0.05초마다 10글자씩)
+    model = FakeModel(reply_text="스트리밍으로 전달되는 답변입니다. " * 6, chunk_size=10,
+                      first_token_delay=0.1, chunk_delay=0.05)
+    streaming = AIJobQueue(AIService(model=model), workers=1, timeout=5, stream_interval=0)
+    collector = Collector()
+    started = time.perf_counter()
+    submit(streaming, collector, "h@test.com", "m11", "스트리밍 질문")
+    collector.wait(1)
+    first_time = time.perf_counter() - started
+    deadline = time.time() + 5
+    while not any(p["payload"]["metadata"].get("partial") is False for p in collector.packets) and time.time() < deadline:
+        time.sleep(0.01)
+    final_time = time.perf_counter() - started
+    partials = [p for p in collector.packets if p["payload"]["metadata"].get("partial")]
+    finals = [p for p in collector.packets if p["payload"]["metadata"].get("partial") is False]
+    check(partials and first_time < final_time / 2,
+          f"첫 부분 응답이 먼저 도착 (첫 조각 {first_time * 1000:.0f} ms, 완성 {final_time * 1000:.0f} ms)")
+    ids = {p["header"]["message_id"] for p in collector.packets}
+    joined = "".join(p["payload"]["body"] for p in partials)
+    offsets_ok = all(p["payload"]["metadata"]["offset"] == len("".join(q["payload"]["body"] for q in partials[:i]))
+                     for i, p in enumerate(partials))
+    check(len(finals) == 1 and len(ids) == 1 and offsets_ok and joined == finals[0]["payload"]["body"],
+          f"부분 응답 {len(partials)}개가 같은 message_id로 완성 응답과 일치")
+
+    check(finals[0]["payload"]["metadata"]["source"] == "gemini", "모델 응답의 출처는 gemini")
+
+    # 7. 모델 장애로 로컬 답변을 보낸 경우 출처는 fallback (스트리밍/일반 모두)
+    failing = FakeModel(first_token_delay=0.01)
+    failing.failing = True
+    sources = []
+    for stream in (True, False):
+        service = AIService(model=failing, retry=RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.02))
+        degraded = AIJobQueue(service, workers=1, timeout=5, stream=stream, stream_interval=0)
+        collector = Collector()
+        submit(degraded, collector, "i@test.com", f"m12-{stream}", "장애 중 질문")
+        deadline = time.time() + 5
+        while not any(p["payload"]["metadata"].get("partial") is not True for p in collector.packets) and time.time() < deadline:
+            time.sleep(0.01)
+        sources += [p["payload"]["metadata"]["source"] for p in collector.packets
+                    if p["payload"]["metadata"].get("partial") is not True]
+        degraded.shutdown()
+    check(sources == ["fallback", "fallback"], f"모델 장애 시 출처는 fallback ({sources})")
+
+    for q in (queue, small, slow, streaming):
+        q.shutdown()
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_ai_jobs_test)
@@ -0,0 +1,108 @@
+# test_ai_resilience.py
+# AI 업스트림 장애 대응 테스트 (gui/ai_resilience.py, gui/ai_service.py)
+# 실제 Gemini 대신 장애/지연을 흉내 내는 가짜 모델(FakeModel)로 다음을 확인함.
+# - 연속 실패 시 회로가 열려 모델을 호출하지 않고 바로 로컬 응답
+# - 일정 시간 뒤 half-open 시험 호출 성공 시 회로 닫힘, 실패 시 다시 열림
+# - 재시도 횟수/재시도 예산 제한, 호출 시간 제한, 교체 가능한 로컬 응답기
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui"))
+
+from ai_resilience import CLOSED, OPEN, CircuitBreaker, RetryPolicy
+from ai_service import UPSTREAM_DOWN_NOTICE, AIService, FakeModel
+from test_utils import Checks, run_test
+
+RESET_TIMEOUT = 0.3
+
+
+class FlakyModel(FakeModel):
+    # 처음 fail_first번은 실패하고 이후 정상 응답하는 가짜 모델
+    def __init__(self, fail_first, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_first = fail_first
+
+    def _first_token(self, request_options):
+        super()._first_token(request_options)
+        if self.calls <= self.fail_first:
+            raise ConnectionError("flaky upstream")
+
+
+def make_service(model, max_attempts=1, **kwargs):
+    return AIService(
+        model=model,
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=RESET_TIMEOUT),
+        retry=RetryPolicy(max_attempts=max_attempts, base_delay=0.01, max_delay=0.02),
+        **kwargs,
+    )
+
+
+def run_ai_resilience_test():
+    check = Checks("AI 업스트림 장애 대응")
+
+    # 1. 연속 실패로 회로가 열리면 모델을 호출하지 않고 바로 로컬 응답
+    model = FakeModel(first_token_delay=0.05)
+    model.failing = True
+    service = make_service(model)
+    for i in range(3):
+        service.reply([], f"장애 질문 {i}")
+    calls = model.calls
+    started = time.perf_counter()
+    text = service.reply([], "회로가 열린 뒤 질문")
+    elapsed = time.perf_counter() - started
+    check(service.breaker.state == OPEN, "연속 3회 실패 후 회로 열림")
+    check(model.calls == calls and text.startswith(UPSTREAM_DOWN_NOTICE) and elapsed < 0.02,
+          f"열린 회로는 모델 호출 없이 즉시 로컬 응답 ({elapsed * 1000:.1f} ms)")
+
+    # 2. half-open 시험 호출이 실패하면 다시 열림
+    time.sleep(RESET_TIMEOUT)
+    service.reply([], "시험 호출 1")
+    check(model.calls == calls + 1 and service.breaker.state == OPEN, "시험 호출 실패 시 다시 열림")
+
+    # 3. half-open 시험 호출이 성공하면 닫힘
+    time.sleep(RESET_TIMEOUT)
+    model.failing = False
+    text = service.reply([], "시험 호출 2")
+    check(service.breaker.state == CLOSED and not text.startswith(UPSTREAM_DOWN_NOTICE),
+          "시험 호출 성공 시 회로 닫힘")
+
+    # 4. 일시적인 실패는 재시도로 복구
+    service = make_service(FlakyModel(fail_first=2, first_token_delay=0.01), max_attempts=3)
+    text = service.reply([], "재시도 질문")
+    stats = service.upstream_stats()
+    check(not text.startswith(UPSTREAM_DOWN_NOTICE) and stats["retry"]["retries"] == 2,
+          f"실패 2회 후 3번째 시도에서 성공 (재시도 {stats['retry']['retries']}회)")
+
+    # 5. 재시도 예산을 다 쓰면 더 이상 재시도하지 않음
+    model = FakeModel(first_token_delay=0.01)
+    model.failing = True
+    service = make_service(model, max_attempts=5)
+    service.retry = RetryPolicy(max_attempts=5, base_delay=0.01, budget_ratio=0, budget_max=1)
+    service.reply([], "예산 질문")
+    stats = service.retry.stats()
+    check(model.calls == 2 and stats["budget_exhausted"] == 1, f"재시도 예산 제한 (모델 호출 {model.calls}회)")
+
+    # 6. 호출 시간 제한: 느린 업스트림을 끝까지 기다리지 않음
+    service = make_service(FakeModel(first_token_delay=2.0), upstream_timeout=0.1)
+    started = time.perf_counter()
+    text = service.reply([], "느린 질문")
+    elapsed = time.perf_counter() - started
+    check(text.startswith(UPSTREAM_DOWN_NOTICE) and elapsed < 0.5,
+          f"시간 제한 초과 시 로컬 응답 ({elapsed * 1000:.0f} ms)")
+
+    # 7. 로컬 응답기 교체 + 스트리밍 경로
+    model = FakeModel(first_token_delay=0.01)
+    model.failing = True
+    service = make_service(model, fallback=lambda history, message: f"로컬 모델: {message}")
+    chunks = list(service.stream_reply([], "스트리밍 장애 질문"))
+    check(chunks == [UPSTREAM_DOWN_NOTICE + "로컬 모델: 스트리밍 장애 질문"],
+          "스트리밍 실패 시 교체한 로컬 응답기로 응답")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_ai_resilience_test)
@@ -0,0 +1,77 @@
+# test_author_names.py
+# 작성자 이름 캐시(author_names.py) 테스트 (DB 없이 profiles 조회를 흉내 내는 가짜 커서 사용)
+# - 한 페이지의 캐시 미스는 IN 쿼리 1회로 조회, 다음 페이지부터는 캐시 적중
+# - 프로필이 없는 사용자는 '익명'으로 표시하고 다시 조회하지 않음
+# - invalidate 후에는 새 이름 반영, dictionary=True 커서 지원
+
+from author_names import AuthorNameCache, DEFAULT_AUTHOR_NAME
+from test_utils import Checks, run_test
+
+
+class FakeCursor:
+    # SELECT user_id, name FROM profiles WHERE user_id IN (...) 만 처리하는 가짜 커서
+    def __init__(self, profiles, dictionary=False):
+        self.profiles = profiles
+        self.dictionary = dictionary
+        self.queries = []
+        self._rows = []
+
+    def execute(self, query, params):
+        self.queries.append((query, list(params)))
+        found = [(user_id, self.profiles[user_id]) for user_id in params if user_id in self.profiles]
+        if self.dictionary:
+            found = [{"user_id": user_id, "name": name} for user_id, name in found]
+        self._rows = found
+
+    def fetchall(self):
+        return self._rows
+
+
+def run_author_names_test():
+    check = Checks("작성자 이름 캐시")
+
+    profiles = {1: "철수", 2: "영희", 3: None}
+    cache = AuthorNameCache(ttl=60)
+    cursor = FakeCursor(profiles)
+
+    # 1. 한 페이지(작성자 중복 포함)는 IN 쿼리 1회
+    page = [{"post_id": i, "user_id": user_id} for i, user_id in enumerate([1, 2, 1, 3, 4, 2])]
+    cache.fill(cursor, page)
+    names = [row["user_name"] for row in page]
+    check(len(cursor.queries) == 1 and sorted(cursor.queries[0][1]) == [1, 2, 3, 4],
+          f"캐시 미스 4명을 쿼리 1회로 조회 ({len(cursor.queries)}회)")
+    check(names == ["철수", "영희", "철수", DEFAULT_AUTHOR_NAME, DEFAULT_AUTHOR_NAME, "영희"],
+          f"이름 채우기, 프로필/이름 없으면 '{DEFAULT_AUTHOR_NAME}' ({names})")
+
+    # 2. 다음 페이지는 캐시 적중 (프로필 없는 사용자도 다시 조회하지 않음)
+    cache.fill(cursor, [{"user_id": 4}, {"user_id": 1}])
+    stats = cache.stats()
+    check(len(cursor.queries) == 1 and stats["hits"] == 2,
+          f"두 번째 페이지는 쿼리 없이 처리 (적중 {stats['hits']}, 미스 {stats['misses']})")
+
+    # 3. 새 작성자만 조회
+    cache.fill(cursor, [{"user_id": 1}, {"user_id": 5}])
+    check(len(cursor.queries) == 2 and cursor.queries[1][1] == [5], "새 작성자만 IN 쿼리로 조회")
+
+    # 4. 이름 변경 후 invalidate하면 새 이름 반영
+    profiles[1] = "김철수"
+    before = cache.fill(cursor, [{"user_id": 1}])[0]["user_name"]
+    cache.invalidate(1)
+    after = cache.fill(cursor, [{"user_id": 1}])[0]["user_name"]
+    check(before == "철수" and after == "김철수", f"invalidate 후 새 이름 반영 ({before} → {after})")
+
+    # 5. dictionary=True 커서와 다른 이름 필드
+    rows = AuthorNameCache().fill(FakeCursor(profiles, dictionary=True), [{"user_id": 2}], name_field="nickname")
+    check(rows[0]["nickname"] == "영희", "dictionary 커서 결과 처리")
+
+    # 6. 빈 페이지는 쿼리 없음
+    cursor = FakeCursor(profiles)
+    AuthorNameCache().fill(cursor, [])
+    check(not cursor.queries, "빈 페이지는 쿼리 없음")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_author_names_test)
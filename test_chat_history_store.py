@@ -0,0 +1,96 @@
+# test_chat_history_store.py
+# 채팅 히스토리 저장소 테스트
+# 채널별 링 버퍼 크기 제한, message_id/시각 기준 범위 조회, 세그먼트 로그 재생(재시작 복원)을 확인함.
+# 모르는 message_id는 최근 메시지로 대신하고, 조회 개수는 항상 상한이 있음.
+# (DB/서버 없이 임시 디렉터리만 사용)
+
+import tempfile
+import time
+
+from chat_protocol import build_packet
+from chat_history_store import ChatHistoryStore
+from test_utils import Checks, run_test
+
+MAX_PER_CHANNEL = 5
+NUM_MESSAGES = 30
+
+
+def fill(store):
+    # lobby/dev 두 채널에 번갈아 메시지를 넣고 (채널, message_id, 본문) 목록 반환
+    sent = []
+    for i in range(NUM_MESSAGES):
+        channel = "dev" if i % 3 == 0 else "lobby"
+        packet = build_packet(f"user{i}@test.com", f"메시지 {i}", channel=channel)
+        store.append(packet)
+        sent.append((channel, packet["header"]["message_id"], packet["payload"]["body"]))
+        time.sleep(0.001)
+    return sent
+
+
+def bodies(packets):
+    return [packet["payload"]["body"] for packet in packets]
+
+
+def run_chat_history_test():
+    check = Checks("채팅 히스토리 저장소")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ChatHistoryStore(directory, max_per_channel=MAX_PER_CHANNEL, segment_max_bytes=2048)
+        sent = fill(store)
+        lobby = [item for item in sent if item[0] == "lobby"]
+        dev = [item for item in sent if item[0] == "dev"]
+
+        # 1. 채널별 링 버퍼는 최근 N개만 유지하고 채널끼리 섞이지 않음
+        check(bodies(store.recent("lobby")) == [b for _, _, b in lobby[-MAX_PER_CHANNEL:]],
+              "lobby 채널 최근 메시지만 유지")
+        check(bodies(store.recent("dev")) == [b for _, _, b in dev[-MAX_PER_CHANNEL:]],
+              "dev 채널 메시지가 분리되어 저장")
+
+        # 2. message_id 이후 메시지 (메모리 버퍼 안)
+        check(bodies(store.since("lobby", message_id=lobby[-3][1])) == [b for _, _, b in lobby[-2:]],
+              "message_id 이후 메시지 조회")
+
+        # 3. 메모리 버퍼에서 밀려난 message_id는 디스크 로그에서 찾음
+        check(bodies(store.since("lobby", message_id=lobby[2][1], limit=3)) == [b for _, _, b in lobby[3:6]],
+              "오래된 message_id는 세그먼트 로그에서 조회")
+
+        # 4. 시각 기준 조회
+        check(store.since("dev", timestamp=time.time()) == [], "현재 시각 이후 메시지는 없음")
+        check(bodies(store.since("dev", timestamp=0)) == [b for _, _, b in dev],
+              "처음부터 조회하면 채널 전체 기록 반환")
+        check(bodies(store.since("lobby", timestamp=0, limit=2)) == [b for _, _, b in lobby[:2]],
+              "오래된 시각도 limit개까지만 반환")
+
+        # 5. 모르는(위조된) message_id는 전체 기록 대신 최근 메시지
+        check(bodies(store.since("lobby", message_id="forged-id", limit=2)) == [b for _, _, b in lobby[-2:]],
+              "모르는 message_id는 최근 메시지로 대신")
+        check(bodies(store.since("dev", message_id=lobby[2][1])) == bodies(store.recent("dev")),
+              "다른 채널의 message_id도 최근 메시지로 대신")
+
+        # 6. 재시작 시 세그먼트 로그로 복원 (디스크 색인 포함)
+        store.close()
+        restored = ChatHistoryStore(directory, max_per_channel=MAX_PER_CHANNEL)
+        check(bodies(restored.recent("lobby")) == bodies(store.recent("lobby")),
+              "재시작 후 링 버퍼 복원")
+        check(bodies(restored.since("lobby", message_id=lobby[2][1], limit=3)) == [b for _, _, b in lobby[3:6]],
+              "재시작 후에도 오래된 message_id 조회")
+        restored.append(build_packet("user@test.com", "재시작 후 메시지"))
+        check(restored.stats()["last_seq"] == NUM_MESSAGES + 1, "재시작 후 seq 이어서 증가")
+        restored.close()
+
+    # 7. 보관 기간이 지나 삭제된 세그먼트의 message_id는 색인에서도 빠짐
+    with tempfile.TemporaryDirectory() as directory:
+        store = ChatHistoryStore(directory, max_per_channel=MAX_PER_CHANNEL, segment_max_bytes=512, segment_retention=2)
+        sent = fill(store)
+        lobby = [item for item in sent if item[0] == "lobby"]
+        check(bodies(store.since("lobby", message_id=lobby[0][1], limit=2)) == [b for _, _, b in lobby[-2:]],
+              "삭제된 세그먼트의 message_id는 최근 메시지로 대신")
+        check(store.stats()["indexed_messages"] < NUM_MESSAGES, "삭제된 세그먼트 색인 정리")
+        store.close()
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_chat_history_test)
@@ -3,7 +3,7 @@
 
 from client_register import register_client
 from client_login import login_client
-from client_comment import create_comment_client, get_comments_client, update_comment_client, delete_comment_client
+from client_comment import create_comment_client, get_comments_client, get_comment_thread_client, update_comment_client, delete_comment_client
 import time
 
 # -------------------------- 테스트 환경 설정 --------------------------
@@ -23,6 +23,18 @@ EXPECTED_USER_NAME = '익명'
 
 # -------------------------- 테스트 실행 함수 --------------------------
 
+def fetch_all_comments(post_id):
+    # next_cursor를 따라가며 모든 페이지의 댓글을 모아 반환 (조회 실패 시 마지막 응답 반환)
+    comments, cursor = [], None
+    while True:
+        page = get_comments_client(post_id, cursor=cursor)
+        if not page or page.get("status") != "SUCCESS":
+            return comments, page
+        comments.extend(page["comments"])
+        cursor = page.get("next_cursor")
+        if not cursor:
+            return comments, page
+
 def run_comment_test():
     print("=" * 60)
     print("        댓글 기능 통합 테스트 시작 (작성자 이름 확인)")
@@ -66,13 +78,13 @@ def run_comment_test():
 
     # 4. 댓글 목록 조회 및 작성자 이름 확인 (Read)
     print(f"\n--- 4. 댓글 목록 조회 및 작성자 이름 확인 ---")
-    comments_list_result = get_comments_client(TARGET_POST_ID)
+    all_comments, comments_list_result = fetch_all_comments(TARGET_POST_ID)
     
     if comments_list_result and comments_list_result.get("status") == "SUCCESS":
-        print(f"[SUCCESS] 댓글 총 {comments_list_result.get('total_comments')}개 조회 성공.")
+        print(f"[SUCCESS] 댓글 총 {len(all_comments)}개 조회 성공 (페이지 단위 조회).")
         
         # 방금 생성한 댓글의 ID와 내용(initial_comment)을 기준으로 목록에서 해당 댓글을 찾는다.
-        created_comment_data = next((c for c in comments_list_result["comments"] 
+        created_comment_data = next((c for c in all_comments 
                                      if c.get("comment_id") == created_comment_id and c.get("body") == initial_comment), None)
         
         if created_comment_data:
@@ -116,25 +128,38 @@ def run_comment_test():
         return
 
 
-    # 7. 댓글 삭제 시도 (Delete) - 성공 (본인)
+    # 6-1. 답글 작성 및 스레드 조회
+    print(f"\n--- 6-1. 답글 작성 및 스레드 조회 ---")
+    reply_result = create_comment_client(TARGET_POST_ID, other_token, "답글 테스트 내용입니다.", parent_comment_id=created_comment_id)
+    thread_result = get_comment_thread_client(created_comment_id)
+    reply_ids = [r["comment_id"] for r in thread_result["comment"]["replies"]] if thread_result and thread_result.get("status") == "SUCCESS" else []
+    
+    if reply_result and reply_result.get("status") == "SUCCESS" and reply_result.get("comment_id") in reply_ids:
+        print("[SUCCESS] 답글이 부모 댓글의 스레드에 포함됨.")
+    else:
+        print(f"[FAIL] 답글/스레드 조회 오류. 답글 응답: {reply_result}, 스레드 응답: {thread_result}")
+        return
+
+
+    # 7. 댓글 삭제 시도 (Delete) - 성공 (본인, 답글도 함께 삭제)
     print(f"\n--- 7. 댓글 삭제 시도 (본인 권한) ---")
     delete_result_self = delete_comment_client(created_comment_id, main_token)
     
-    if delete_result_self and delete_result_self.get("status") == "SUCCESS":
-        print("[SUCCESS] 댓글 삭제 성공 (본인).")
+    if delete_result_self and delete_result_self.get("status") == "SUCCESS" and delete_result_self.get("deleted_count") == 2:
+        print("[SUCCESS] 댓글 삭제 성공 (본인, 답글 포함 2개).")
     else:
         print(f"[FAIL] 댓글 삭제 실패 (본인). 응답: {delete_result_self}")
         return
         
     # 8. 삭제 후 댓글 목록 재조회 
     print(f"\n--- 8. 댓글 삭제 후 재조회 ---")
-    final_check_result = get_comments_client(TARGET_POST_ID)
+    remaining_comments, final_check_result = fetch_all_comments(TARGET_POST_ID)
     
-    # 댓글 삭제에 성공했으므로, 총 댓글 수는 테스트 시작 전 (댓글 조회 결과에서 가져온 값) 보다 1개 감소해야 한다.
-    expected_remaining_comments = comments_list_result.get('total_comments', 0) - 1 
+    # 댓글 삭제에 성공했으므로, 최상위 댓글 수는 테스트 시작 전 (댓글 조회 결과에서 가져온 값) 보다 1개 감소해야 한다.
+    expected_remaining_comments = len(all_comments) - 1 
     
     # 댓글이 아예 없어서 FAILURE 메시지가 오는 경우도 처리
-    total_comments = final_check_result.get('total_comments', 0)
+    total_comments = len(remaining_comments)
     
     if total_comments == expected_remaining_comments or final_check_result.get("message") == "해당 게시글에 댓글이 없습니다.":
         print(f"[SUCCESS] 댓글 삭제 후 총 댓글 수 확인 (예상: {expected_remaining_comments}개, 실제: {total_comments}개 또는 없음).")
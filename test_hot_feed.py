@@ -0,0 +1,130 @@
+# test_hot_feed.py
+# 인기 게시글 목록(hot feed) 테스트
+# - 댓글/좋아요 이벤트가 counter_buffer 반영 시 hot_score에 가중치만큼 더해지는지
+# - get_hot_posts가 점수 순으로 반환하고 커서로 다음 페이지를 이어 읽는지 (NaN/Infinity 점수 커서는 거부)
+# - 감쇠 작업이 지난 시간만큼(반감기 1회 = 절반) 점수를 줄이는지
+# (server_* 함수를 직접 호출하므로 Flask 서버 없이 DB만 실행되어 있으면 됨, hot_score 컬럼이 있는 스키마 필요)
+
+import base64
+import time
+
+from db_utils import get_connection, close_connection
+from server_login_register import register_user, login_user
+from server_posts import create_post, get_hot_posts, encode_hot_cursor, decode_hot_cursor
+from server_comment import create_comment
+from server_like import toggle_post_like
+from counter_buffer import COUNTER_BUFFERS
+from hot_feed import HOT_WEIGHTS, HOT_HALF_LIFE_HOURS, decay_factor, decay_hot_scores
+from test_utils import Checks, run_test
+
+TEST_PASSWORD = "hotfeed1234!"
+RUN_ID = int(time.time())
+
+
+def read_scores(post_ids):
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        cursor.execute(f"SELECT post_id, hot_score FROM posts WHERE post_id IN ({placeholders})", list(post_ids))
+        return dict(cursor.fetchall())
+    finally:
+        close_connection(conn)
+
+
+def age_decay_state(hours):
+    # 마지막 감쇠 시각을 hours시간 전으로 되돌리고 진행 중인 구간은 비움 (다음 감쇠 작업이 그만큼 감쇠하도록)
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO hot_score_state (id, decayed_at) VALUES (1, NOW() - INTERVAL %s HOUR)
+        ON DUPLICATE KEY UPDATE decayed_at = NOW() - INTERVAL %s HOUR, pending_until = NULL, pending_post_id = 0
+        """, (hours, hours))
+        conn.commit()
+    finally:
+        close_connection(conn)
+
+
+def find_order(post_ids, max_pages=50):
+    # 인기 목록을 커서로 넘기며 post_ids가 나온 순서 반환
+    order, cursor = [], None
+    for _ in range(max_pages):
+        result = get_hot_posts(100, cursor)
+        if result["status"] != "SUCCESS":
+            print(f"[FAIL] 인기 목록 조회 실패: {result}")
+            return order
+        order.extend(post["post_id"] for post in result["posts"] if post["post_id"] in post_ids)
+        cursor = result["next_cursor"]
+        if not cursor or len(order) == len(post_ids):
+            break
+    return order
+
+
+def run_hot_feed_test():
+    check = Checks("인기 게시글 목록")
+
+    # 0. 감쇠 비율 계산
+    check(abs(decay_factor(HOT_HALF_LIFE_HOURS * 3600) - 0.5) < 1e-9 and decay_factor(0) == 1,
+          "반감기마다 절반으로 감쇠")
+
+    # 0-1. 커서: 정상 커서는 그대로, NaN/Infinity 점수는 잘못된 커서
+    forged = [base64.urlsafe_b64encode(raw).decode("ascii") for raw in (b"[NaN,1]", b"[Infinity,1]", b"[-Infinity,1]")]
+    check(decode_hot_cursor(encode_hot_cursor(1.5, 7)) == (1.5, 7)
+          and all(decode_hot_cursor(cursor) is None for cursor in forged),
+          "유한하지 않은 점수의 커서 거부")
+    check(get_hot_posts(10, forged[0]) == {"status": "FAILURE", "message": "잘못된 커서입니다."},
+          "NaN 커서로 목록 조회 시 잘못된 커서")
+
+    email = f"hot_feed_{RUN_ID}@test.com"
+    register_user(email, TEST_PASSWORD)
+    login = login_user(email, TEST_PASSWORD)
+    if login["status"] != "SUCCESS":
+        print(f"[FAIL] 사용자 준비 실패: {login}")
+        return False
+    user_id = login["user_id"]
+
+    post_ids = []
+    for title in ("댓글 많은 글", "좋아요 받은 글", "조용한 글"):
+        result = create_post(user_id, f"{title} {RUN_ID}", "인기 목록 테스트용 게시글")
+        if result["status"] != "SUCCESS":
+            print(f"[FAIL] 게시글 생성 실패: {result}")
+            return False
+        post_ids.append(result["post_id"])
+    busy, liked, quiet = post_ids
+
+    # 1. 이벤트 반영: 댓글 2개, 좋아요 1개
+    create_comment(busy, user_id, "첫 댓글")
+    create_comment(busy, user_id, "두 번째 댓글")
+    toggle_post_like(liked, user_id)
+    for buffer in COUNTER_BUFFERS:
+        buffer.flush()
+
+    scores = read_scores(post_ids)
+    expected = {busy: 2 * HOT_WEIGHTS["comment_count"], liked: HOT_WEIGHTS["like_count"], quiet: 0}
+    check(all(abs(scores[post_id] - expected[post_id]) < 1e-6 for post_id in post_ids),
+          f"이벤트 가중치만큼 점수 증가 ({scores})")
+
+    # 2. 점수 순 목록 (커서로 이어 읽기)
+    order = find_order(set(post_ids))
+    check(order == [busy, liked, quiet], f"인기 목록 점수 순 ({order})")
+
+    # 3. 감쇠: 반감기만큼 지난 것으로 두고 감쇠 작업 실행
+    age_decay_state(HOT_HALF_LIFE_HOURS)
+    decay = decay_hot_scores()
+    after = read_scores(post_ids)
+    check(decay["status"] == "SUCCESS" and abs(after[busy] - scores[busy] / 2) < 0.01
+          and abs(after[liked] - scores[liked] / 2) < 0.01,
+          f"반감기 후 점수 절반 ({decay.get('factor')}, {after})")
+
+    # 4. 바로 다시 실행하면 지난 시간이 거의 없으므로 점수 유지
+    decay_hot_scores()
+    again = read_scores(post_ids)
+    check(abs(again[busy] - after[busy]) < 0.01, "연속 실행 시 중복 감쇠 없음")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_hot_feed_test)
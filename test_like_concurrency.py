@@ -0,0 +1,118 @@
+# test_like_concurrency.py
+# 좋아요 토글 동시성 스트레스 테스트
+# 여러 스레드가 한 게시글에 동시에 좋아요/취소를 반복한 뒤
+# posts.like_count 와 post_likes 실제 행 수가 일치하는지 확인함.
+# (buffered 모드에서는 like_count 증감분을 flush한 뒤 비교하고, 정합성 검사 작업도 어긋남 0건을 보고해야 함)
+# (server_like.toggle_post_like를 직접 호출하므로 Flask 서버 없이 DB만 실행되어 있으면 됨)
+
+import sys
+import time
+import threading
+
+from db_utils import get_connection, close_connection
+from server_login_register import register_user, login_user
+from server_posts import create_post
+from server_like import toggle_post_like
+from counter_buffer import like_counts
+from reconcile_counters import reconcile_counters
+
+# -------------------------- 테스트 환경 설정 --------------------------
+NUM_USERS = 20             # 좋아요를 누르는 사용자 수
+THREADS_PER_USER = 3       # 같은 사용자가 동시에 토글하는 스레드 수 (같은 사용자 경합 재현)
+TOGGLES_PER_THREAD = 15    # 스레드마다 토글 횟수
+TEST_PASSWORD = "stress1234!"
+RUN_ID = int(time.time())
+
+
+def setup_users_and_post():
+    # 테스트용 사용자들을 등록하고 게시글 하나를 생성
+    user_ids = []
+    for i in range(NUM_USERS):
+        email = f"like_stress_{RUN_ID}_{i}@test.com"
+        register_user(email, TEST_PASSWORD)
+        result = login_user(email, TEST_PASSWORD)
+        if result["status"] != "SUCCESS":
+            print(f"[FAIL] 사용자 준비 실패: {result}")
+            sys.exit(1)
+        user_ids.append(result["user_id"])
+
+    post_result = create_post(user_ids[0], "좋아요 동시성 테스트", "스트레스 테스트용 게시글")
+    if post_result["status"] != "SUCCESS":
+        print(f"[FAIL] 게시글 생성 실패: {post_result}")
+        sys.exit(1)
+    return user_ids, post_result["post_id"]
+
+
+def read_counts(post_id):
+    # (posts.like_count, post_likes 실제 행 수) 반환
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT like_count FROM posts WHERE post_id = %s", (post_id,))
+        like_count = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM post_likes WHERE post_id = %s", (post_id,))
+        actual = cursor.fetchone()[0]
+        return like_count, actual
+    finally:
+        close_connection(conn)
+
+
+def run_like_stress_test():
+    print("=" * 60)
+    print("        좋아요 토글 동시성 스트레스 테스트 시작")
+    print("=" * 60)
+
+    user_ids, post_id = setup_users_and_post()
+    print(f"[SETUP] 사용자 {len(user_ids)}명, 게시글 ID {post_id}")
+
+    failures = []
+    lock = threading.Lock()
+
+    def worker(user_id):
+        for _ in range(TOGGLES_PER_THREAD):
+            result = toggle_post_like(post_id, user_id)
+            if result["status"] != "SUCCESS":
+                with lock:
+                    failures.append(result["message"])
+
+    threads = [
+        threading.Thread(target=worker, args=(user_id,))
+        for user_id in user_ids
+        for _ in range(THREADS_PER_USER)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total = len(threads) * TOGGLES_PER_THREAD
+    # 메모리에 모인 like_count 증감분을 DB에 반영한 뒤 비교
+    like_counts.flush()
+    like_count, actual = read_counts(post_id)
+    reconcile = reconcile_counters(dry_run=True, settle_seconds=0, first_post_id=post_id, last_post_id=post_id)
+    drifted = reconcile["counters"]["like_count"]["drifted"] if reconcile["status"] == "SUCCESS" else None
+
+    print(f"\n토글 {total}회 / {elapsed:.2f}s ({total / elapsed:.1f} toggles/s), 실패 {len(failures)}건")
+    print(f"posts.like_count = {like_count}, post_likes 행 수 = {actual}")
+
+    # 사용자마다 토글 횟수가 THREADS_PER_USER * TOGGLES_PER_THREAD 이므로 최종 상태는 홀짝으로 결정됨
+    expected = NUM_USERS if (THREADS_PER_USER * TOGGLES_PER_THREAD) % 2 else 0
+    if failures:
+        print(f"[FAIL] 실패한 토글 예시: {failures[:3]}")
+    elif like_count != actual:
+        print("[FAIL] like_count와 실제 좋아요 수가 다릅니다.")
+    elif drifted != 0:
+        print(f"[FAIL] 정합성 검사 결과가 예상과 다릅니다: {reconcile}")
+    elif actual != expected:
+        print(f"[FAIL] 최종 좋아요 수가 예상({expected})과 다릅니다.")
+    else:
+        print("[SUCCESS] 동시 토글 후에도 like_count가 정확합니다.")
+        return True
+    return False
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    sys.exit(0 if run_like_stress_test() else 1)
@@ -0,0 +1,82 @@
+# test_password_hasher.py
+# 비밀번호 해싱 실행기 테스트 (DB 없이 password_hasher만 사용)
+# - 해싱/검증 결과, 기존 flask_bcrypt 해시와 호환
+# - 해시 비용(rounds) 변경 시 needs_rehash, 기다리지 않는 재해싱(rehash_later)
+# - 대기 작업 수 한도를 넘으면 기다리지 않고 HasherBusy
+
+import threading
+
+import bcrypt
+
+from password_hasher import HasherBusy, PasswordHasher, hash_rounds
+from test_utils import Checks, run_test
+
+ROUNDS = 4  # 테스트 속도를 위해 최소 비용 사용
+
+
+def run_password_hasher_test():
+    check = Checks("비밀번호 해싱 실행기")
+
+    for use_processes in (True, False):
+        mode = "process" if use_processes else "thread"
+        hasher = PasswordHasher(rounds=ROUNDS, workers=2, use_processes=use_processes)
+
+        # 1. 해싱/검증
+        hashed = hasher.hash("abc123@")
+        check(hasher.verify("abc123@", hashed) and not hasher.verify("wrong", hashed),
+              f"[{mode}] 해싱 후 검증")
+
+        # 2. 기존 방식(flask_bcrypt = bcrypt.hashpw)으로 만든 해시도 검증 가능
+        legacy = bcrypt.hashpw(b"abc123@", bcrypt.gensalt(5)).decode("utf-8")
+        check(hasher.verify("abc123@", legacy), f"[{mode}] 기존 해시 호환")
+        check(not hasher.verify("abc123@", "not-a-hash"), f"[{mode}] 잘못된 형식 해시는 불일치")
+        hasher.shutdown()
+
+    # 3. rounds 변경 시 재해싱 필요
+    hasher = PasswordHasher(rounds=ROUNDS, workers=1, use_processes=False)
+    old_hash = hasher.hash("abc123@")
+    hasher.rounds = ROUNDS + 1
+    new_hash = hasher.rehash("abc123@")
+    check(hasher.needs_rehash(old_hash) and not hasher.needs_rehash(new_hash)
+          and hash_rounds(new_hash) == ROUNDS + 1, "rounds 변경 시 재해싱")
+
+    # 로그인 중 재해싱은 기다리지 않고, 끝나면 콜백으로 새 해시 전달
+    done = threading.Event()
+    saved = []
+    queued = hasher.rehash_later("abc123@", lambda new: (saved.append((new, threading.current_thread().name)), done.set()))
+    done.wait(5)
+    check(queued and saved and hasher.verify("abc123@", saved[0][0])
+          and hash_rounds(saved[0][0]) == ROUNDS + 1, "기다리지 않는 재해싱 후 콜백")
+    check(saved and saved[0][1].startswith("rehash-save"), f"재해싱 저장은 별도 스레드에서 실행 ({saved and saved[0][1]})")
+    hasher.shutdown()
+
+    # 4. 대기 작업 한도 초과 시 바로 거절
+    hasher = PasswordHasher(rounds=12, workers=1, max_pending=1, use_processes=False)
+    started = threading.Event()
+    worker = threading.Thread(target=lambda: (started.set(), hasher.hash("slow")))
+    worker.start()
+    started.wait()
+    while hasher.stats()["pending"] == 0:
+        pass
+    try:
+        hasher.hash("rejected")
+        rejected = False
+    except HasherBusy as e:
+        rejected = e.retry_after > 0
+    worker.join()
+    check(rejected and hasher.stats()["rejected"] == 1, "대기 한도 초과 시 HasherBusy")
+    # 대기열이 가득 차 있을 때 재해싱은 예외 없이 건너뜀 (로그인은 성공 처리)
+    worker = threading.Thread(target=lambda: hasher.hash("slow"))
+    worker.start()
+    while hasher.stats()["pending"] == 0:
+        pass
+    check(hasher.rehash_later("abc123@", lambda new: None) is False, "대기 한도 초과 시 재해싱 건너뜀")
+    worker.join()
+    hasher.shutdown()
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_password_hasher_test)
@@ -0,0 +1,56 @@
+# test_rate_limiter.py
+# 로그인/회원가입 요청 제한 테스트 (memory 백엔드, DB/서버 없이 rate_limiter만 사용)
+# - IP별 연속 허용 횟수를 넘으면 Retry-After 반환, 시간이 지나면 다시 허용
+# - 계정별 한도는 로그인 실패에만 차감 (여러 IP에서 같은 계정 대입 차단)
+# - 전체 한도, 키 수 LRU 제한
+
+import time
+
+from rate_limiter import MemoryBuckets, RateLimiter
+from test_utils import Checks, run_test
+
+
+def run_rate_limiter_test():
+    check = Checks("요청 제한")
+
+    # 1. IP별: 버킷 크기만큼 허용 후 거절, 채워지는 속도만큼 다시 허용
+    limiter = RateLimiter("t1", {"ip": (3, 0.3)}, MemoryBuckets())  # 0.1초에 1회씩 충전
+    allowed = [limiter.check(ip="1.1.1.1") == 0 for _ in range(3)]
+    retry_after = limiter.check(ip="1.1.1.1")
+    check(all(allowed) and retry_after == 1, f"IP별 3회 허용 후 거절 (Retry-After {retry_after}초)")
+    check(limiter.check(ip="2.2.2.2") == 0, "다른 IP는 영향 없음")
+    time.sleep(0.12)
+    check(limiter.check(ip="1.1.1.1") == 0, "충전 후 다시 허용")
+
+    # 2. 계정별 한도는 실패에만 차감, 대소문자가 달라도 같은 계정
+    limiter = RateLimiter("t2", {"ip": (100, 60), "email": (2, 60)}, MemoryBuckets())
+    for _ in range(5):
+        limiter.check(ip="1.1.1.1", email="user@test.com")
+    check(limiter.check(ip="1.1.1.1", email="user@test.com") == 0, "성공한 로그인은 계정 한도를 쓰지 않음")
+    limiter.record_failure(email="user@test.com")
+    limiter.record_failure(email="USER@test.com ")
+    blocked = [limiter.check(ip=f"10.0.0.{i}", email="user@test.com") for i in range(5)]
+    check(all(wait >= 1 for wait in blocked), "실패 2회 후 어떤 IP에서도 해당 계정 로그인 거절")
+    check(limiter.check(ip="10.0.0.1", email="other@test.com") == 0, "다른 계정은 허용")
+
+    # 3. 전체 한도는 IP와 관계없이 적용
+    limiter = RateLimiter("t3", {"ip": (100, 60), "global": (5, 60)}, MemoryBuckets())
+    waits = [limiter.check(ip=f"10.0.1.{i}") for i in range(10)]
+    check(waits.count(0) == 5 and limiter.stats()["limited_by"]["global"] == 5, "전체 한도 초과 시 거절")
+
+    # 4. 키 수가 한도를 넘으면 오래된 버킷부터 제거 (메모리 일정)
+    backend = MemoryBuckets(max_keys=1000)
+    limiter = RateLimiter("t4", {"ip": (5, 60)}, backend)
+    started = time.perf_counter()
+    for i in range(20000):
+        limiter.check(ip=f"ip-{i}")
+    elapsed = (time.perf_counter() - started) / 20000 * 1e6
+    check(backend.size() == 1000 and backend.evictions == 19000,
+          f"버킷 수 1000개로 제한 (확인 1회 평균 {elapsed:.1f} µs)")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_rate_limiter_test)
@@ -0,0 +1,68 @@
+# test_search_index.py
+# 프로세스 내 검색 엔진(search_index.py) 테스트 (DB 없이 실행)
+# - 한국어는 띄어쓰기/조사와 무관하게 부분 일치, 제목 일치가 본문보다 높은 순위
+# - 비공개 게시글과 그 댓글 제외, 수정/삭제 반영, offset 페이지와 다음 페이지 여부
+
+from search_index import InvertedIndex, tokenize
+from test_utils import Checks, run_test
+
+
+def run_search_index_test():
+    check = Checks("검색 엔진")
+
+    # 1. 토큰화: 글자 2개 단위, 짧은 단어와 영문 소문자
+    tokens = tokenize("인공지능 AI 추천")
+    check(tokens == ["인공", "공지", "지능", "ai", "추천"], f"bigram 토큰화 ({tokens})")
+
+    index = InvertedIndex()
+    index.add_post(1, "인공지능 공부 방법", "머신러닝 입문서를 추천해주세요.")
+    index.add_post(2, "오늘의 점심", "인공지능이 메뉴를 골라줬어요.")
+    index.add_post(3, "비밀 일기", "인공지능 관련 비공개 메모", private=True)
+    index.add_post(4, "여행 후기", "제주도 다녀왔습니다.")
+    index.add_comment(10, 4, "저도 인공지능 여행 계획 앱을 써봤어요.")
+    index.add_comment(11, 3, "비공개 글의 인공지능 댓글")
+
+    # 2. 조사가 붙은 단어도 검색, 제목 일치가 먼저, 비공개 게시글/댓글 제외
+    ranked, has_more = index.search("인공지능")
+    keys = [key for key, _ in ranked]
+    check(keys[0] == ("post", 1), f"제목 일치 게시글이 1위 ({keys})")
+    check(set(keys) == {("post", 1), ("post", 2), ("comment", 10)} and not has_more,
+          "조사 붙은 본문/댓글 포함, 비공개 게시글과 그 댓글 제외")
+
+    # 3. 검색 대상 종류 제한, 띄어쓰기 없는 검색어
+    ranked, _ = index.search("인공지능", kinds=("comment",))
+    check([key for key, _ in ranked] == [("comment", 10)], "댓글만 검색")
+    ranked, _ = index.search("입문서추천")
+    check(ranked and ranked[0][0] == ("post", 1), "띄어쓰기 없는 검색어도 부분 일치")
+
+    # 4. 관련 없는 검색어는 결과 없음
+    ranked, _ = index.search("양자역학")
+    check(ranked == [], "일치하지 않는 검색어는 빈 결과")
+
+    # 5. 페이지: limit/offset과 다음 페이지 여부
+    first, more_first = index.search("인공지능", limit=2)
+    second, more_second = index.search("인공지능", limit=2, offset=2)
+    check(len(first) == 2 and more_first and len(second) == 1 and not more_second,
+          "limit/offset 페이지와 has_more")
+    check(not {key for key, _ in first} & {key for key, _ in second}, "페이지 간 중복 없음")
+
+    # 6. 수정: 공개 전환/내용 변경 반영
+    index.add_post(3, "비밀 일기", "이제 공개합니다", private=False)
+    keys = [key for key, _ in index.search("인공지능")[0]]
+    check(("post", 3) not in keys and ("comment", 11) in keys,
+          "수정한 본문은 새 내용으로 검색, 공개 전환 시 댓글 노출")
+
+    # 7. 삭제: 게시글 삭제 시 댓글도 제거, 댓글만 삭제
+    index.remove_post(4)
+    index.remove_comments([11])
+    keys = [key for key, _ in index.search("인공지능")[0]]
+    check(set(keys) == {("post", 1), ("post", 2)}, f"삭제한 게시글/댓글 제외 ({keys})")
+    stats = index.stats()
+    check(stats["documents"] == 3, f"색인 문서 수 ({stats})")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_search_index_test)
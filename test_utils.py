@@ -0,0 +1,39 @@
+# test_utils.py
+# 테스트 스크립트(test_*.py)가 함께 쓰는 결과 확인/출력 도우미
+# 사용 예:
+#     check = Checks("검색 엔진")        # 시작 배너 출력
+#     check(조건, "확인 내용")            # [PASS]/[FAIL] 출력 후 결과 기록, 조건을 그대로 반환
+#     return check.passed()             # 요약 출력, 모두 통과했으면 True
+#
+#     if __name__ == '__main__':
+#         run_test(run_search_index_test)
+
+import sys
+
+
+class Checks:
+    # 확인 결과를 모아 두었다가 마지막에 통과 여부를 알려줌
+
+    def __init__(self, title):
+        self.title = title
+        self.results = []
+        print("=" * 60)
+        print(f"        {title} 테스트 시작")
+        print("=" * 60)
+
+    def __call__(self, condition, message):
+        print(f"[{'PASS' if condition else 'FAIL'}] {message}")
+        self.results.append(bool(condition))
+        return condition
+
+    def passed(self):
+        if all(self.results):
+            print(f"\n[SUCCESS] {self.title} 테스트 통과")
+            return True
+        print("\n[FAIL] 일부 테스트가 실패했습니다.")
+        return False
+
+
+def run_test(test_func):
+    # 파일이 직접 실행될 때 테스트 함수를 호출하고 결과를 종료 코드로 반환 (통과 0, 실패 1)
+    sys.exit(0 if test_func() else 1)
@@ -0,0 +1,186 @@
+# test_websocket_codec.py
+# WebSocket 프레임 코덱 테스트 (socket/websocket_codec.py)
+# 소켓 없이 인코딩한 바이트를 FrameDecoder에 직접 넣어 다음을 확인함.
+# - 여러 번에 나뉘어 읽힌 프레임(헤더/마스크 키/페이로드 중간에서 끊김)도 다 모인 뒤 한 번만 반환
+# - 조각난 메시지 사이에 끼어든 ping은 바로 반환하고 메시지는 조각이 모두 모인 뒤 반환
+# - close 프레임의 상태 코드/사유, 마스크되지 않은 클라이언트 프레임 거부
+# - 언마스킹 방식이 바뀌는 경계(TRANSLATE_UNMASK_THRESHOLD) 앞뒤 길이에서 결과가 같은지
+# - permessage-deflate 협상과 압축/해제 왕복 (context takeover 사용/미사용)
+
+import os
+import sys
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "socket"))
+
+from websocket_codec import (
+    FrameDecoder, WebSocketError, encode_frame, encode_close, parse_close, unmask,
+    PerMessageDeflate, negotiate_deflate, DEFLATE_TAIL,
+    OP_TEXT, OP_BINARY, OP_CONTINUATION, OP_PING, OP_CLOSE,
+    CLOSE_NORMAL, CLOSE_PROTOCOL_ERROR, TRANSLATE_UNMASK_THRESHOLD,
+)
+from test_utils import Checks, run_test
+
+MASKING_KEY = b"\x37\xfa\x21\x3d"
+
+
+def client_frame(payload, opcode=OP_TEXT, fin=True):
+    # 클라이언트가 보내는 프레임 (항상 마스크 적용)
+    return encode_frame(payload, opcode, fin=fin, masking_key=MASKING_KEY)
+
+
+def decode_all(decoder, data):
+    decoder.feed(data)
+    return list(decoder.messages())
+
+
+def slow_unmask(payload, masking_key):
+    # 바이트 단위 기준 구현 (결과 비교용)
+    return bytes(b ^ masking_key[i % 4] for i, b in enumerate(payload))
+
+
+def client_compress(deflate, compressor, data):
+    # 클라이언트 쪽 압축 (compressor가 None이면 메시지마다 새로 시작 = client_no_context_takeover)
+    if compressor is None:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -deflate.client_max_window_bits)
+    compressed = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return compressed[:-4] if compressed.endswith(DEFLATE_TAIL) else compressed
+
+
+def server_round_trip(deflate, messages):
+    # 서버가 압축해 보낸 메시지를 클라이언트처럼 디코딩/해제 → (복원한 메시지 목록, 압축된 페이로드 목록)
+    decoder = FrameDecoder(allow_rsv1=True)
+    inflater = zlib.decompressobj(-deflate.server_max_window_bits)
+    restored, payloads = [], []
+    for message in messages:
+        for _, payload in decode_all(decoder, deflate.encode(message)):
+            if not deflate.server_context_takeover:
+                inflater = zlib.decompressobj(-deflate.server_max_window_bits)
+            payloads.append(payload)
+            restored.append(inflater.decompress(payload + DEFLATE_TAIL) if decoder.last_rsv1 else payload)
+    return restored, payloads
+
+
+def client_round_trip(deflate, messages, takeover):
+    # 클라이언트가 압축해 보낸 메시지를 서버 디코더로 받아 해제한 결과
+    decoder = FrameDecoder(require_mask=True, allow_rsv1=True)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -deflate.client_max_window_bits) if takeover else None
+    restored = []
+    for message in messages:
+        frame = encode_frame(client_compress(deflate, compressor, message), OP_TEXT, rsv1=True, masking_key=MASKING_KEY)
+        for _, payload in decode_all(decoder, frame):
+            restored.append(deflate.decompress(payload) if decoder.last_rsv1 else payload)
+    return restored
+
+
+def run_websocket_codec_test():
+    check = Checks("WebSocket 프레임 코덱")
+
+    # 1. 나뉘어 읽힌 프레임: 16비트 길이 헤더 + 마스크를 쓰는 프레임을 1바이트씩 넣음
+    payload = "나뉘어 도착한 메시지 ".encode("utf-8") * 20
+    frame = client_frame(payload)
+    decoder = FrameDecoder(require_mask=True)
+    early = []
+    for i in range(len(frame) - 1):
+        early.extend(decode_all(decoder, frame[i:i + 1]))
+    last = decode_all(decoder, frame[-1:])
+    check(not early and last == [(OP_TEXT, payload)], "1바이트씩 나뉘어 도착한 프레임을 마지막 바이트에서 한 번만 반환")
+
+    # 1-1. 한 번의 읽기에 프레임 두 개 반 → 두 개만 반환하고 나머지는 다음 읽기와 합침
+    frames = client_frame(b"first") + client_frame(b"second") + client_frame(b"third")
+    cut = len(frames) - 3
+    first_read = decode_all(decoder, frames[:cut])
+    second_read = decode_all(decoder, frames[cut:])
+    check(first_read == [(OP_TEXT, b"first"), (OP_TEXT, b"second")] and second_read == [(OP_TEXT, b"third")],
+          "여러 프레임이 섞인 읽기를 프레임 경계대로 분리")
+
+    # 2. 조각난 메시지 + 사이에 낀 ping
+    decoder = FrameDecoder(require_mask=True)
+    stream = (client_frame(b"hello ", OP_TEXT, fin=False)
+              + client_frame(b"ping!", OP_PING)
+              + client_frame(b"fragmented ", OP_CONTINUATION, fin=False)
+              + client_frame(b"world", OP_CONTINUATION, fin=True))
+    messages = decode_all(decoder, stream)
+    check(messages == [(OP_PING, b"ping!"), (OP_TEXT, b"hello fragmented world")],
+          f"조각 사이의 ping은 바로, 메시지는 조각을 모두 모은 뒤 반환 ({messages})")
+
+    # 2-1. 조각난 메시지가 끝나기 전에 새 메시지 시작 → 프로토콜 오류
+    decoder = FrameDecoder(require_mask=True)
+    try:
+        decode_all(decoder, client_frame(b"a", OP_TEXT, fin=False) + client_frame(b"b", OP_BINARY))
+        check(False, "끝나지 않은 조각 메시지 뒤 새 메시지 거부")
+    except WebSocketError as e:
+        check(e.close_code == CLOSE_PROTOCOL_ERROR, "끝나지 않은 조각 메시지 뒤 새 메시지 거부")
+
+    # 3. close 프레임: 상태 코드와 사유 보존
+    decoder = FrameDecoder()
+    messages = decode_all(decoder, encode_close(CLOSE_NORMAL, "bye"))
+    check(len(messages) == 1 and messages[0][0] == OP_CLOSE and parse_close(messages[0][1]) == (CLOSE_NORMAL, "bye"),
+          "close 프레임의 상태 코드/사유 해석")
+    check(parse_close(b"") == (CLOSE_NORMAL, ""), "상태 코드 없는 close 프레임은 정상 종료로 해석")
+
+    # 4. 마스크되지 않은 클라이언트 프레임 거부 (서버 쪽 디코더)
+    decoder = FrameDecoder(require_mask=True)
+    try:
+        decode_all(decoder, encode_frame(b"unmasked", OP_TEXT))
+        check(False, "마스크되지 않은 클라이언트 프레임 거부")
+    except WebSocketError as e:
+        check(e.close_code == CLOSE_PROTOCOL_ERROR, "마스크되지 않은 클라이언트 프레임 거부")
+
+    # 5. 언마스킹 경계: 정수 XOR(임계값 미만)과 translate(이상) 모두 기준 구현과 같아야 함
+    lengths = [0, 1, 3, 4, 5, TRANSLATE_UNMASK_THRESHOLD - 1, TRANSLATE_UNMASK_THRESHOLD,
+               TRANSLATE_UNMASK_THRESHOLD + 1, TRANSLATE_UNMASK_THRESHOLD + 3]
+    mismatched = []
+    for length in lengths:
+        data = os.urandom(length)
+        if unmask(data, MASKING_KEY) != slow_unmask(data, MASKING_KEY) or unmask(unmask(data, MASKING_KEY), MASKING_KEY) != data:
+            mismatched.append(length)
+    check(not mismatched, f"임계값({TRANSLATE_UNMASK_THRESHOLD}) 앞뒤 길이에서 언마스킹 결과 일치 (불일치 길이: {mismatched})")
+
+    decoder = FrameDecoder(require_mask=True)
+    data = os.urandom(TRANSLATE_UNMASK_THRESHOLD)
+    check(decode_all(decoder, client_frame(data, OP_BINARY)) == [(OP_BINARY, data)],
+          "임계값 크기의 마스크 프레임 디코딩")
+
+    # 6. permessage-deflate 협상
+    deflate = negotiate_deflate("permessage-deflate; client_max_window_bits")
+    check(deflate is not None and deflate.shared and deflate.client_context_takeover
+          and deflate.response_header() == "permessage-deflate; server_no_context_takeover",
+          "기본 협상: 서버는 context takeover 미사용(압축 결과 공유 가능)")
+    takeover = negotiate_deflate("permessage-deflate; client_no_context_takeover", server_context_takeover=True)
+    check(takeover is not None and not takeover.shared and not takeover.client_context_takeover,
+          "서버 context takeover 사용 + 클라이언트 no_context_takeover 협상")
+    check(negotiate_deflate("x-webkit-deflate-frame") is None
+          and negotiate_deflate("permessage-deflate; server_max_window_bits=8") is None,
+          "모르는 확장/받아들일 수 없는 창 크기는 협상하지 않음")
+
+    # 7. 압축/해제 왕복: 같은 내용이 반복되는 채팅 메시지
+    messages = [f"안녕하세요, 채팅 메시지 {i}번입니다. 같은 문장이 반복됩니다.".encode("utf-8") for i in range(5)]
+
+    restored, payloads = server_round_trip(PerMessageDeflate(server_context_takeover=False), messages)
+    check(restored == messages, "서버→클라이언트 왕복 (context takeover 미사용)")
+    no_takeover = PerMessageDeflate(server_context_takeover=False)
+    check(no_takeover.compress(messages[0]) == no_takeover.compress(messages[0]),
+          "context takeover 미사용이면 같은 메시지는 항상 같은 압축 결과 (브로드캐스트 시 공유 가능)")
+
+    restored, takeover_payloads = server_round_trip(PerMessageDeflate(server_context_takeover=True), messages)
+    check(restored == messages, "서버→클라이언트 왕복 (context takeover 사용)")
+    check(sum(map(len, takeover_payloads[1:])) < sum(map(len, payloads[1:])),
+          "context takeover 사용 시 이전 메시지를 사전으로 써서 더 작게 압축")
+
+    check(client_round_trip(PerMessageDeflate(client_context_takeover=True), messages, takeover=True) == messages,
+          "클라이언트→서버 왕복 (context takeover 사용)")
+    check(client_round_trip(PerMessageDeflate(client_context_takeover=False), messages, takeover=False) == messages,
+          "클라이언트→서버 왕복 (context takeover 미사용)")
+
+    # 7-1. min_size 미만 메시지는 압축하지 않음 (RSV1 없음)
+    decoder = FrameDecoder(allow_rsv1=True)
+    small = decode_all(decoder, PerMessageDeflate(min_size=64).encode(b"hi"))
+    check(small == [(OP_TEXT, b"hi")] and not decoder.last_rsv1, "min_size 미만 메시지는 압축하지 않고 전송")
+
+    return check.passed()
+
+
+# 파일이 직접 실행될 때 테스트 함수 호출
+if __name__ == '__main__':
+    run_test(run_websocket_codec_test)